@@ -20,14 +20,33 @@ router = APIRouter(prefix="/alerts", tags=["Smart Alerts"])
 
 
 @router.post("/process", response_model=List[SmartAlertResponse])
-async def process_new_documents(background_tasks: BackgroundTasks):
+async def process_new_documents(
+    background_tasks: BackgroundTasks,
+    batch: bool = Query(False, description="OpenAI Batch API로 제출 (50% 비용, 결과는 /alerts/batch/poll)")
+):
     """Process new documents and create smart alerts.
     
     Scans documents from the last 24 hours that haven't been processed
     and generates alerts with urgency analysis.
     """
     service = get_alert_service()
-    alerts = await service.process_new_documents()
+    alerts = await service.process_new_documents(use_batch=batch)
+    
+    for alert in alerts:
+        if alert.priority in [AlertPriority.CRITICAL, AlertPriority.HIGH]:
+            background_tasks.add_task(service.notify_subscribers, alert)
+    
+    return alerts
+
+
+@router.post("/batch/poll", response_model=List[SmartAlertResponse])
+async def poll_alert_batches(background_tasks: BackgroundTasks):
+    """Collect finished OpenAI Batch urgency analyses and create their alerts.
+    
+    Intended to be called periodically (e.g. hourly) after `/process?batch=true`.
+    """
+    service = get_alert_service()
+    alerts = await service.poll_urgency_batches()
     
     for alert in alerts:
         if alert.priority in [AlertPriority.CRITICAL, AlertPriority.HIGH]:
@@ -15,7 +15,7 @@ from pydantic import BaseModel
 from app.services.compliance_tracker import (
     get_compliance_service as get_tracker_service, TaskStatus, TaskPriority, ComplianceTask
 )
-from app.services.compliance_service import ComplianceService
+from app.services.compliance_service import ComplianceService, get_compliance_hub_service
 from app.models.compliance_schemas import (
     ComplianceDocumentResponse,
     ComplianceChecklistResponse,
@@ -50,14 +50,6 @@ class AssignTaskRequest(BaseModel):
     assigned_to: str
 
 
-# ============================================
-# Dependency for Compliance Hub Service
-# ============================================
-
-def get_compliance_hub_service() -> ComplianceService:
-    return ComplianceService()
-
-
 # ============================================
 # (A) Task Management Endpoints (Smart Alert Integration)
 # ============================================
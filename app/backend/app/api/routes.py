@@ -12,7 +12,8 @@ import traceback
 from datetime import datetime, timedelta, timezone
 from typing import List, Optional
 
-from fastapi import APIRouter, HTTPException, Query, BackgroundTasks
+from fastapi import APIRouter, HTTPException, Query, BackgroundTasks, Response
+from pydantic import TypeAdapter
 
 from app.core.config import settings
 from app.models.schemas import (
@@ -712,7 +713,7 @@ async def export_checklist(document_id: str, format: str = Query("json")):
         if not checklist:
             raise HTTPException(status_code=404, detail="Checklist not found")
         
-        content = checklist_service.export_checklist(checklist, format)
+        content = await checklist_service.export_checklist(checklist, format)
         
         from fastapi.responses import PlainTextResponse
         
@@ -727,6 +728,16 @@ async def export_checklist(document_id: str, format: str = Query("json")):
 
 # ==================== Dashboard Routes ====================
 
+# 대시보드 응답 스키마는 모듈 로드 시 한 번만 빌드: 중첩 리스트까지 한 번에 검증·직렬화
+_DASHBOARD_ADAPTER = TypeAdapter(DashboardStats)
+
+
+def _dashboard_json_response(data) -> Response:
+    """dict/DashboardStats → 검증 후 JSON 바이트로 바로 응답 (FastAPI 재인코딩 생략)."""
+    stats = _DASHBOARD_ADAPTER.validate_python(data)
+    return Response(_DASHBOARD_ADAPTER.dump_json(stats), media_type="application/json")
+
+
 @router.get("/dashboard/stats", response_model=DashboardStats)
 async def get_dashboard_stats():
     """대시보드 통계. DB 조회 실패 시에만 demo_data 폴백.
@@ -735,10 +746,9 @@ async def get_dashboard_stats():
     _cached = cache_get(_dash_cache_key)
     if _cached is not None:
         try:
-            return DashboardStats.model_validate(_cached)
+            return _dashboard_json_response(_cached)
         except Exception:
             pass
-    from app.models.schemas import CollectionStatus
     try:
         db = rss_collector.db
         now_utc = datetime.now(timezone.utc)
@@ -793,7 +803,7 @@ async def get_dashboard_stats():
         active_alerts_count = (alerts_result.count if hasattr(alerts_result, "count") else 0) or 0
         high_severity_count = (high_severity_res.count if hasattr(high_severity_res, "count") else 0) or 0
 
-        async def _enrich_topic(t: dict) -> TopicResponse:
+        async def _enrich_topic(t: dict) -> dict:
             tid = t["topic_id"]
 
             def _run():
@@ -808,18 +818,18 @@ async def get_dashboard_stats():
 
             count_res, alert_res = await asyncio.to_thread(_run)
             surge_score = alert_res.data[0]["surge_score"] if alert_res.data else 0.0
-            return TopicResponse(
-                topic_id=tid,
-                topic_name=t.get("topic_name") or "New Topic",
-                topic_summary=t.get("topic_summary"),
-                time_window_start=t["time_window_start"],
-                time_window_end=t["time_window_end"],
-                document_count=(count_res.count if hasattr(count_res, "count") else 0) or 0,
-                surge_score=surge_score,
-                representative_documents=[],
-            )
+            return {
+                "topic_id": tid,
+                "topic_name": t.get("topic_name") or "New Topic",
+                "topic_summary": t.get("topic_summary"),
+                "time_window_start": t["time_window_start"],
+                "time_window_end": t["time_window_end"],
+                "document_count": (count_res.count if hasattr(count_res, "count") else 0) or 0,
+                "surge_score": surge_score,
+                "representative_documents": [],
+            }
 
-        topics: List[TopicResponse] = []
+        topics: List[dict] = []
         if topics_result.data:
             topics = await asyncio.gather(*[_enrich_topic(t) for t in topics_result.data])
 
@@ -873,7 +883,7 @@ async def get_dashboard_stats():
         ingested_7d = collection_stats.get("documents_7d") or 0
         documents_this_week = max(ingested_7d, published_7d_total)
 
-        async def _source_status(source_rec: dict) -> CollectionStatus:
+        async def _source_status(source_rec: dict) -> dict:
             source_id = source_rec["source_id"]
             fid = source_rec.get("fid")
 
@@ -903,37 +913,38 @@ async def get_dashboard_stats():
                 sum(1 for d in source_week.data if d.get("status") == "failed") if source_week.data else 0
             )
             success_rate = (total_week - failed_week) / total_week * 100 if total_week > 0 else 100.0
-            return CollectionStatus(
-                source_id=fid,
-                source_name=source_rec.get("name") or f"Source {fid}",
-                last_fetch=now_utc,
-                new_documents_24h=(recent.count if hasattr(recent, "count") else 0) or 0,
-                total_documents=(source_docs.count if hasattr(source_docs, "count") else 0) or 0,
-                success_rate_7d=success_rate,
-                parsing_failures_24h=0,
-            )
+            return {
+                "source_id": fid,
+                "source_name": source_rec.get("name") or f"Source {fid}",
+                "last_fetch": now_utc,
+                "new_documents_24h": (recent.count if hasattr(recent, "count") else 0) or 0,
+                "total_documents": (source_docs.count if hasattr(source_docs, "count") else 0) or 0,
+                "success_rate_7d": success_rate,
+                "parsing_failures_24h": 0,
+            }
 
-        sources: List[CollectionStatus] = []
+        sources: List[dict] = []
         if sources_records.data:
             sources = await asyncio.gather(*[_source_status(s) for s in sources_records.data])
 
-        out = DashboardStats(
-            total_documents=collection_stats["total_documents"] or 0,
-            documents_24h=collection_stats["documents_24h"] or 0,
-            active_alerts=active_alerts_count,
-            high_severity_alerts=high_severity_count,
-            collection_status=sources,
-            recent_topics=topics,
-            quality_metrics=None,
-            documents_this_week=documents_this_week,
-            domestic_this_week=domestic_this_week,
-            international_this_week=international_this_week,
-        )
+        out = _DASHBOARD_ADAPTER.validate_python({
+            "total_documents": collection_stats["total_documents"] or 0,
+            "documents_24h": collection_stats["documents_24h"] or 0,
+            "active_alerts": active_alerts_count,
+            "high_severity_alerts": high_severity_count,
+            "collection_status": sources,
+            "recent_topics": topics,
+            "quality_metrics": None,
+            "documents_this_week": documents_this_week,
+            "domestic_this_week": domestic_this_week,
+            "international_this_week": international_this_week,
+        })
+        body = _DASHBOARD_ADAPTER.dump_json(out)
         try:
-            cache_set(_dash_cache_key, out.model_dump(mode="json"), CACHE_TTL_DASHBOARD)
+            cache_set(_dash_cache_key, _DASHBOARD_ADAPTER.dump_python(out, mode="json"), CACHE_TTL_DASHBOARD)
         except Exception:
             pass
-        return out
+        return Response(body, media_type="application/json")
     
     except Exception as e:
         logging.error(f"Error in get_dashboard_stats: {str(e)}")
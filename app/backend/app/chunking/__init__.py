@@ -6,5 +6,6 @@
 # ======================================================================
 
 from app.chunking.recursive_split import get_recursive_splitter, split_text_recursive
+from app.chunking.token_count import count_tokens
 
-__all__ = ["get_recursive_splitter", "split_text_recursive"]
+__all__ = ["count_tokens", "get_recursive_splitter", "split_text_recursive"]
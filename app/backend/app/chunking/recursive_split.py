@@ -8,6 +8,7 @@
 """문맥 보존 재귀 청킹 — 규제 문서(한글·조문·표)에 맞춘 구분자 우선순위."""
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import List
 
 from langchain.text_splitter import RecursiveCharacterTextSplitter
@@ -46,22 +47,28 @@ def get_recursive_splitter(
     )
 
 
+@lru_cache(maxsize=8)
+def _cached_splitter(size: int, overlap: int) -> RecursiveCharacterTextSplitter:
+    """(size, overlap)별 분할기 재사용 — 문서·첨부마다 새로 만들지 않음 (상태 없음)."""
+    return get_recursive_splitter(size, overlap)
+
+
 def split_text_recursive(
     text: str,
     chunk_size: int | None = None,
     chunk_overlap: int | None = None,
 ) -> List[str]:
     """전체 텍스트를 재귀 분할. 실패 시 고정 길이 윈도 폴백."""
-    if not (text or "").strip():
+    text = (text or "").strip()
+    if not text:
         return []
     size = chunk_size if chunk_size is not None else settings.CHUNK_SIZE
     overlap = chunk_overlap if chunk_overlap is not None else settings.CHUNK_OVERLAP
     try:
-        splitter = get_recursive_splitter(size, overlap)
-        parts = splitter.split_text(text.strip())
+        parts = _cached_splitter(size, overlap).split_text(text)
         return [p for p in parts if p.strip()]
     except Exception:
-        return _fallback_char_windows(text.strip(), size, overlap)
+        return _fallback_char_windows(text, size, overlap)
 
 
 def _fallback_char_windows(text: str, size: int, overlap: int) -> List[str]:
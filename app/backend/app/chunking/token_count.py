@@ -0,0 +1,54 @@
+# ======================================================================
+# FSC Policy RAG System | 모듈: app.chunking.token_count
+# 최종 수정일: 2026-10-17
+# 연관 문서: CHANGE_CONTROL.md, ROOT_DOC_GUIDE.md, SYSTEM_ARCHITECTURE.md, RAG_PIPELINE.md, DIRECTORY_SPEC.md
+# 참조 규칙: 루트 MD 계약과 충돌 시 CHANGE_CONTROL.md §5 우선.
+# ======================================================================
+
+"""청크 토큰 수 — 임베딩 모델 토크나이저(tiktoken) 기준, 문서 단위 배치 인코딩."""
+from __future__ import annotations
+
+import logging
+import os
+from functools import lru_cache
+from typing import Any, List, Optional
+
+from app.core.config import settings
+
+_log = logging.getLogger(__name__)
+
+# encode_batch는 호출마다 스레드 풀을 새로 띄우므로 소량 입력은 단건 encode가 더 빠름
+_BATCH_MIN_TEXTS = 8
+# tiktoken 기본값(8)은 소형 컨테이너에서 과다 — CPU 수 이하로 제한
+_ENCODE_THREADS = max(1, min(8, os.cpu_count() or 1))
+
+
+@lru_cache(maxsize=4)
+def _get_encoding(model: str) -> Optional[Any]:
+    """모델별 tiktoken 인코딩 (1회 로드). tiktoken 미설치·미지원 모델이면 cl100k_base, 그래도 실패 시 None."""
+    try:
+        import tiktoken
+    except ImportError:
+        return None
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding("cl100k_base")
+    except Exception as e:
+        _log.debug("tiktoken encoding load failed: %s", e)
+        return None
+
+
+def count_tokens(texts: List[str], model: str | None = None) -> List[int]:
+    """텍스트별 토큰 수를 한 번의 encode_batch로 계산. tiktoken 없으면 공백 단어 수로 폴백."""
+    if not texts:
+        return []
+    enc = _get_encoding(model or settings.OPENAI_EMBEDDING_MODEL)
+    if enc is None:
+        return [len(t.split()) for t in texts]
+    if len(texts) < _BATCH_MIN_TEXTS or _ENCODE_THREADS == 1:
+        return [len(enc.encode(t, disallowed_special=())) if t else 0 for t in texts]
+    return [
+        len(ids)
+        for ids in enc.encode_batch(texts, num_threads=_ENCODE_THREADS, disallowed_special=())
+    ]
@@ -18,6 +18,12 @@ CACHE_TTL_SANDBOX_SIMULATE = 600  # 10분 (시뮬레이션 결과 캐시)
 CACHE_TTL_DASHBOARD = 180       # 3분
 CACHE_TTL_DASHBOARD_HOURLY = 120  # 2분 (차트용)
 CACHE_TTL_METRICS_SUMMARY = 240  # 4분 (RAG 품질 요약)
+# 첨부 파싱 결과 (파일 내용 해시 키): 파이프라인 재시도·재처리 시 LlamaParse 재호출 방지
+CACHE_TTL_PARSED_DOCUMENT = 86400  # 24시간
+# 알림 긴급도 분석 결과 (제목+본문 앞 4000자 해시 키): 재실행·개정안 재게시 시 LLM 재호출 방지
+CACHE_TTL_URGENCY_ANALYSIS = 86400 * 7  # 7일
+# 알림 구독 목록: 알림 발송마다 전체 조회 방지, 구독 변경 시 즉시 무효화
+CACHE_TTL_ALERT_SUBSCRIPTIONS = 300  # 5분
 
 
 def cache_get(key: str) -> Optional[Any]:
@@ -1,36 +1,83 @@
 # ======================================================================
 # FSC Policy RAG System | 모듈: app.core.database
-# 최종 수정일: 2026-04-07
+# 최종 수정일: 2026-10-17
 # 연관 문서: CHANGE_CONTROL.md, ROOT_DOC_GUIDE.md, SYSTEM_ARCHITECTURE.md, RAG_PIPELINE.md, DIRECTORY_SPEC.md
 # 참조 규칙: 루트 MD 계약과 충돌 시 CHANGE_CONTROL.md §5 우선.
 # ======================================================================
 
 """Database connection and session management."""
+import logging
+import threading
+
 from supabase import create_client, Client
+from supabase.lib.client_options import ClientOptions
 from app.core.config import settings
 
+_log = logging.getLogger(__name__)
+
 
 class Database:
     """Supabase database client."""
     
     _client: Client = None
+    # to_thread 워커에서 동시에 첫 호출해도 클라이언트(=httpx 커넥션 풀)는 하나만 생성
+    _lock = threading.Lock()
     
     @classmethod
     def get_client(cls) -> Client:
         """Get or create Supabase client."""
         if cls._client is None:
-            cls._client = create_client(
-                settings.SUPABASE_URL,
-                settings.SUPABASE_SERVICE_KEY
-            )
+            with cls._lock:
+                if cls._client is None:
+                    cls._client = create_client(
+                        settings.SUPABASE_URL,
+                        settings.SUPABASE_SERVICE_KEY,
+                        options=ClientOptions(
+                            postgrest_client_timeout=settings.SUPABASE_HTTP_TIMEOUT
+                        ),
+                    )
         return cls._client
     
     @classmethod
     async def close(cls):
-        """Close database connection."""
-        cls._client = None
+        """Close database connection (PostgREST httpx 세션의 keep-alive 커넥션 반환)."""
+        client, cls._client = cls._client, None
+        if client is None:
+            return
+        # postgrest 동기 클라이언트의 aclose()는 httpx.Client에 없는 aclose를 호출하므로 세션을 직접 닫음
+        postgrest = getattr(client, "_postgrest", None)
+        try:
+            if postgrest is not None:
+                postgrest.session.close()
+        except Exception as e:
+            _log.debug("Supabase client close skipped: %s", e)
 
 
 def get_db() -> Client:
     """Get database client dependency."""
     return Database.get_client()
+
+
+def _postgrest_error_code_in(e: Exception, codes: tuple) -> bool:
+    """PostgREST APIError.code 또는 메시지에 주어진 오류 코드가 있는지 (SDK 버전별 예외 형태 차이 흡수)."""
+    code = str(getattr(e, "code", "") or "")
+    text = str(e)
+    return code in codes or any(c in text for c in codes)
+
+
+def is_missing_rpc_error(e: Exception) -> bool:
+    """RPC 함수 미배포 오류 여부 (PostgREST PGRST202 / Postgres undefined_function 42883).
+
+    이 경우에만 RPC 경로를 프로세스 수명 동안 끄고, 타임아웃·5xx 등 일시 오류는 해당 호출만 폴백.
+    """
+    return _postgrest_error_code_in(e, ("PGRST202", "42883"))
+
+
+def is_missing_conflict_target_error(e: Exception) -> bool:
+    """upsert on_conflict 대상 UNIQUE 제약 미적용 오류 여부 (Postgres invalid_column_reference 42P10)."""
+    return _postgrest_error_code_in(e, ("42P10",))
+
+
+def is_missing_table_error(e: Exception) -> bool:
+    """테이블 미생성(마이그레이션 미적용) 오류 여부 (PostgREST PGRST205 / Postgres undefined_table 42P01)."""
+    return _postgrest_error_code_in(e, ("PGRST205", "42P01"))
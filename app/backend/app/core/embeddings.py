@@ -0,0 +1,22 @@
+# ======================================================================
+# FSC Policy RAG System | 모듈: app.core.embeddings
+# 최종 수정일: 2026-10-17
+# 연관 문서: CHANGE_CONTROL.md, ROOT_DOC_GUIDE.md, SYSTEM_ARCHITECTURE.md, RAG_PIPELINE.md, DIRECTORY_SPEC.md
+# 참조 규칙: 루트 MD 계약과 충돌 시 CHANGE_CONTROL.md §5 우선.
+# ======================================================================
+
+"""공유 OpenAIEmbeddings 클라이언트 — 인제스천·검색·에이전트가 한 인스턴스(=하나의 keep-alive 커넥션 풀) 재사용."""
+from functools import lru_cache
+
+from langchain_openai import OpenAIEmbeddings
+
+from app.core.config import settings
+
+
+@lru_cache(maxsize=1)
+def get_embeddings() -> OpenAIEmbeddings:
+    """프로세스 단일 OpenAIEmbeddings (내부 OpenAI/AsyncOpenAI httpx 풀을 호출 간 유지)."""
+    return OpenAIEmbeddings(
+        model=settings.OPENAI_EMBEDDING_MODEL,
+        api_key=settings.OPENAI_API_KEY
+    )
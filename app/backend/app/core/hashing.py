@@ -0,0 +1,72 @@
+# ======================================================================
+# FSC Policy RAG System | 모듈: app.core.hashing
+# 최종 수정일: 2026-10-17
+# 연관 문서: CHANGE_CONTROL.md, ROOT_DOC_GUIDE.md, SYSTEM_ARCHITECTURE.md, RAG_PIPELINE.md, DIRECTORY_SPEC.md
+# 참조 규칙: 루트 MD 계약과 충돌 시 CHANGE_CONTROL.md §5 우선.
+# ======================================================================
+
+"""
+수집 문서 중복 판정 해시: "url:title:published" → 32자 hex (documents.hash).
+
+알고리즘은 settings.HASH_ALGO로 선택. 기본 sha256(앞 128비트)은 기존 DB 해시와 동일하며,
+다른 알고리즘으로 바꾸면 기존 문서와 해시가 달라져 한 번은 신규로 판정됨(url upsert로 행 중복은 없음).
+"""
+import hashlib
+import logging
+
+from app.core.config import settings
+
+_log = logging.getLogger(__name__)
+
+try:  # 선택 의존성: 비암호 해시(xxh128), 미설치 시 sha256으로 폴백
+    import xxhash
+except ImportError:
+    xxhash = None
+
+
+def _sha256_hex(url: bytes, title: bytes, published: bytes) -> str:
+    h = hashlib.sha256(url)
+    h.update(b":")
+    h.update(title)
+    h.update(b":")
+    h.update(published)
+    return h.hexdigest()[:32]
+
+
+def _blake2b_hex(url: bytes, title: bytes, published: bytes) -> str:
+    h = hashlib.blake2b(url, digest_size=16)
+    h.update(b":")
+    h.update(title)
+    h.update(b":")
+    h.update(published)
+    return h.hexdigest()
+
+
+def _xxh128_hex(url: bytes, title: bytes, published: bytes) -> str:
+    h = xxhash.xxh3_128(url)
+    h.update(b":")
+    h.update(title)
+    h.update(b":")
+    h.update(published)
+    return h.hexdigest()
+
+
+def _select_hasher():
+    algo = (settings.HASH_ALGO or "sha256").lower()
+    if algo == "blake2b":
+        return _blake2b_hex
+    if algo in ("xxh128", "xxhash"):
+        if xxhash is not None:
+            return _xxh128_hex
+        _log.warning("HASH_ALGO=%s but xxhash is not installed; using sha256", algo)
+    elif algo != "sha256":
+        _log.warning("Unknown HASH_ALGO=%s; using sha256", algo)
+    return _sha256_hex
+
+
+_hasher = _select_hasher()
+
+
+def document_hash(url: str, title: str, published: str) -> str:
+    """문서 중복 판정 해시 (32자 hex)."""
+    return _hasher(url.encode(), title.encode(), published.encode())
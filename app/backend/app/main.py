@@ -10,16 +10,18 @@ import asyncio
 import logging
 import re
 import time
+import orjson
 from fastapi import FastAPI, Response, Request, HTTPException, Query
 from fastapi.exceptions import RequestValidationError
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse
 from starlette.middleware.gzip import GZipMiddleware
 from contextlib import asynccontextmanager
 from datetime import datetime
 
 from app.core.config import settings
 from app.core.redis import RedisClient
+from app.core.database import Database
 from app.core.log_masking import install_log_masking
 from app.middleware.rate_limit import RateLimitMiddleware
 from app.api.routes import router as main_router
@@ -38,6 +40,14 @@ from app.api.references_routes import router as references_router
 
 logger = logging.getLogger(__name__)
 
+
+class _ORJSONResponse(ORJSONResponse):
+    """기본 응답 클래스. jsonable_encoder가 int 키 dict를 그대로 두는 경우가 있어 NON_STR_KEYS 허용."""
+
+    def render(self, content) -> bytes:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Application lifespan handler."""
@@ -77,18 +87,43 @@ async def lifespan(app: FastAPI):
             logger.info("Daily collection schedule: enabled")
         except Exception as e:
             logger.warning("Daily schedule not started: %s", e)
+    alert_poll_task = None
+    if getattr(settings, "ENABLE_NIGHTLY_ALERT_BATCH", False):
+        try:
+            from app.scheduler import run_alert_batch_poll_loop
+            alert_poll_task = asyncio.create_task(run_alert_batch_poll_loop())
+            logger.info("Alert batch poll schedule: enabled")
+        except Exception as e:
+            logger.warning("Alert batch poll not started: %s", e)
 
     yield
 
-    if schedule_task and not schedule_task.done():
-        schedule_task.cancel()
-        try:
-            await schedule_task
-        except asyncio.CancelledError:
-            pass
+    for task in (schedule_task, alert_poll_task):
+        if task and not task.done():
+            task.cancel()
+            try:
+                await task
+            except asyncio.CancelledError:
+                pass
     # Shutdown
     logger.info("Shutting down %s", settings.APP_NAME)
+    try:
+        from app.observability.langsmith_tracer import get_tracer
+        await asyncio.to_thread(get_tracer().flush)
+    except Exception as e:
+        logger.debug("LangSmith flush skipped: %s", e)
+    try:
+        from app.services.alert_service import close_alert_service
+        await close_alert_service()
+    except Exception as e:
+        logger.debug("Alert service close skipped: %s", e)
+    try:
+        from app.parsers.llama_parser import shutdown_pdf_pool
+        await asyncio.to_thread(shutdown_pdf_pool)
+    except Exception as e:
+        logger.debug("PDF pool shutdown skipped: %s", e)
     RedisClient.close()
+    await Database.close()
 
 
 app = FastAPI(
@@ -114,7 +149,8 @@ app = FastAPI(
     - **Ragas**: Groundedness 등 수치화된 평가 지표
     """,
     version="2.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=_ORJSONResponse,
 )
 
 
@@ -6,8 +6,8 @@
 # ======================================================================
 
 """Pydantic models for API requests and responses."""
-from pydantic import BaseModel, Field
-from typing import List, Optional, Dict, Any
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, Optional, Dict, Any, Literal
 from datetime import datetime, timezone
 from enum import Enum
 
@@ -16,6 +16,10 @@ def _utc_now() -> datetime:
     return datetime.now(timezone.utc)
 
 
+# 응답 전용(생성 후 변경하지 않는) 모델: 불변
+_OUTBOUND_CONFIG = ConfigDict(frozen=True)
+
+
 class IndustryType(str, Enum):
     """Industry types for classification."""
     INSURANCE = "INSURANCE"
@@ -78,6 +82,8 @@ class DocumentListResponse(BaseModel):
 
 class ChunkResponse(BaseModel):
     """Document chunk response."""
+    model_config = _OUTBOUND_CONFIG
+
     chunk_id: str
     chunk_text: str
     chunk_index: int
@@ -121,6 +127,8 @@ class QARequest(BaseModel):
 
 class Citation(BaseModel):
     """Citation for answer."""
+    model_config = _OUTBOUND_CONFIG
+
     chunk_id: str
     document_id: str
     document_title: str
@@ -130,12 +138,22 @@ class Citation(BaseModel):
     parsing_source: Optional[str] = None  # e.g. "llamaparse_v1", "pdfplumber" (파싱 출처)
 
 
+class QAChecklistEntry(BaseModel):
+    """LLM이 답변과 함께 생성하는 행동지침 항목 (값은 LLM 출력이라 숫자도 문자열로 수용)."""
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    action: Optional[str] = None
+    target: Optional[str] = None
+    due_date_text: Optional[str] = None
+    penalty: Optional[str] = None
+
+
 class QAResponse(BaseModel):
     """Question answering response."""
     answer: str
     summary: str
     industry_impact: Dict[str, float]
-    checklist: Optional[List[Dict[str, Any]]] = None
+    checklist: Optional[List[QAChecklistEntry]] = None
     citations: List[Citation]
     confidence: float
     groundedness_score: float = 0.0
@@ -147,6 +165,14 @@ class QAResponse(BaseModel):
 
 # ==================== Topic/Alert Models ====================
 
+class RepresentativeDoc(BaseModel):
+    """Representative document of a topic cluster."""
+    document_id: Optional[str] = None
+    title: Optional[str] = None
+    url: Optional[str] = None
+    published_at: Optional[datetime] = None
+
+
 class TopicResponse(BaseModel):
     """Topic response model."""
     topic_id: str
@@ -156,7 +182,7 @@ class TopicResponse(BaseModel):
     time_window_end: datetime
     document_count: int
     surge_score: float
-    representative_documents: List[Dict[str, Any]]
+    representative_documents: List[RepresentativeDoc]
 
 
 class TopicListResponse(BaseModel):
@@ -220,6 +246,8 @@ class CollectionStatus(BaseModel):
 
 class QualityMetrics(BaseModel):
     """Quality metrics for RAG system."""
+    model_config = _OUTBOUND_CONFIG
+
     date: datetime
     groundedness: float
     hallucination_rate: float
@@ -253,12 +281,16 @@ class PolicySimulationRequest(BaseModel):
     theme: Optional[str] = None
 
 
+PolicyChangeType = Literal["added", "modified", "removed"]
+PolicyRiskLevel = Literal["high", "medium", "low"]
+
+
 class PolicyDiffItem(BaseModel):
     """Individual change item in a policy diff."""
     clause: str
-    change_type: str  # added | modified | removed
+    change_type: PolicyChangeType
     description: str
-    risk_level: str  # high | medium | low
+    risk_level: PolicyRiskLevel
     impacted_process: str
 
 
@@ -326,8 +358,19 @@ class AlertSubscriptionCreate(BaseModel):
     webhook_url: Optional[str] = None
 
 
+class Deadline(BaseModel):
+    """Key deadline extracted by urgency analysis (date: YYYY-MM-DD)."""
+    model_config = ConfigDict(coerce_numbers_to_str=True)
+
+    date: Optional[str] = None
+    description: Optional[str] = None
+    type: Optional[str] = None
+
+
 class SmartAlertResponse(BaseModel):
     """Enhanced alert response with urgency analysis."""
+    model_config = _OUTBOUND_CONFIG
+
     alert_id: str
     document_id: str
     document_title: str
@@ -336,7 +379,7 @@ class SmartAlertResponse(BaseModel):
     urgency_score: float = Field(..., ge=0, le=100)
     industries: List[IndustryType]
     impact_summary: str
-    key_deadlines: List[Dict[str, Any]]
+    key_deadlines: List[Deadline]
     action_items: List[str]
     affected_regulations: List[str]
     generated_at: datetime
@@ -373,6 +416,8 @@ class TimelineEventType(str, Enum):
 
 class TimelineEvent(BaseModel):
     """Policy timeline event."""
+    model_config = _OUTBOUND_CONFIG
+
     event_id: str
     document_id: str
     document_title: str
@@ -396,3 +441,4 @@ class TimelineExtractRequest(BaseModel):
     """Request to extract timeline from document."""
     document_id: str
     force_refresh: bool = False
+
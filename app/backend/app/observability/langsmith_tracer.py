@@ -16,10 +16,14 @@ Traces and monitors:
 """
 import logging
 import os
-from typing import Dict, Any, Optional, List
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+from typing import Dict, Any, Optional, List, Tuple
 from datetime import datetime
-import json
 
+import orjson
 from langsmith import Client
 from langsmith.run_trees import RunTree
 try:
@@ -32,6 +36,27 @@ from app.core.config import settings
 
 _log = logging.getLogger(__name__)
 
+# LangSmith 장애 시 요청마다 같은 오류가 쏟아지지 않도록 (단계, 예외 타입)별 주기당 1회만 기록
+_ERROR_LOG_INTERVAL_SEC = 60.0
+_error_log_state: Dict[Tuple[str, str], Tuple[float, int]] = {}
+_error_log_lock = threading.Lock()
+
+
+def _log_tracer_error(label: str, exc: BaseException) -> None:
+    """Log a tracer failure with traceback, at most once per interval per error kind."""
+    key = (label, type(exc).__name__)
+    now = time.monotonic()
+    with _error_log_lock:
+        last, suppressed = _error_log_state.get(key, (0.0, 0))
+        if last and now - last < _ERROR_LOG_INTERVAL_SEC:
+            _error_log_state[key] = (last, suppressed + 1)
+            return
+        _error_log_state[key] = (now, 0)
+    _log.warning(
+        "Error in LangSmith %s: %s (suppressed %d similar)",
+        label, exc, suppressed, exc_info=exc
+    )
+
 
 class LangSmithTracer:
     """LangSmith tracer for RAG system observability."""
@@ -39,6 +64,8 @@ class LangSmithTracer:
     def __init__(self):
         self.client = None
         self.tracer = None
+        # LangSmith HTTP(post/patch/feedback)는 단일 워커 스레드에서 순서대로 처리 → 요청 경로는 즉시 반환
+        self._executor: Optional[ThreadPoolExecutor] = None
         
         if settings.LANGSMITH_API_KEY:
             # 트레이싱 활성: API 키 + ENABLE_TRACING + LANGCHAIN_TRACING_V2 모두 true일 때만
@@ -61,15 +88,63 @@ class LangSmithTracer:
             self.tracer = LangChainTracer(
                 project_name=settings.LANGSMITH_PROJECT
             )
-    
-    def is_enabled(self) -> bool:
-        """LangSmith 트레이싱 활성 여부. API 키 + ENABLE_TRACING + LANGCHAIN_TRACING_V2 모두 True일 때."""
-        return (
+            
+            self._executor = ThreadPoolExecutor(
+                max_workers=1,
+                thread_name_prefix="langsmith-tracer"
+            )
+        
+        # settings는 프로세스 기동 시 고정 → 활성 여부를 한 번만 계산 (매 호출 getattr 제거)
+        self._enabled = bool(
             self.client is not None
             and getattr(settings, "ENABLE_TRACING", True)
             and getattr(settings, "LANGCHAIN_TRACING_V2", True)
         )
     
+    def is_enabled(self) -> bool:
+        """LangSmith 트레이싱 활성 여부. API 키 + ENABLE_TRACING + LANGCHAIN_TRACING_V2 모두 True일 때."""
+        return self._enabled
+    
+    @staticmethod
+    def _run_extra() -> Dict[str, Any]:
+        """Run metadata. 시각은 RunTree.start_time으로 기록되므로 별도 timestamp는 싣지 않음."""
+        # RunTree가 extra에 runtime 정보를 채워 넣으므로 run마다 새 dict
+        return {"metadata": {"project": settings.LANGSMITH_PROJECT}}
+    
+    def _submit(self, label: str, fn, *args, **kwargs):
+        """Run LangSmith I/O on the background worker (FIFO, so post precedes patch)."""
+        if self._executor is None:
+            return None
+        
+        def _job():
+            try:
+                fn(*args, **kwargs)
+            except Exception as e:
+                _log_tracer_error(label, e)
+        
+        try:
+            return self._executor.submit(_job)
+        except RuntimeError:
+            # executor already shut down
+            return None
+    
+    def flush(self, timeout: float = 5.0):
+        """Wait for queued LangSmith submissions (call on shutdown).
+        
+        Args:
+            timeout: Max seconds to wait
+        """
+        if self._executor is None:
+            return
+        
+        marker = self._submit("flush", lambda: None)
+        if marker is None:
+            return
+        try:
+            marker.result(timeout=timeout)
+        except FuturesTimeoutError:
+            _log.warning("LangSmith flush timed out after %ss", timeout)
+    
     def create_run(
         self,
         name: str,
@@ -96,22 +171,17 @@ class LangSmithTracer:
                 name=name,
                 run_type=run_type,
                 inputs=inputs or {},
-                extra={
-                    "metadata": {
-                        "project": settings.LANGSMITH_PROJECT,
-                        "timestamp": datetime.utcnow().isoformat()
-                    }
-                }
+                extra=self._run_extra()
             )
             
             if parent_run_id:
                 run.parent_run_id = parent_run_id
             
-            run.post()
+            self._submit("create_run", run.post)
             return run
             
         except Exception as e:
-            _log.warning("Error creating LangSmith run: %s", e)
+            _log_tracer_error("create_run", e)
             return None
     
     def end_run(
@@ -135,9 +205,9 @@ class LangSmithTracer:
                 run.end(error=error)
             else:
                 run.end(outputs=outputs or {})
-            run.patch()
+            self._submit("end_run", run.patch)
         except Exception as e:
-            _log.debug("Error ending LangSmith run: %s", e)
+            _log_tracer_error("end_run", e)
     
     def trace_rag_pipeline(
         self,
@@ -164,38 +234,47 @@ class LangSmithTracer:
         if not self.is_enabled():
             return None
         
+        # 샘플링·대형 질의 생략: 트레이서 비용을 요청 크기/RPS와 무관하게 상한
+        sample_rate = settings.TRACE_SAMPLE_RATE
+        if sample_rate < 1.0 and random.random() >= sample_rate:
+            return None
+        max_query_chars = settings.TRACE_MAX_QUERY_CHARS
+        if max_query_chars and len(query) > max_query_chars:
+            return None
+        
         try:
-            # Create main run
-            main_run = self.create_run(
+            # 하위 run은 메모리에서 트리로 구성하고 마지막에 한 번만 전송 (단계별 post/patch 왕복 제거)
+            main_run = RunTree(
                 name="rag_pipeline",
                 run_type="chain",
-                inputs={"query": query}
+                inputs={"query": query},
+                client=self.client,
+                extra=self._run_extra()
             )
             
-            if not main_run:
-                return None
-            
             # Trace query classification
-            self._trace_classification(main_run.id, query, query_type)
+            self._trace_classification(main_run, query, query_type)
             
             # Trace retrieval
-            self._trace_retrieval(main_run.id, query, retrieved_chunks)
+            self._trace_retrieval(main_run, query, retrieved_chunks)
             
             # Trace generation
-            self._trace_generation(main_run.id, query, retrieved_chunks, answer)
+            self._trace_generation(main_run, query, retrieved_chunks, answer)
             
-            # End main run
-            self.end_run(
-                main_run,
+            # End main run and submit the whole tree at once
+            main_run.end(
                 outputs={
                     "answer": answer,
                     "confidence": confidence,
                     "query_type": query_type
                 }
             )
+            self._submit("trace_rag_pipeline", main_run.post, exclude_child_runs=False)
             
             # Add feedback
-            self.client.create_feedback(
+            self._submit(
+                "create_feedback",
+                self.client.create_feedback,
                 main_run.id,
                 key="latency_ms",
                 score=latency_ms,
@@ -205,82 +284,85 @@ class LangSmithTracer:
             return main_run.id
             
         except Exception as e:
-            _log.warning("Error tracing RAG pipeline: %s", e)
+            _log_tracer_error("trace_rag_pipeline", e)
             return None
     
     def _trace_classification(
         self,
-        parent_run_id: str,
+        parent_run: RunTree,
         query: str,
         query_type: str
     ):
         """Trace query classification step."""
-        run = self.create_run(
+        run = parent_run.create_child(
             name="query_classification",
             run_type="chain",
-            inputs={"query": query},
-            parent_run_id=parent_run_id
+            inputs={"query": query}
         )
-        
-        if run:
-            self.end_run(
-                run,
-                outputs={"query_type": query_type}
-            )
+        run.end(outputs={"query_type": query_type})
     
     def _trace_retrieval(
         self,
-        parent_run_id: str,
+        parent_run: RunTree,
         query: str,
         retrieved_chunks: List[Dict[str, Any]]
     ):
         """Trace retrieval step."""
-        run = self.create_run(
+        run = parent_run.create_child(
             name="document_retrieval",
             run_type="retriever",
-            inputs={"query": query},
-            parent_run_id=parent_run_id
+            inputs={"query": query}
         )
+        # 청크별 dict 대신 열(column) 단위 리스트로 한 번에 구성 (SoA)
+        chunk_ids = []
+        titles = []
+        sims = []
+        for c in retrieved_chunks:
+            chunk_ids.append(c.get("chunk_id"))
+            titles.append(c.get("document_title"))
+            sims.append(c.get("similarity", 0))
         
-        if run:
-            self.end_run(
-                run,
-                outputs={
-                    "chunks": [
-                        {
-                            "chunk_id": c.get("chunk_id"),
-                            "document_title": c.get("document_title"),
-                            "similarity": c.get("similarity", 0)
-                        }
-                        for c in retrieved_chunks
-                    ],
-                    "chunk_count": len(retrieved_chunks)
-                }
-            )
+        run.end(
+            outputs={
+                "chunks": {
+                    "chunk_ids": chunk_ids,
+                    "document_titles": titles,
+                    "similarities": sims
+                },
+                "chunk_count": len(retrieved_chunks)
+            }
+        )
     
     def _trace_generation(
         self,
-        parent_run_id: str,
+        parent_run: RunTree,
         query: str,
         contexts: List[Dict[str, Any]],
         answer: str
     ):
-        """Trace LLM generation step."""
-        run = self.create_run(
+        """Trace LLM generation step.
+        
+        컨텍스트는 청크당 500자, 전체 MAX_TRACE_CONTEXT_CHARS까지만 싣는다.
+        """
+        budget = settings.MAX_TRACE_CONTEXT_CHARS
+        trace_contexts = []
+        for c in contexts:
+            if budget <= 0:
+                break
+            text = (c.get("chunk_text") or "")[:min(500, budget)]
+            trace_contexts.append(text)
+            budget -= len(text)
+        
+        run = parent_run.create_child(
             name="answer_generation",
             run_type="llm",
             inputs={
                 "query": query,
-                "contexts": [c.get("chunk_text", "")[:500] for c in contexts]
-            },
-            parent_run_id=parent_run_id
+                "contexts": trace_contexts,
+                "context_count": len(contexts)
+            }
         )
-        
-        if run:
-            self.end_run(
-                run,
-                outputs={"answer": answer}
-            )
+        run.end(outputs={"answer": answer})
     
     def trace_agent_workflow(
         self,
@@ -312,8 +394,10 @@ class LangSmithTracer:
                 return None
             
             # Trace each iteration
+            create_run = self.create_run
+            end_run = self.end_run
             for i, iteration in enumerate(iterations):
-                iter_run = self.create_run(
+                iter_run = create_run(
                     name=f"iteration_{i+1}",
                     run_type="chain",
                     inputs={"step": iteration.get("step")},
@@ -321,7 +405,7 @@ class LangSmithTracer:
                 )
                 
                 if iter_run:
-                    self.end_run(
+                    end_run(
                         iter_run,
                         outputs={
                             "result": iteration.get("result"),
@@ -338,7 +422,7 @@ class LangSmithTracer:
             return main_run.id
             
         except Exception as e:
-            _log.warning("Error tracing agent workflow: %s", e)
+            _log_tracer_error("trace_agent_workflow", e)
             return None
     
     def add_feedback(
@@ -359,15 +443,14 @@ class LangSmithTracer:
         if not self.is_enabled():
             return
         
-        try:
-            self.client.create_feedback(
-                run_id,
-                key=key,
-                score=score,
-                comment=comment
-            )
-        except Exception as e:
-            _log.debug("Error adding feedback: %s", e)
+        self._submit(
+            "add_feedback",
+            self.client.create_feedback,
+            run_id,
+            key=key,
+            score=score,
+            comment=comment
+        )
     
     def get_run_stats(
         self,
@@ -387,38 +470,42 @@ class LangSmithTracer:
             return {"error": "LangSmith not enabled"}
         
         try:
-            # Query runs
-            runs = list(self.client.list_runs(
+            # list_runs는 제너레이터 → 전체를 list로 만들지 않고 한 번 순회하며 집계
+            runs = self.client.list_runs(
                 project_name=settings.LANGSMITH_PROJECT,
                 start_time=start_time,
                 end_time=end_time,
                 execution_order=1  # Only root runs
-            ))
-            
-            # Calculate stats
-            total_runs = len(runs)
-            avg_latency = sum(
-                (r.end_time - r.start_time).total_seconds() * 1000
-                for r in runs if r.end_time and r.start_time
-            ) / total_runs if total_runs > 0 else 0
+            )
             
-            error_count = sum(1 for r in runs if r.error)
+            total_runs = 0
+            latency_sum = 0.0
+            error_count = 0
+            recent = []
+            for r in runs:
+                total_runs += 1
+                latency_ms = (
+                    (r.end_time - r.start_time).total_seconds() * 1000
+                    if r.end_time and r.start_time else None
+                )
+                if latency_ms is not None:
+                    latency_sum += latency_ms
+                if r.error:
+                    error_count += 1
+                if len(recent) < 10:  # Last 10 runs
+                    recent.append({
+                        "id": r.id,
+                        "name": r.name,
+                        "status": "error" if r.error else "success",
+                        "latency_ms": latency_ms
+                    })
             
             return {
                 "total_runs": total_runs,
-                "avg_latency_ms": avg_latency,
+                "avg_latency_ms": latency_sum / total_runs if total_runs > 0 else 0,
                 "error_count": error_count,
                 "error_rate": error_count / total_runs if total_runs > 0 else 0,
-                "runs": [
-                    {
-                        "id": r.id,
-                        "name": r.name,
-                        "status": "error" if r.error else "success",
-                        "latency_ms": (r.end_time - r.start_time).total_seconds() * 1000
-                        if r.end_time and r.start_time else None
-                    }
-                    for r in runs[:10]  # Last 10 runs
-                ]
+                "runs": recent
             }
             
         except Exception as e:
@@ -442,33 +529,41 @@ class LangSmithTracer:
             return
         
         try:
-            runs = list(self.client.list_runs(
+            runs = self.client.list_runs(
                 project_name=settings.LANGSMITH_PROJECT,
                 start_time=start_time,
                 end_time=end_time
-            ))
-            
-            traces = []
-            for run in runs:
-                traces.append({
-                    "id": str(run.id),
-                    "name": run.name,
-                    "run_type": run.run_type,
-                    "start_time": run.start_time.isoformat() if run.start_time else None,
-                    "end_time": run.end_time.isoformat() if run.end_time else None,
-                    "inputs": run.inputs,
-                    "outputs": run.outputs,
-                    "error": run.error,
-                    "parent_run_id": str(run.parent_run_id) if run.parent_run_id else None
-                })
+            )
             
-            with open(output_path, 'w', encoding='utf-8') as f:
-                json.dump(traces, f, ensure_ascii=False, indent=2)
+            # run 단위로 직렬화해 바로 기록 → 메모리는 trace 1건 분량만 사용
+            count = 0
+            with open(output_path, "wb") as f:
+                f.write(b"[\n")
+                for run in runs:
+                    if count:
+                        f.write(b",\n")
+                    f.write(orjson.dumps(
+                        {
+                            "id": str(run.id),
+                            "name": run.name,
+                            "run_type": run.run_type,
+                            "start_time": run.start_time.isoformat() if run.start_time else None,
+                            "end_time": run.end_time.isoformat() if run.end_time else None,
+                            "inputs": run.inputs,
+                            "outputs": run.outputs,
+                            "error": run.error,
+                            "parent_run_id": str(run.parent_run_id) if run.parent_run_id else None
+                        },
+                        option=orjson.OPT_INDENT_2,
+                        default=str
+                    ))
+                    count += 1
+                f.write(b"\n]\n")
             
-            _log.info("Exported %s traces to %s", len(traces), output_path)
+            _log.info("Exported %s traces to %s", count, output_path)
 
         except Exception as e:
-            _log.warning("Error exporting traces: %s", e)
+            _log_tracer_error("export_traces", e)
 
 
 # ============ Decorator for Easy Tracing ============
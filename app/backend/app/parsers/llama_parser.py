@@ -10,9 +10,16 @@
 Handles: HWP, PDF with tables, images, and complex layouts.
 Converts to structured markdown format.
 """
+import asyncio
+import codecs
+import hashlib
 import logging
+import multiprocessing
 import os
+import re
 import tempfile
+import threading
+from concurrent.futures import ProcessPoolExecutor
 from typing import List, Dict, Any, Optional
 from pathlib import Path
 import aiohttp
@@ -22,12 +29,112 @@ from app.core.config import settings
 
 _log = logging.getLogger(__name__)
 
+# 마크다운 표 구분행 (|---|:--:|) — 표 추출은 줄 단위 스캔으로, 중첩 수량자 정규식의 역추적 회피
+_TABLE_SEP_RE = re.compile(r"\|[-:\s|]+\|")
+# HWP BodyText 디코딩 시 제거할 제어 문자 (\t \n \r 제외) — str.translate 테이블 (정규식 불필요)
+_HWP_DROP = dict.fromkeys([*range(0x00, 0x09), 0x0B, 0x0C, *range(0x0E, 0x20)])
+# HWP 스트림 읽기 단위 (UTF-16 짝수 바이트)
+_HWP_READ_SIZE = 64 * 1024
+
+# 이 페이지 수 미만이면 프로세스 기동 비용이 더 커서 단일 프로세스로 추출
+_PARALLEL_MIN_PAGES = 8
+
+
+def _get_max_workers() -> int:
+    if settings.PDF_PARSE_WORKERS > 0:
+        return settings.PDF_PARSE_WORKERS
+    return max(1, min(4, os.cpu_count() or 1))
+
+
+_pdf_pool: Optional[ProcessPoolExecutor] = None
+_pdf_pool_lock = threading.Lock()
+
+
+def _get_pdf_pool() -> ProcessPoolExecutor:
+    """PDF 페이지 추출용 프로세스 풀 (최초 사용 시 1회 생성, 프로세스 수명 동안 재사용).
+
+    spawn 컨텍스트로 띄워 이벤트 루프·DB/Redis 커넥션 등 부모 상태를 fork로 물려받지 않음.
+    """
+    global _pdf_pool
+    if _pdf_pool is None:
+        with _pdf_pool_lock:
+            if _pdf_pool is None:
+                _pdf_pool = ProcessPoolExecutor(
+                    max_workers=_get_max_workers(),
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+    return _pdf_pool
+
+
+def shutdown_pdf_pool() -> None:
+    """앱 종료 시 PDF 프로세스 풀 정리 (lifespan shutdown에서 호출)."""
+    global _pdf_pool
+    with _pdf_pool_lock:
+        pool, _pdf_pool = _pdf_pool, None
+    if pool is not None:
+        pool.shutdown(wait=True, cancel_futures=True)
+
+
+def _extract_page_range(args: tuple) -> List[tuple]:
+    """pdfplumber로 [start, end) 페이지의 텍스트·표 추출 (프로세스 풀 워커용, 모듈 수준 함수).
+
+    워커마다 PDF를 한 번만 열고 페이지 블록을 처리해 열기 비용을 분산.
+    """
+    import pdfplumber
+
+    file_path, start, end = args
+    out: List[tuple] = []
+    with pdfplumber.open(file_path) as pdf:
+        for i in range(start, end):
+            page = pdf.pages[i]
+            text = (page.extract_text() or "").strip()
+            out.append((i + 1, text, page.extract_tables()))
+            page.flush_cache()
+    return out
+
+
+def _hash_file(file_path: str) -> str:
+    """파일 내용 sha256 (1MB 단위 스트리밍)."""
+    h = hashlib.sha256()
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+def _pdfplumber_page_count(file_path: str) -> int:
+    import pdfplumber
+
+    with pdfplumber.open(file_path) as pdf:
+        return len(pdf.pages)
+
+
+def _pymupdf_page_texts(file_path: str) -> Dict[int, str]:
+    """페이지 번호 → PyMuPDF 텍스트 (빈 페이지 제외). 로드 실패 시 빈 dict."""
+    out: Dict[int, str] = {}
+    try:
+        import fitz  # PyMuPDF
+
+        doc = fitz.open(file_path)
+        try:
+            for idx in range(len(doc)):
+                t = (doc[idx].get_text("text") or "").strip()
+                if t:
+                    out[idx + 1] = t
+        finally:
+            doc.close()
+    except Exception as e:
+        _log.debug("PyMuPDF 보조 로드 실패(무시 가능): %s", e)
+    return out
+
 
 class LlamaDocumentParser:
     """Advanced document parser using LlamaParse."""
     
     def __init__(self):
         self.parser = None
+        # 문서·첨부가 병렬로 들어와도 LlamaParse 호출은 프로세스 전체에서 N건으로 제한
+        self._api_sem = asyncio.Semaphore(max(1, settings.LLAMAPARSE_CONCURRENCY))
         if settings.LLAMAPARSE_API_KEY:
             # 슬림 이미지: llama-parse 미설치 시 API 없이 폴백만 사용
             try:
@@ -57,13 +164,15 @@ class LlamaDocumentParser:
         
         try:
             # Load and parse with LlamaParse
-            documents = await self.parser.aload_data(file_path)
+            async with self._api_sem:
+                documents = await self.parser.aload_data(file_path)
             
             if not documents:
                 return await self._fallback_pdf_parse(file_path)
             
-            # Combine all pages
-            full_text = "\n\n".join([doc.text for doc in documents])
+            # Combine all pages (페이지 텍스트는 한 번만 materialize해 text/pages에 공유)
+            page_texts = [doc.text for doc in documents]
+            full_text = "\n\n".join(page_texts)
             
             # Extract tables using regex patterns
             tables = self._extract_tables_from_markdown(full_text)
@@ -77,7 +186,7 @@ class LlamaDocumentParser:
             
             return {
                 "text": full_text,
-                "pages": [doc.text for doc in documents],
+                "pages": page_texts,
                 "tables": tables,
                 "metadata": metadata
             }
@@ -102,76 +211,166 @@ class LlamaDocumentParser:
         return await self._fallback_hwp_parse(file_path)
     
     async def parse_file(self, file_path: str, file_type: str) -> Dict[str, Any]:
-        """Parse file based on type."""
+        """Parse file based on type (동일 파일 내용은 Redis 캐시 결과 재사용)."""
+        from app.core.cache_helper import cache_get, cache_set, CACHE_TTL_PARSED_DOCUMENT
+
         file_type = file_type.lower()
-        
+        if file_type not in ("pdf", "hwp", "hwpx"):
+            raise ValueError(f"Unsupported file type: {file_type}")
+
+        cache_key = None
+        try:
+            digest = await asyncio.to_thread(_hash_file, file_path)
+            cache_key = f"parser:v1:{file_type}:{digest}"
+            cached = cache_get(cache_key)
+            if cached is not None:
+                return cached
+        except OSError as e:
+            _log.debug("Parse cache key skipped for %s: %s", file_path, e)
+
         if file_type == "pdf":
-            return await self.parse_pdf(file_path)
-        elif file_type in ["hwp", "hwpx"]:
-            return await self.parse_hwp(file_path)
+            result = await self.parse_pdf(file_path)
         else:
-            raise ValueError(f"Unsupported file type: {file_type}")
+            result = await self.parse_hwp(file_path)
+
+        # 빈 결과(파싱 실패·미설치 폴백)는 캐시하지 않음 — 다음 시도에서 다시 파싱
+        if cache_key and (result.get("text") or "").strip():
+            cache_set(cache_key, result, CACHE_TTL_PARSED_DOCUMENT)
+        return result
     
     def _extract_tables_from_markdown(self, markdown_text: str) -> List[Dict[str, Any]]:
-        """Extract tables from markdown text."""
-        import re
-        
+        """Extract tables from markdown text.
+
+        전체 문서를 줄 단위로 나누지 않고 str.find로 '|'가 있는 줄로만 건너뛰며 스캔
+        (표가 드문 장문에서 대부분의 텍스트를 C 수준 memchr로 통과).
+        """
+        # 표는 최소 헤더행 + 구분행(각 '|' 2개)이 필요 — 산문 위주 문서는 스캔 없이 즉시 반환
+        if markdown_text.count("|") < 4:
+            return []
+
         tables = []
-        
-        # Find markdown tables
-        table_pattern = r'\|([^\n]*)\|\n\|[-:\s|]+\|\n((?:\|[^\n]*\|\n?)*)'
-        matches = re.findall(table_pattern, markdown_text)
-        
-        for i, (header_line, body_lines) in enumerate(matches):
-            # Parse header
-            headers = [h.strip() for h in header_line.split('|') if h.strip()]
-            
+        text = markdown_text
+        n = len(text)
+        pos = 0
+
+        def _line_at(start: int) -> tuple:
+            end = text.find("\n", start)
+            if end == -1:
+                end = n
+            return text[start:end].strip(), end + 1
+
+        def _is_row(line: str) -> bool:
+            return len(line) > 1 and line[0] == "|" and line[-1] == "|"
+
+        def _cells(line: str) -> List[str]:
+            return [c for c in (x.strip() for x in line.split("|")) if c]
+
+        # Find markdown tables: 헤더행 + 구분행 + 연속된 본문행
+        while pos < n:
+            bar = text.find("|", pos)
+            if bar == -1:
+                break
+            line_start = text.rfind("\n", 0, bar) + 1
+            header_line, next_start = _line_at(line_start)
+            if not _is_row(header_line) or next_start > n:
+                pos = next_start
+                continue
+            sep_line, body_start = _line_at(next_start)
+            if not _TABLE_SEP_RE.fullmatch(sep_line):
+                pos = next_start
+                continue
+
             # Parse body rows
             rows = []
-            for line in body_lines.strip().split('\n'):
-                if line.strip():
-                    cells = [c.strip() for c in line.split('|') if c.strip()]
-                    if cells:
-                        rows.append(cells)
-            
+            pos = body_start
+            while pos < n:
+                line, after = _line_at(pos)
+                if not _is_row(line):
+                    break
+                cells = _cells(line)
+                if cells:
+                    rows.append(cells)
+                pos = after
+
+            headers = _cells(header_line)
             tables.append({
-                "table_id": i,
+                "table_id": len(tables),
                 "headers": headers,
                 "rows": rows,
                 "row_count": len(rows),
                 "column_count": len(headers)
             })
-        
+
         return tables
-    
+
     async def _fallback_pdf_parse(self, file_path: str) -> Dict[str, Any]:
-        """Fallback: pdfplumber(표·레이아웃) + PyMuPDF(한글·CID 폰트 등 보조 추출)."""
-        import pdfplumber
+        """Fallback: PyMuPDF(MuPDF C 엔진) 우선, 실패·텍스트 없음 시 pdfplumber 경로."""
+        try:
+            result = await asyncio.to_thread(self._fallback_pdf_parse_pymupdf, file_path)
+            if result["text"].strip():
+                return result
+            _log.info("PyMuPDF 텍스트 없음, pdfplumber 폴백: %s", file_path)
+        except Exception as e:
+            _log.info("PyMuPDF 파싱 실패, pdfplumber 폴백: %s", e)
+        return await self._fallback_pdf_parse_pdfplumber(file_path)
+
+    def _fallback_pdf_parse_pymupdf(self, file_path: str) -> Dict[str, Any]:
+        """PyMuPDF 단독 추출 — 텍스트는 get_text, 표는 find_tables (PyMuPDF 1.23+)."""
+        import fitz  # PyMuPDF
+
+        text_parts: List[str] = []
+        tables: List[Dict[str, Any]] = []
+        doc = fitz.open(file_path)
+        try:
+            page_count = doc.page_count
+            for idx in range(page_count):
+                page = doc[idx]
+                page_no = idx + 1
+                page_text = (page.get_text("text") or "").strip()
+                if page_text:
+                    text_parts.append(f"## Page {page_no}\n\n{page_text}")
+
+                finder = getattr(page, "find_tables", None)
+                if finder is None:
+                    continue
+                for tab in finder().tables:
+                    table = tab.extract()
+                    if table and len(table) > 1:
+                        tables.append({
+                            "table_id": len(tables),
+                            "headers": table[0],
+                            "rows": table[1:],
+                            "row_count": len(table) - 1,
+                            "column_count": len(table[0]),
+                            "page": page_no,
+                        })
+        finally:
+            doc.close()
+
+        return {
+            "text": "\n\n".join(text_parts),
+            "pages": text_parts,
+            "tables": tables,
+            "metadata": {
+                "total_pages": page_count,
+                "file_type": "pdf",
+                "parser": "pymupdf",
+                "pymupdf_assisted_pages": 0,
+            },
+        }
 
+    async def _fallback_pdf_parse_pdfplumber(self, file_path: str) -> Dict[str, Any]:
+        """Fallback: pdfplumber(표·레이아웃) + PyMuPDF(한글·CID 폰트 등 보조 추출)."""
         text_parts: List[str] = []
         tables: List[Dict[str, Any]] = []
         page_count = 0
         used_pymupdf_pages = 0
 
         # 페이지별 PyMuPDF 텍스트 (pdfplumber가 비었을 때만 사용)
-        fitz_text_by_page: Dict[int, str] = {}
-        try:
-            import fitz  # PyMuPDF
-
-            doc = fitz.open(file_path)
-            try:
-                for idx in range(len(doc)):
-                    raw = doc[idx].get_text("text") or ""
-                    t = raw.strip()
-                    if t:
-                        fitz_text_by_page[idx + 1] = t
-            finally:
-                doc.close()
-        except Exception as e:
-            _log.debug("PyMuPDF 보조 로드 실패(무시 가능): %s", e)
+        fitz_text_by_page = await asyncio.to_thread(_pymupdf_page_texts, file_path)
 
         try:
-            pdf_ctx = pdfplumber.open(file_path)
+            page_count = await asyncio.to_thread(_pdfplumber_page_count, file_path)
         except Exception as e:
             _log.warning("pdfplumber 파일 열기 실패, PyMuPDF 단독 폴백: %s", e)
             if not fitz_text_by_page:
@@ -191,30 +390,25 @@ class LlamaDocumentParser:
                 },
             }
 
-        with pdf_ctx as pdf:
-            page_count = len(pdf.pages)
-            for i, page in enumerate(pdf.pages):
-                page_no = i + 1
-                page_text = (page.extract_text() or "").strip()
-                alt = fitz_text_by_page.get(page_no, "")
-                # 국내 PDF: pdfplumber만 빈 문자열인 경우가 많아 PyMuPDF로 보강
-                if len(page_text) < 8 and len(alt) > len(page_text):
-                    page_text = alt
-                    used_pymupdf_pages += 1
-                if page_text:
-                    text_parts.append(f"## Page {page_no}\n\n{page_text}")
+        for page_no, page_text, page_tables in await self._extract_pdfplumber_pages(file_path, page_count):
+            alt = fitz_text_by_page.get(page_no, "")
+            # 국내 PDF: pdfplumber만 빈 문자열인 경우가 많아 PyMuPDF로 보강
+            if len(page_text) < 8 and len(alt) > len(page_text):
+                page_text = alt
+                used_pymupdf_pages += 1
+            if page_text:
+                text_parts.append(f"## Page {page_no}\n\n{page_text}")
 
-                page_tables = page.extract_tables()
-                for table in page_tables:
-                    if table and len(table) > 1:
-                        tables.append({
-                            "table_id": len(tables),
-                            "headers": table[0] if table else [],
-                            "rows": table[1:] if len(table) > 1 else [],
-                            "row_count": len(table) - 1 if table else 0,
-                            "column_count": len(table[0]) if table else 0,
-                            "page": page_no,
-                        })
+            for table in page_tables:
+                if table and len(table) > 1:
+                    tables.append({
+                        "table_id": len(tables),
+                        "headers": table[0] if table else [],
+                        "rows": table[1:] if len(table) > 1 else [],
+                        "row_count": len(table) - 1 if table else 0,
+                        "column_count": len(table[0]) if table else 0,
+                        "page": page_no,
+                    })
 
         parser_label = "pdfplumber"
         if used_pymupdf_pages > 0:
@@ -237,7 +431,29 @@ class LlamaDocumentParser:
             },
         }
     
+    async def _extract_pdfplumber_pages(self, file_path: str, page_count: int) -> List[tuple]:
+        """페이지별 (page_no, text, tables) — 큰 PDF는 페이지 블록 단위로 프로세스 풀에 분산.
+
+        pdfminer 파싱은 순수 파이썬 CPU 작업이라 스레드보다 프로세스가 GIL 경합 없이 확장됨.
+        """
+        workers = _get_max_workers()
+        if page_count < _PARALLEL_MIN_PAGES or workers <= 1:
+            return await asyncio.to_thread(_extract_page_range, (file_path, 0, page_count))
+
+        block = -(-page_count // workers)
+        ranges = [(file_path, s, min(s + block, page_count)) for s in range(0, page_count, block)]
+        loop = asyncio.get_running_loop()
+        pool = _get_pdf_pool()
+        parts = await asyncio.gather(
+            *[loop.run_in_executor(pool, _extract_page_range, r) for r in ranges]
+        )
+        return [page for part in parts for page in part]
+
     async def _fallback_hwp_parse(self, file_path: str) -> Dict[str, Any]:
+        """Fallback HWP parser using olefile (디스크 I/O·디코딩은 워커 스레드에서)."""
+        return await asyncio.to_thread(self._fallback_hwp_parse_sync, file_path)
+
+    def _fallback_hwp_parse_sync(self, file_path: str) -> Dict[str, Any]:
         """Fallback HWP parser using olefile."""
         try:
             import olefile
@@ -257,15 +473,16 @@ class LlamaDocumentParser:
             
             # HWP files store text in "BodyText" stream
             if ole.exists('BodyText/Section0'):
-                body_text = ole.openstream('BodyText/Section0').read()
-                # HWP uses UTF-16LE encoding
+                stream = ole.openstream('BodyText/Section0')
+                # HWP uses UTF-16LE encoding — 64KB 단위로 증분 디코딩하며 제어 문자 제거 (1패스)
                 try:
-                    decoded = body_text.decode('utf-16le', errors='ignore')
-                    # Remove control characters
-                    import re
-                    cleaned = re.sub(r'[\x00-\x08\x0b-\x0c\x0e-\x1f]', '', decoded)
-                    text_parts.append(cleaned)
-                except:
+                    decoder = codecs.getincrementaldecoder('utf-16-le')(errors='ignore')
+                    pieces = []
+                    for block in iter(lambda: stream.read(_HWP_READ_SIZE), b""):
+                        pieces.append(decoder.decode(block).translate(_HWP_DROP))
+                    pieces.append(decoder.decode(b"", final=True).translate(_HWP_DROP))
+                    text_parts.append("".join(pieces))
+                except Exception:
                     pass
             
             ole.close()
@@ -314,26 +531,49 @@ class TableAwareChunker:
     def chunk_document(self, parsed_doc: Dict[str, Any]) -> List[Dict[str, Any]]:
         """전체 텍스트를 RecursiveCharacter 기반으로 분할 후 표 연관성 표시."""
         from app.chunking.recursive_split import split_text_recursive
+        from app.chunking.token_count import count_tokens
 
         text = parsed_doc.get("text", "") or ""
         tables = parsed_doc.get("tables", [])
         pieces = split_text_recursive(text, self.chunk_size, self.chunk_overlap)
+
+        # 표 텍스트·헤더 인덱스는 문서당 1회만 계산 (청크×표 반복 변환 제거)
+        table_prefixes = [self._table_to_text(t)[:120] for t in tables]
+        header_to_tables: Dict[str, List[int]] = {}
+        for ti, table in enumerate(tables):
+            for h in table.get("headers") or []:
+                key = str(h).strip().lower() if h is not None else ""
+                if key:
+                    header_to_tables.setdefault(key, []).append(ti)
+
+        # 헤더 전체를 하나의 alternation으로 청크당 1회 스캔. 전방탐색으로 모든 위치를 보고,
+        # 같은 위치에서 긴 헤더만 잡히는 경우를 위해 각 헤더에 포함된 다른 헤더의 표까지 미리 합쳐 둠.
+        header_re = None
+        tables_for_hit: Dict[str, set] = {}
+        if header_to_tables:
+            headers_by_len = sorted(header_to_tables, key=len, reverse=True)
+            header_re = re.compile("(?=(" + "|".join(re.escape(h) for h in headers_by_len) + "))")
+            for h in headers_by_len:
+                tables_for_hit[h] = {
+                    ti for g in headers_by_len if g in h for ti in header_to_tables[g]
+                }
+
+        pieces = [p.strip() for p in pieces]
+        token_counts = count_tokens(pieces)
+
         chunks: List[Dict[str, Any]] = []
         for i, chunk_text in enumerate(pieces):
-            row_tables: List[Dict[str, Any]] = []
             ct_lower = chunk_text.lower()
-            for table in tables:
-                tbl_txt = self._table_to_text(table)
-                headers = table.get("headers") or []
-                if tbl_txt and (tbl_txt[:120] in chunk_text or any((h or "") in chunk_text for h in headers)):
-                    row_tables.append(table)
-                elif headers and any(str(h).lower() in ct_lower for h in headers if h):
-                    row_tables.append(table)
+            assigned = {ti for ti, prefix in enumerate(table_prefixes) if prefix and prefix in chunk_text}
+            if header_re is not None:
+                for hit in set(header_re.findall(ct_lower)):
+                    assigned.update(tables_for_hit[hit])
+            row_tables = [tables[ti] for ti in sorted(assigned)]
             chunks.append({
                 "chunk_index": i,
-                "chunk_text": chunk_text.strip(),
+                "chunk_text": chunk_text,
                 "tables": row_tables,
-                "token_count": len(chunk_text.split()),
+                "token_count": token_counts[i],
                 "chunking_version": "recursive_ko_v1",
             })
         return chunks
@@ -11,18 +11,60 @@ Pipeline: Collector → Parser → Chunker → Embedder → Supabase(pgvector)
 """
 import asyncio
 import hashlib
+import io
 import logging
+import random
+import threading
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any, Optional
 from dataclasses import dataclass
+from functools import lru_cache
+from html import unescape
+from time import monotonic_ns
 import json
+import re
+
+import aiohttp
 
 from app.core.config import settings
-from app.core.database import get_db
-from langchain_openai import OpenAIEmbeddings
+from app.core.hashing import document_hash
+from app.core.database import get_db, is_missing_rpc_error
+from app.core.embeddings import get_embeddings
 
 _log = logging.getLogger(__name__)
 
+try:  # lxml(libxml2, C) 설치 시 우선 사용 — 순수 파이썬 html.parser 대비 수 배 빠름
+    import lxml  # noqa: F401
+
+    _HTML_PARSER = "lxml"
+except ImportError:
+    _HTML_PARSER = "html.parser"
+
+try:  # 선택 의존성: selectolax(C) — 파이썬 노드 트리를 만들지 않아 본문 추출이 가장 빠름
+    from selectolax.parser import HTMLParser as _SelectolaxParser
+except ImportError:
+    _SelectolaxParser = None
+
+
+def _html_to_text(html: str) -> str:
+    """HTML 본문 텍스트 추출 (텍스트 노드별 strip, 줄바꿈 결합).
+
+    settings.HTML_PARSER: auto(selectolax → BeautifulSoup) | selectolax | lxml | html.parser.
+    """
+    backend = (settings.HTML_PARSER or "auto").lower()
+    if _SelectolaxParser is not None and backend in ("auto", "selectolax"):
+        tree = _SelectolaxParser(html)
+        # BeautifulSoup.get_text와 동일하게 script/style 내용 제외
+        tree.strip_tags(["script", "style"])
+        root = tree.root
+        return root.text(separator="\n", strip=True) if root is not None else ""
+    from bs4 import BeautifulSoup
+
+    # selectolax·lxml 미설치 시 설치된 파서 중 가장 빠른 것으로 대체
+    bs_parser = "html.parser" if backend == "html.parser" else _HTML_PARSER
+    return BeautifulSoup(html, bs_parser).get_text(separator="\n", strip=True)
+
 
 @dataclass
 class DocumentIngestionResult:
@@ -38,6 +80,29 @@ class DocumentIngestionResult:
     processing_time_ms: int = 0
 
 
+@lru_cache(maxsize=4096)
+def _parse_feed_date(date_str: str) -> Optional[datetime]:
+    """RSS 날짜 파싱 (반복 문자열 캐시). 실패 시 None — 현재 시각 대체는 호출부에서.
+
+    금융위 RSS는 RFC 822 형식이라 email.utils로 바로 처리하고, 그 외 형식만 feedparser로 폴백.
+    """
+    try:
+        dt = parsedate_to_datetime(date_str)
+        return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+    except (TypeError, ValueError, IndexError):
+        pass
+    import feedparser
+    try:
+        struct_time = feedparser._parse_date(date_str)
+        if struct_time:
+            # Convert struct_time to UTC-aware datetime
+            dt = datetime(*struct_time[:6])
+            return dt.replace(tzinfo=timezone.utc)
+    except Exception:
+        pass
+    return None
+
+
 class RSSCollector:
     """금융위 RSS 수집기 (1일 4회 체크)."""
     
@@ -48,25 +113,43 @@ class RSSCollector:
         "0411": "카드뉴스"
     }
     
+    FETCH_TIMEOUT = aiohttp.ClientTimeout(total=30)
+    
     def __init__(self):
         self.db = get_db()
     
+    @staticmethod
+    async def _download(session: aiohttp.ClientSession, url: str) -> bytes:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+    
     def _get_rss_url(self, fid: str) -> str:
         return f"{settings.FSC_RSS_BASE}?fid={fid}"
     
     def _generate_hash(self, url: str, title: str, published: str) -> str:
-        content = f"{url}:{title}:{published}"
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        return document_hash(url, title, published)
     
-    async def fetch_feed(self, fid: str, base_url: str = None) -> List[Dict[str, Any]]:
-        """RSS 피드 수집."""
+    async def fetch_feed(
+        self,
+        fid: str,
+        base_url: str = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> List[Dict[str, Any]]:
+        """RSS 피드 수집 (비동기 다운로드 후 feedparser는 파싱만 수행)."""
         import feedparser
         
         url = (base_url + f"?fid={fid}") if base_url else self._get_rss_url(fid)
         _log.debug("Fetching RSS feed from: %s", url)
         
         try:
-            feed = feedparser.parse(url)
+            if session is None:
+                async with aiohttp.ClientSession(timeout=self.FETCH_TIMEOUT) as own_session:
+                    body = await self._download(own_session, url)
+            else:
+                body = await self._download(session, url)
+            # XML 파싱은 CPU 작업이므로 스레드에서 (gather 중 다른 피드 다운로드를 막지 않음)
+            feed = await asyncio.to_thread(feedparser.parse, body)
             documents = []
             
             if not feed.entries:
@@ -117,16 +200,8 @@ class RSSCollector:
             return []
     
     def _parse_date(self, date_str: str) -> datetime:
-        import feedparser
-        try:
-            struct_time = feedparser._parse_date(date_str)
-            if struct_time:
-                # Convert struct_time to UTC-aware datetime
-                dt = datetime(*struct_time[:6])
-                return dt.replace(tzinfo=timezone.utc)
-        except:
-            pass
-        return datetime.now(timezone.utc)
+        parsed = _parse_feed_date(date_str) if date_str else None
+        return parsed if parsed is not None else datetime.now(timezone.utc)
     
     async def collect_all(self, job_id: Optional[str] = None) -> Dict[str, Any]:
         """모든 RSS 피드 수집."""
@@ -147,37 +222,63 @@ class RSSCollector:
             _log.warning("Error fetching sources: %s", e)
             return {"error": str(e)}
         
+        targets = []
         for fid in settings.FSC_RSS_FIDS:
-            if job_id:
-                job_tracker.update_job(job_id, stage="collecting", message=f"Fetching feed {fid}...")
+            source_rec = fid_map.get(fid)
+            if not source_rec:
+                _log.debug("No source record found for fid %s, skipping", fid)
+                continue
+            if not source_rec.get("active", True):
+                _log.debug("Source for fid %s is inactive, skipping", fid)
+                continue
+            targets.append((fid, source_rec))
+        
+        if job_id:
+            job_tracker.update_job(
+                job_id, stage="collecting", message=f"Fetching {len(targets)} feeds..."
+            )
+        
+        # 피드 다운로드는 세션 하나로 병렬 수행 (이벤트 루프 블로킹 없음)
+        async with aiohttp.ClientSession(timeout=self.FETCH_TIMEOUT) as session:
+            fetched = await asyncio.gather(
+                *[self.fetch_feed(fid, rec.get("base_url"), session=session) for fid, rec in targets],
+                return_exceptions=True,
+            )
+        
+        from fastapi.encoders import jsonable_encoder
+        
+        # 중복 체크 (hash) — 항목별 조회 대신 IN 쿼리 일괄 조회 후 메모리에서 판별
+        all_hashes = [
+            doc["hash"]
+            for documents in fetched
+            if not isinstance(documents, BaseException)
+            for doc in documents
+        ]
+        existing_hashes = set()
+        try:
+            for i in range(0, len(all_hashes), 100):
+                existing_res = self.db.table("documents").select("hash").in_(
+                    "hash", all_hashes[i : i + 100]
+                ).execute()
+                existing_hashes.update(r["hash"] for r in (existing_res.data or []))
+        except Exception as e:
+            _log.warning("Error batch checking hashes: %s", e)
+        
+        for (fid, source_rec), documents in zip(targets, fetched):
             try:
-                source_rec = fid_map.get(fid)
-                if not source_rec:
-                    _log.debug("No source record found for fid %s, skipping", fid)
-                    continue
-
-                if not source_rec.get("active", True):
-                    _log.debug("Source for fid %s is inactive, skipping", fid)
-                    continue
-                    
-                source_uuid = source_rec["source_id"]
-                base_url = source_rec.get("base_url")
+                if isinstance(documents, BaseException):
+                    raise documents
                 
-                documents = await self.fetch_feed(fid, base_url)
+                source_uuid = source_rec["source_id"]
                 
+                new_docs = []
                 for doc in documents:
-                    # 중복 체크 (hash)
-                    existing = self.db.table("documents").select("document_id").eq(
-                        "hash", doc["hash"]
-                    ).execute()
-                    
-                    if existing.data:
+                    if doc["hash"] in existing_hashes:
                         results["total_existing"] += 1
                         continue
-                    
-                    # 신규 문서 저장 (upsert on url)
-                    from fastapi.encoders import jsonable_encoder
-                    doc_data = {
+                    # 같은 피드 안에서 반복된 항목도 한 번만 저장
+                    existing_hashes.add(doc["hash"])
+                    new_docs.append({
                         "source_id": source_uuid,
                         "title": doc["title"],
                         "published_at": doc["published_at"],
@@ -186,21 +287,24 @@ class RSSCollector:
                         "hash": doc["hash"],
                         "status": "ingested",
                         "raw_html": doc.get("summary", "")
-                    }
-                    
-                    try:
-                        # Ensure all values in doc_data are JSON serializable (datetime -> str)
-                        payload = jsonable_encoder(doc_data)
-                        result = self.db.table("documents").upsert(
-                            payload,
-                            on_conflict="url"
-                        ).execute()
-                        
-                        if result.data:
-                            results["total_new"] += 1
-                            results["documents"].append(result.data[0])
-                    except Exception as ins_err:
-                        _log.warning("Error inserting document %s: %s", doc["url"], ins_err)
+                    })
+                
+                if not new_docs:
+                    continue
+                
+                # 신규 문서 일괄 저장 (upsert on url); 한 요청 안의 url 중복은 충돌 오류를 내므로 제거
+                payload = list({d["url"]: d for d in jsonable_encoder(new_docs)}.values())
+                try:
+                    result = self.db.table("documents").upsert(
+                        payload,
+                        on_conflict="url"
+                    ).execute()
+                    rows = result.data or []
+                    results["total_new"] += len(rows)
+                    results["documents"].extend(rows)
+                except Exception as ins_err:
+                    _log.warning("Error batch inserting for fid %s: %s", fid, ins_err)
+                    results["errors"].append({"fid": fid, "error": str(ins_err)})
 
             except Exception as e:
                 _log.warning("Error in collect_all for fid %s: %s", fid, e)
@@ -215,15 +319,18 @@ class LlamaDocumentParser:
     def __init__(self):
         self.db = get_db()
     
-    async def parse_document(self, document_id: str) -> Dict[str, Any]:
-        """문서 파싱 및 청킹."""
-        start_time = datetime.now()
+    async def parse_document(self, document_id: str, defer_status: bool = False) -> Dict[str, Any]:
+        """문서 파싱 및 청킹.
+
+        defer_status=True면 성공 시 status/parsed_at 기록을 호출부(파이프라인 최종 UPDATE)에 맡기고 parsed_at만 반환.
+        """
+        start_ns = monotonic_ns()
         _log.debug("[%s] Starting parsing phase...", document_id)
 
         try:
             # 문서 조회 (파싱에 필요한 컬럼만 — 대용량 필드 페이로드 축소)
             doc_result = self.db.table("documents").select(
-                "document_id, raw_html, title, url, status"
+                "document_id, source_id, raw_html, title, url, status"
             ).eq("document_id", document_id).execute()
 
             if not doc_result.data:
@@ -254,6 +361,7 @@ class LlamaDocumentParser:
                         ft = f.get("file_type", "pdf")
                         return await parse_and_chunk_document(fp, ft)
 
+                    # 첨부별 파싱 동시 진행 (LlamaParse 호출 수는 LLAMAPARSE_CONCURRENCY로 제한)
                     att_results = await asyncio.gather(
                         *[_parse_att(f) for f in files_result.data],
                         return_exceptions=True,
@@ -281,7 +389,7 @@ class LlamaDocumentParser:
 
             # 청크 저장 — 행 단위 insert N회 대신 배치 insert (RTT·부하 감소)
             chunk_ids: List[str] = []
-            insert_batch_size = 200
+            insert_batch_size = max(1, settings.CHUNK_INSERT_BATCH)
             for start in range(0, len(all_chunks), insert_batch_size):
                 slice_chunks = all_chunks[start : start + insert_batch_size]
                 rows = [
@@ -289,7 +397,7 @@ class LlamaDocumentParser:
                         "document_id": document_id,
                         "chunk_index": start + i,
                         "chunk_text": c["chunk_text"],
-                        "chunk_tokens": c.get("chunk_tokens", 0),
+                        "chunk_tokens": c.get("chunk_tokens", c.get("token_count", 0)),
                         "chunking_version": c.get("chunking_version", "llamaparse_v1"),
                         "section_title": c.get("section_title"),
                     }
@@ -300,12 +408,14 @@ class LlamaDocumentParser:
                     chunk_ids.extend(str(r["chunk_id"]) for r in result.data)
             
             # 문서 상태 업데이트
-            self.db.table("documents").update({
-                "status": "parsed",
-                "parsed_at": datetime.now().isoformat()
-            }).eq("document_id", document_id).execute()
+            parsed_at = datetime.now().isoformat()
+            if not defer_status:
+                self.db.table("documents").update({
+                    "status": "parsed",
+                    "parsed_at": parsed_at
+                }).eq("document_id", document_id).execute()
             
-            processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            processing_time = (monotonic_ns() - start_ns) // 1_000_000
             _log.info("[%s] Successfully parsed into %s chunks.", document_id, len(chunk_ids))
             
             return {
@@ -313,6 +423,13 @@ class LlamaDocumentParser:
                 "document_id": document_id,
                 "chunks_count": len(chunk_ids),
                 "chunk_ids": chunk_ids,
+                "parsed_at": parsed_at,
+                # 파이프라인 결과 조립용 (run_full_pipeline이 문서를 다시 조회하지 않도록)
+                "document": {
+                    "source_id": doc.get("source_id") or "",
+                    "title": doc.get("title") or "",
+                    "url": doc.get("url") or "",
+                },
                 "processing_time_ms": processing_time
             }
             
@@ -326,73 +443,118 @@ class LlamaDocumentParser:
     
     def _parse_html_to_chunks(self, html: str, document_id: str) -> List[Dict]:
         """HTML을 청크로 변환 (재귀 분할 — 단어 단위 고정 윈도 제거)."""
-        from bs4 import BeautifulSoup
         from app.chunking.recursive_split import split_text_recursive
+        from app.chunking.token_count import count_tokens
 
-        soup = BeautifulSoup(html, 'html.parser')
-        text = soup.get_text(separator='\n', strip=True)
+        if "<" not in html:
+            # RSS 요약이 태그 없는 평문이면 DOM 구성 생략 (엔티티만 복원)
+            text = unescape(html).strip()
+        else:
+            text = _html_to_text(html)
         pieces = split_text_recursive(text)
         return [
             {
                 "chunk_text": p,
-                "chunk_tokens": len(p.split()),
+                "chunk_tokens": n_tokens,
                 "section_title": None,
                 "chunking_version": "recursive_ko_v1",
             }
-            for p in pieces
+            for p, n_tokens in zip(pieces, count_tokens(pieces))
         ]
 
 
+# 업권 분류 키워드 — 모듈 로드 시 단일 alternation 정규식으로 컴파일 (청크당 업권×키워드 반복 탐색 제거).
+# 전방탐색으로 모든 위치에서 매칭해 업권 간 겹치는 키워드(예: "보험금리")도 놓치지 않음.
+_INDUSTRY_KEYWORDS: Dict[str, List[str]] = {
+    "INSURANCE": ["보험", "생명보험", "손핳보험", "보험료", "보험금"],
+    "BANKING": ["은행", "예금", "대출", "금리", "시중은행"],
+    "SECURITIES": ["증권", "주식", "채권", "펀드", "투자"]
+}
+_KEYWORD_INDUSTRY: Dict[str, str] = {
+    kw: industry for industry, kws in _INDUSTRY_KEYWORDS.items() for kw in kws
+}
+_INDUSTRY_KEYWORD_RE = re.compile(
+    "(?=("
+    + "|".join(re.escape(kw) for kw in sorted(_KEYWORD_INDUSTRY, key=len, reverse=True))
+    + "))"
+)
+
+
+def _select_chunks_by_ids(db, columns: str, chunk_ids: List[str]) -> List[Dict[str, Any]]:
+    """파싱 단계에서 받은 chunk_id 목록으로 청크 조회 (document_id 전체 스캔·이전 파싱 잔여 청크 배제)."""
+    rows: List[Dict[str, Any]] = []
+    for i in range(0, len(chunk_ids), 200):
+        res = db.table("chunks").select(columns).in_("chunk_id", chunk_ids[i : i + 200]).execute()
+        rows.extend(res.data or [])
+    return rows
+
+
 class ContextualChunker:
     """LangChain 기반 문맥 보존 청킹 + 업권 메타데이터 부착."""
     
+    # update_chunk_metadata_bulk RPC 미배포 환경이면 upsert 경로로 고정 (그 외 일시 오류는 해당 배치만 폴백)
+    _bulk_rpc_available = True
+    
     def __init__(self):
         self.db = get_db()
     
-    async def enrich_chunks(self, document_id: str) -> Dict[str, Any]:
-        """청크에 메타데이터 부착."""
+    async def _write_metadata_batch(self, batch: List[Dict[str, Any]]) -> None:
+        """chunk_id → metadata 일괄 반영. RPC는 metadata만 전송, 폴백 upsert는 NOT NULL 컬럼 포함 전체 행 전송."""
+        if ContextualChunker._bulk_rpc_available:
+            payload = [{"chunk_id": row["chunk_id"], "metadata": row["metadata"]} for row in batch]
+            try:
+                await asyncio.to_thread(
+                    lambda: self.db.rpc("update_chunk_metadata_bulk", {"chunks": payload}).execute()
+                )
+                return
+            except Exception as e:
+                if is_missing_rpc_error(e):
+                    _log.warning("update_chunk_metadata_bulk RPC not deployed, falling back to upsert: %s", e)
+                    ContextualChunker._bulk_rpc_available = False
+                else:
+                    _log.warning("update_chunk_metadata_bulk RPC failed, upserting this batch: %s", e)
+        await asyncio.to_thread(
+            lambda: self.db.table("chunks").upsert(batch, on_conflict="chunk_id").execute()
+        )
+    
+    async def enrich_chunks(
+        self, document_id: str, chunk_ids: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """청크에 메타데이터 부착 (chunk_ids가 주어지면 해당 청크만)."""
         try:
-            # 청크 조회 (메타데이터 부착에 필요한 필드만)
-            chunks_result = self.db.table("chunks").select("chunk_id, chunk_text").eq(
-                "document_id", document_id
-            ).execute()
+            # 청크 조회 (메타데이터 부착 + upsert NOT NULL 컬럼에 필요한 필드만)
+            columns = "chunk_id, document_id, chunk_index, chunk_text"
+            if chunk_ids:
+                chunks_data = _select_chunks_by_ids(self.db, columns, chunk_ids)
+            else:
+                chunks_data = self.db.table("chunks").select(columns).eq(
+                    "document_id", document_id
+                ).execute().data
 
-            if not chunks_result.data:
+            if not chunks_data:
                 return {"status": "failed", "error": "No chunks found"}
             
-            # 업권 분류
-            industry_keywords = {
-                "INSURANCE": ["보험", "생명보험", "손핳보험", "보험료", "보험금"],
-                "BANKING": ["은행", "예금", "대출", "금리", "시중은행"],
-                "SECURITIES": ["증권", "주식", "채권", "펀드", "투자"]
-            }
-            
-            sem = asyncio.Semaphore(16)
+            # 한 문서의 청크는 같은 enriched_at 공유 (청크마다 시각 조회·포맷 반복 제거)
+            enriched_at = datetime.now().isoformat()
 
             def _build_metadata(chunk: Dict[str, Any]) -> Dict[str, Any]:
-                chunk_text = chunk.get("chunk_text", "").lower()
-                industry_tags = []
-                for industry, keywords in industry_keywords.items():
-                    if any(kw in chunk_text for kw in keywords):
-                        industry_tags.append(industry)
+                # 키워드가 한글이라 대소문자 구분이 없으므로 .lower() 사본 없이 원문을 그대로 스캔
+                chunk_text = chunk.get("chunk_text", "")
+                # 업권 분류 — 전체 키워드를 한 번의 스캔으로 매칭
+                found = {_KEYWORD_INDUSTRY[m] for m in _INDUSTRY_KEYWORD_RE.findall(chunk_text)}
+                industry_tags = [industry for industry in _INDUSTRY_KEYWORDS if industry in found]
                 return {
                     "industry_tags": industry_tags,
-                    "has_table": "|" in chunk.get("chunk_text", ""),
-                    "enriched_at": datetime.now().isoformat(),
+                    "has_table": "|" in chunk_text,
+                    "enriched_at": enriched_at,
                 }
 
-            async def _update_chunk(chunk: Dict[str, Any]) -> None:
-                metadata = _build_metadata(chunk)
-                cid = chunk["chunk_id"]
-
-                def _run():
-                    self.db.table("chunks").update({"metadata": metadata}).eq("chunk_id", cid).execute()
-
-                async with sem:
-                    await asyncio.to_thread(_run)
-
-            await asyncio.gather(*[_update_chunk(c) for c in chunks_result.data])
-            enriched_count = len(chunks_result.data)
+            # 청크별 update N회 대신 chunk_id 기준 배치 갱신 (RTT 감소)
+            rows = [{**chunk, "metadata": _build_metadata(chunk)} for chunk in chunks_data]
+            batch_size = 200
+            for start in range(0, len(rows), batch_size):
+                await self._write_metadata_batch(rows[start : start + batch_size])
+            enriched_count = len(rows)
 
             return {
                 "status": "success",
@@ -404,96 +566,267 @@ class ContextualChunker:
             return {"status": "failed", "error": str(e)}
 
 
+# 임베딩 배치 요청 재시도 횟수 (RateLimitError 한정)
+_EMBED_MAX_RETRIES = 5
+
+
+_WS_RE = re.compile(r"\s+")
+
+
+def _embed_dedup_key(text: str) -> Optional[bytes]:
+    """임베딩 중복 판정 키 — 공백 정규화 후 128비트 blake2b. 정규화 결과가 비면 None (중복 판정 제외)."""
+    normalized = _WS_RE.sub(" ", text).strip()
+    if not normalized:
+        return None
+    return hashlib.blake2b(normalized.encode(), digest_size=16).digest()
+
+
+def _pack_embed_batches(token_counts: List[int], max_items: int, max_tokens: int) -> List[List[int]]:
+    """텍스트 인덱스를 입력 순서대로 묶음 — 배치당 텍스트 수·토큰 합이 모두 상한 이하 (단일 초과 텍스트는 단독 배치)."""
+    batches: List[List[int]] = []
+    current: List[int] = []
+    current_tokens = 0
+    for i, n in enumerate(token_counts):
+        if current and (len(current) >= max_items or current_tokens + n > max_tokens):
+            batches.append(current)
+            current, current_tokens = [], 0
+        current.append(i)
+        current_tokens += n
+    if current:
+        batches.append(current)
+    return batches
+
+
+_pg_pool = None
+_pg_pool_lock = threading.Lock()
+
+
+def _get_pg_pool():
+    """POSTGRES_DSN 직접 연결 풀 (첫 사용 시 1회 생성, 임베딩 적재마다 connect/TLS 핸드셰이크 반복 제거)."""
+    global _pg_pool
+    if _pg_pool is None:
+        with _pg_pool_lock:
+            if _pg_pool is None:
+                from psycopg2.pool import ThreadedConnectionPool
+
+                _pg_pool = ThreadedConnectionPool(
+                    1, max(1, settings.EMBED_CONCURRENCY), settings.POSTGRES_DSN
+                )
+    return _pg_pool
+
+
+def _copy_embeddings(rows: List[Dict[str, Any]]) -> None:
+    """Postgres COPY로 임베딩 적재 (PostgREST JSON 왕복 우회).
+
+    COPY는 ON CONFLICT를 지원하지 않으므로 임시 테이블에 COPY 후 한 번의 INSERT ... ON CONFLICT로 반영.
+    벡터는 pgvector 텍스트 표기 '[x,y,...]'로 전송.
+    """
+    buf = io.StringIO()
+    for r in rows:
+        vector = ",".join(map(repr, r["embedding"]))
+        buf.write(f'{r["chunk_id"]}\t{r["embedding_model"]}\t[{vector}]\n')
+    buf.seek(0)
+
+    pool = _get_pg_pool()
+    conn = pool.getconn()
+    broken = False
+    try:
+        with conn, conn.cursor() as cur:
+            cur.execute("CREATE TEMP TABLE _embeddings_stage (LIKE public.embeddings) ON COMMIT DROP")
+            cur.copy_expert(
+                "COPY _embeddings_stage (chunk_id, embedding_model, embedding) FROM STDIN", buf
+            )
+            cur.execute(
+                "INSERT INTO public.embeddings (chunk_id, embedding_model, embedding) "
+                "SELECT chunk_id, embedding_model, embedding FROM _embeddings_stage "
+                "ON CONFLICT (chunk_id) DO UPDATE SET "
+                "embedding_model = EXCLUDED.embedding_model, embedding = EXCLUDED.embedding"
+            )
+    except Exception:
+        # 끊긴 연결은 풀에 되돌리지 않고 폐기
+        broken = bool(conn.closed)
+        raise
+    finally:
+        pool.putconn(conn, close=broken)
+
+
 class OpenAIEmbedder:
     """OpenAI로 문장을 벡터로 변환하여 Supabase(pgvector)에 저장."""
     
     def __init__(self):
         self.db = get_db()
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.OPENAI_EMBEDDING_MODEL,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.embeddings = get_embeddings()
     
-    async def embed_chunks(self, document_id: str) -> Dict[str, Any]:
-        """청크 임베딩 생성 및 저장."""
-        start_time = datetime.now()
+    async def _aembed_with_backoff(self, batch: List[str]) -> List[List[float]]:
+        """OpenAI 429(RateLimitError) 시 지수 백오프 후 재시도 — 동시 배치가 한도에 걸려도 전체 실패 방지."""
+        from openai import RateLimitError
+
+        for attempt in range(_EMBED_MAX_RETRIES - 1):
+            try:
+                return await self.embeddings.aembed_documents(batch)
+            except RateLimitError as e:
+                delay = min(60.0, 2 ** attempt) + random.uniform(0, 1)
+                _log.warning("Embedding rate limited, retrying in %.1fs: %s", delay, e)
+                await asyncio.sleep(delay)
+        return await self.embeddings.aembed_documents(batch)
+
+    async def _embed_texts(self, chunks: List[Dict[str, Any]]) -> List[List[float]]:
+        """청크 텍스트를 토큰 상한 기준으로 나눠 동시 임베딩 (결과는 입력 순서 유지).
+
+        chunk_tokens(파싱 단계에서 저장)가 있으면 재사용하고, 없는 청크만 토큰 수를 계산.
+        ENABLE_EMBED_DEDUP이면 정규화 텍스트가 같은 청크는 대표 1건만 요청하고 벡터를 복제.
+        """
+        from app.chunking.token_count import count_tokens
+
+        if settings.ENABLE_EMBED_DEDUP:
+            slot_by_key: Dict[bytes, int] = {}
+            unique: List[Dict[str, Any]] = []
+            slots: List[int] = []
+            for c in chunks:
+                key = _embed_dedup_key(c["chunk_text"])
+                slot = slot_by_key.get(key) if key is not None else None
+                if slot is None:
+                    slot = len(unique)
+                    if key is not None:
+                        slot_by_key[key] = slot
+                    unique.append(c)
+                slots.append(slot)
+            if len(unique) < len(chunks):
+                _log.debug("Embedding dedup: %s chunks -> %s unique texts", len(chunks), len(unique))
+                chunks = unique
+        else:
+            slots = None
+
+        texts = [c["chunk_text"] for c in chunks]
+        token_counts = [c.get("chunk_tokens") for c in chunks]
+        missing = [i for i, n in enumerate(token_counts) if not n]
+        if missing:
+            for i, n in zip(missing, count_tokens([texts[i] for i in missing])):
+                token_counts[i] = n
+
+        batches = _pack_embed_batches(
+            token_counts,
+            max(1, settings.EMBED_BATCH_SIZE),
+            max(1, settings.EMBED_MAX_BATCH_TOKENS),
+        )
+        sem = asyncio.Semaphore(max(1, settings.EMBED_CONCURRENCY))
+
+        async def _embed(indices: List[int]) -> List[List[float]]:
+            async with sem:
+                return await self._aembed_with_backoff([texts[i] for i in indices])
+
+        # gather는 입력 순서대로 결과를 돌려주므로 chunks와 1:1 대응 유지
+        parts = await asyncio.gather(*[_embed(b) for b in batches])
+        vectors = [v for part in parts for v in part]
+        return vectors if slots is None else [vectors[slot] for slot in slots]
+
+    async def _store_embeddings(self, rows: List[Dict[str, Any]]) -> None:
+        """임베딩 저장 — POSTGRES_DSN 설정 시 COPY 대량 적재, 아니면(또는 실패 시) PostgREST 배치 upsert."""
+        if not rows:
+            return
+        if settings.POSTGRES_DSN:
+            try:
+                await asyncio.to_thread(_copy_embeddings, rows)
+                return
+            except Exception as e:
+                _log.warning("COPY embeddings failed, falling back to PostgREST upsert: %s", e)
+        for i in range(0, len(rows), 500):
+            self.db.table("embeddings").upsert(rows[i : i + 500]).execute()
+
+    async def embed_chunks(
+        self,
+        document_id: str,
+        chunk_ids: Optional[List[str]] = None,
+        defer_status: bool = False,
+    ) -> Dict[str, Any]:
+        """청크 임베딩 생성 및 저장.
+
+        chunk_ids가 주어지면 방금 파싱·저장된 신규 청크이므로 기존 임베딩 중복 확인을 생략.
+        defer_status=True면 status/indexed_at 기록 없이 indexed_at만 반환 (호출부에서 한 번에 UPDATE).
+        """
+        start_ns = monotonic_ns()
         _log.debug("[%s] Starting embedding phase...", document_id)
 
         try:
             # 청크 조회 (임베딩에 필요한 필드만)
-            chunks_result = self.db.table("chunks").select("chunk_id, chunk_text").eq(
-                "document_id", document_id
-            ).execute()
+            if chunk_ids:
+                chunks_data = _select_chunks_by_ids(self.db, "chunk_id, chunk_text, chunk_tokens", chunk_ids)
+            else:
+                chunks_data = self.db.table("chunks").select("chunk_id, chunk_text, chunk_tokens").eq(
+                    "document_id", document_id
+                ).execute().data
 
-            if not chunks_result.data:
+            if not chunks_data:
                 _log.warning("[%s] Error: No chunks found to embed", document_id)
                 return {"status": "failed", "error": "No chunks found"}
             
-            # 이미 임베딩된 청크 제외
-            existing_embeddings = self.db.table("embeddings").select("chunk_id").in_(
-                "chunk_id", [c["chunk_id"] for c in chunks_result.data]
-            ).execute()
-            
-            existing_ids = {e["chunk_id"] for e in (existing_embeddings.data or [])}
-            
-            chunks_to_embed = [
-                c for c in chunks_result.data 
-                if c["chunk_id"] not in existing_ids
-            ]
+            if chunk_ids:
+                chunks_to_embed = chunks_data
+            else:
+                # 이미 임베딩된 청크 제외
+                existing_embeddings = self.db.table("embeddings").select("chunk_id").in_(
+                    "chunk_id", [c["chunk_id"] for c in chunks_data]
+                ).execute()
+                
+                existing_ids = {e["chunk_id"] for e in (existing_embeddings.data or [])}
+                
+                chunks_to_embed = [
+                    c for c in chunks_data 
+                    if c["chunk_id"] not in existing_ids
+                ]
             
             if not chunks_to_embed:
                 _log.debug(
                     "[%s] All %s chunks already embedded. Skipping.",
                     document_id,
-                    len(chunks_result.data),
+                    len(chunks_data),
                 )
                 # Ensure status is indexed
-                self.db.table("documents").update({
-                    "status": "indexed",
-                    "indexed_at": datetime.now().isoformat()
-                }).eq("document_id", document_id).execute()
+                indexed_at = datetime.now().isoformat()
+                if not defer_status:
+                    self.db.table("documents").update({
+                        "status": "indexed",
+                        "indexed_at": indexed_at
+                    }).eq("document_id", document_id).execute()
                 
                 return {
                     "status": "success",
                     "document_id": document_id,
                     "embedded_count": 0,
+                    "indexed_at": indexed_at,
                     "message": "All chunks already embedded"
                 }
             
-            # 배치 임베딩 (한 번에 수백 문단이면 API 한도·지연 증가 → 청크 단위로 분할)
+            # 배치 임베딩 (요청당 텍스트 수·토큰 합 상한으로 분할, 동시 요청)
             _log.info(
                 "[%s] Generating embeddings for %s chunks using %s...",
                 document_id,
                 len(chunks_to_embed),
                 settings.OPENAI_EMBEDDING_MODEL,
             )
-            texts = [c["chunk_text"] for c in chunks_to_embed]
-            embed_batch = 48
-            vectors: List[List[float]] = []
-            for i in range(0, len(texts), embed_batch):
-                batch = texts[i : i + embed_batch]
-                part = await self.embeddings.aembed_documents(batch)
-                vectors.extend(part)
+            vectors = await self._embed_texts(chunks_to_embed)
             
             # Supabase에 저장
             embedding_data = [
                 {
                     "chunk_id": chunk["chunk_id"],
                     "embedding_model": settings.OPENAI_EMBEDDING_MODEL,
-                    "embedding": vector # pgvector handles list of floats or json string
+                    "embedding": vector  # list 그대로 전달 (pgvector가 JSON 배열을 vector로 캐스팅)
                 }
                 for chunk, vector in zip(chunks_to_embed, vectors)
             ]
             
-            self.db.table("embeddings").upsert(embedding_data).execute()
+            await self._store_embeddings(embedding_data)
             
             # 문서 상태 업데이트
-            self.db.table("documents").update({
-                "status": "indexed",
-                "indexed_at": datetime.now().isoformat()
-            }).eq("document_id", document_id).execute()
+            indexed_at = datetime.now().isoformat()
+            if not defer_status:
+                self.db.table("documents").update({
+                    "status": "indexed",
+                    "indexed_at": indexed_at
+                }).eq("document_id", document_id).execute()
             
-            processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            processing_time = (monotonic_ns() - start_ns) // 1_000_000
             _log.info(
                 "[%s] Embedding success: %s vectors in %sms",
                 document_id,
@@ -505,12 +838,92 @@ class OpenAIEmbedder:
                 "status": "success",
                 "document_id": document_id,
                 "embedded_count": len(embedding_data),
+                "indexed_at": indexed_at,
                 "processing_time_ms": processing_time
             }
             
         except Exception as e:
             return {"status": "failed", "error": str(e)}
 
+    async def embed_many(
+        self,
+        document_ids: List[str],
+        chunk_ids: Optional[List[str]] = None,
+        defer_status: bool = False,
+    ) -> Dict[str, Any]:
+        """여러 문서의 미임베딩 청크를 한 번에 모아 대형 배치로 임베딩 (문서별 왕복 제거).
+
+        chunk_ids가 주어지면 파싱 단계의 신규 청크만 대상으로 하며 중복 확인을 생략.
+        defer_status=True면 문서 status 일괄 UPDATE를 생략하고 indexed_at만 반환.
+        """
+        start_ns = monotonic_ns()
+        if not document_ids:
+            return {"status": "success", "embedded_count": 0, "by_document": {}}
+
+        try:
+            existing_ids = set()
+            if chunk_ids:
+                chunks = _select_chunks_by_ids(self.db, "chunk_id, chunk_text, chunk_tokens, document_id", chunk_ids)
+            else:
+                # 문서 ID 목록으로 청크 일괄 조회 (PostgREST URL 길이 고려해 ID 100개씩)
+                chunks = []
+                for i in range(0, len(document_ids), 100):
+                    res = self.db.table("chunks").select("chunk_id, chunk_text, chunk_tokens, document_id").in_(
+                        "document_id", document_ids[i : i + 100]
+                    ).execute()
+                    chunks.extend(res.data or [])
+
+                all_chunk_ids = [c["chunk_id"] for c in chunks]
+                for i in range(0, len(all_chunk_ids), 200):
+                    res = self.db.table("embeddings").select("chunk_id").in_(
+                        "chunk_id", all_chunk_ids[i : i + 200]
+                    ).execute()
+                    existing_ids.update(e["chunk_id"] for e in (res.data or []))
+
+            chunks_to_embed = [c for c in chunks if c["chunk_id"] not in existing_ids]
+            by_document: Dict[str, int] = {doc_id: 0 for doc_id in document_ids}
+
+            if chunks_to_embed:
+                _log.info(
+                    "Bulk embedding %s chunks across %s documents using %s...",
+                    len(chunks_to_embed),
+                    len(document_ids),
+                    settings.OPENAI_EMBEDDING_MODEL,
+                )
+                vectors = await self._embed_texts(chunks_to_embed)
+
+                embedding_data = [
+                    {
+                        "chunk_id": chunk["chunk_id"],
+                        "embedding_model": settings.OPENAI_EMBEDDING_MODEL,
+                        "embedding": vector,
+                    }
+                    for chunk, vector in zip(chunks_to_embed, vectors)
+                ]
+                await self._store_embeddings(embedding_data)
+                for chunk in chunks_to_embed:
+                    by_document[chunk["document_id"]] = by_document.get(chunk["document_id"], 0) + 1
+
+            indexed_at = datetime.now().isoformat()
+            indexed_ids = list({c["document_id"] for c in chunks})
+            if indexed_ids and not defer_status:
+                self.db.table("documents").update({
+                    "status": "indexed",
+                    "indexed_at": indexed_at
+                }).in_("document_id", indexed_ids).execute()
+
+            processing_time = (monotonic_ns() - start_ns) // 1_000_000
+            return {
+                "status": "success",
+                "embedded_count": len(chunks_to_embed),
+                "by_document": by_document,
+                "indexed_at": indexed_at,
+                "processing_time_ms": processing_time
+            }
+
+        except Exception as e:
+            return {"status": "failed", "error": str(e), "by_document": {}}
+
 
 class IngestionPipeline:
     """전체 인제스천 파이프라인 오케스트레이터."""
@@ -523,11 +936,13 @@ class IngestionPipeline:
     
     async def run_full_pipeline(self, document_id: str) -> DocumentIngestionResult:
         """전체 파이프라인 실행."""
-        start_time = datetime.now()
+        start_ns = monotonic_ns()
+        parse_result: Dict[str, Any] = {}
         
         try:
             # Phase 1: Parse
-            parse_result = await self.parser.parse_document(document_id)
+            # 단계별 상태 UPDATE는 미루고 마지막에 한 번만 기록 (문서당 3회 → 1회)
+            parse_result = await self.parser.parse_document(document_id, defer_status=True)
             if parse_result["status"] != "success":
                 return DocumentIngestionResult(
                     document_id=document_id,
@@ -540,30 +955,26 @@ class IngestionPipeline:
                     error_message=parse_result.get("error")
                 )
             
+            # 파싱에서 받은 chunk_id를 이후 단계로 전달 (문서 단위 재조회·중복 확인 생략)
+            chunk_ids = parse_result.get("chunk_ids") or None
+            
             # Phase 2: Enrich chunks
-            enrich_result = await self.chunker.enrich_chunks(document_id)
+            enrich_result = await self.chunker.enrich_chunks(document_id, chunk_ids)
             
             # Phase 3: Embed
-            embed_result = await self.embedder.embed_chunks(document_id)
-            
-            processing_time = int((datetime.now() - start_time).total_seconds() * 1000)
+            embed_result = await self.embedder.embed_chunks(document_id, chunk_ids, defer_status=True)
             
-            # 문서 정보 조회 및 업데이트 (Resilient to column missing or DB error)
-            try:
-                self.parser.db.table("documents").update({
-                    "chunks_count": parse_result.get("chunks_count", 0),
-                    "last_processed_at": datetime.now().isoformat(),
-                    "processing_status": "indexed"
-                }).eq("document_id", document_id).execute()
-            except Exception as db_err:
-                _log.warning("[%s] DB update warning: %s", document_id, db_err)
-                # Continue anyway as processing itself succeeded
+            processing_time = (monotonic_ns() - start_ns) // 1_000_000
             
-            doc_result = self.parser.db.table("documents").select("*").eq(
-                "document_id", document_id
-            ).execute()
+            self._finalize_document(
+                document_id,
+                parse_result.get("chunks_count", 0),
+                parse_result.get("parsed_at"),
+                embed_result.get("indexed_at") if embed_result.get("status") == "success" else None,
+            )
             
-            doc = doc_result.data[0] if doc_result.data else {}
+            # 파싱 단계에서 조회한 문서 필드 재사용 (종료 시 SELECT * 왕복 제거)
+            doc = parse_result.get("document") or {}
             
             return DocumentIngestionResult(
                 document_id=document_id,
@@ -577,6 +988,11 @@ class IngestionPipeline:
             )
             
         except Exception as e:
+            if parse_result.get("status") == "success":
+                # 청크는 이미 저장됨 — 파싱 완료 상태를 남겨 재처리 시 중복 파싱 방지
+                self._finalize_document(
+                    document_id, parse_result.get("chunks_count", 0), parse_result.get("parsed_at")
+                )
             return DocumentIngestionResult(
                 document_id=document_id,
                 source_id="",
@@ -588,6 +1004,74 @@ class IngestionPipeline:
                 error_message=str(e)
             )
     
+    def _finalize_document(
+        self,
+        document_id: str,
+        chunks_count: int,
+        parsed_at: Optional[str],
+        indexed_at: Optional[str] = None,
+    ) -> None:
+        """파싱·임베딩 결과를 documents에 한 번의 UPDATE로 기록.
+
+        임베딩 실패(indexed_at 없음)면 파싱 완료 상태만 남겨 재파싱으로 청크가 중복되지 않게 함.
+        처리 이력 컬럼(chunks_count 등)이 없는 스키마면 상태 컬럼만 다시 기록 (Resilient to column missing).
+        """
+        core: Dict[str, Any] = {"status": "indexed" if indexed_at else "parsed", "parsed_at": parsed_at}
+        if indexed_at:
+            core["indexed_at"] = indexed_at
+        extra: Dict[str, Any] = {}
+        if indexed_at:
+            extra = {
+                "chunks_count": chunks_count,
+                "last_processed_at": datetime.now().isoformat(),
+                "processing_status": "indexed"
+            }
+        try:
+            self.parser.db.table("documents").update({**core, **extra}).eq(
+                "document_id", document_id
+            ).execute()
+            return
+        except Exception as db_err:
+            if not extra:
+                _log.warning("[%s] DB update warning: %s", document_id, db_err)
+                return
+            _log.warning("[%s] DB update warning, retrying status only: %s", document_id, db_err)
+        try:
+            self.parser.db.table("documents").update(core).eq("document_id", document_id).execute()
+        except Exception as db_err:
+            _log.warning("[%s] DB update warning: %s", document_id, db_err)
+    
+    async def _prepare_document(self, document_id: str) -> Dict[str, Any]:
+        """Phase 1-2: 파싱 + 메타데이터 부착 (임베딩은 여러 문서 모아 embed_many에서 처리)."""
+        parse_result = await self.parser.parse_document(document_id, defer_status=True)
+        if parse_result["status"] == "success":
+            await self.chunker.enrich_chunks(document_id, parse_result.get("chunk_ids") or None)
+        return parse_result
+    
+    def _drop_embedding_index(self) -> bool:
+        """임베딩 HNSW 인덱스 제거 RPC. 성공 시 True (RPC 미배포 등 실패 시 인덱스 유지한 채 적재)."""
+        try:
+            self.parser.db.rpc("drop_embedding_index").execute()
+            _log.info("Dropped embeddings HNSW index for bulk load")
+            return True
+        except Exception as e:
+            _log.warning("drop_embedding_index failed, loading with index in place: %s", e)
+            return False
+    
+    async def _rebuild_embedding_index(self, attempts: int = 3) -> bool:
+        """임베딩 HNSW 인덱스 재생성 RPC. 실패·타임아웃 시 백오프 재시도, 모두 실패하면 False."""
+        for attempt in range(1, attempts + 1):
+            try:
+                await asyncio.to_thread(lambda: self.parser.db.rpc("rebuild_embedding_index").execute())
+                _log.info("Rebuilt embeddings HNSW index")
+                return True
+            except Exception as e:
+                _log.warning("rebuild_embedding_index attempt %d/%d failed: %s", attempt, attempts, e)
+                if attempt < attempts:
+                    await asyncio.sleep(2 ** attempt)
+        _log.error("rebuild_embedding_index failed after %d attempts; index is missing until rebuilt", attempts)
+        return False
+    
     async def run_scheduled_collection(self, job_id: Optional[str] = None) -> Dict[str, Any]:
         """스케줄된 수집 실행 (1일 4회)."""
         from app.services.job_tracker import job_tracker
@@ -620,36 +1104,114 @@ class IngestionPipeline:
                     message=f"Collected {results['collected']} new docs. Starting pipeline..."
                 )
             
-            # 2. 신규 문서 처리
-            for i, doc in enumerate(collection.get("documents", [])):
-                doc_id = doc.get("document_id")
-                
+            # 2. 신규 문서 파싱·메타데이터 부착 (문서 간 독립, I/O 대기 구간을 겹쳐 처리)
+            documents = collection.get("documents", [])
+            sem = asyncio.Semaphore(max(1, settings.PIPELINE_CONCURRENCY))
+            done_count = 0
+            
+            async def _prepare(doc: Dict[str, Any]) -> Dict[str, Any]:
+                nonlocal done_count
+                async with sem:
+                    result = await self._prepare_document(doc.get("document_id"))
+                done_count += 1
                 if job_id:
-                    progress = 20 + int((i / results["collected"]) * 75)
                     job_tracker.update_job(
                         job_id, 
                         stage="processing", 
-                        progress=progress, 
-                        processed_count=i,
-                        message=f"Processing {i+1}/{results['collected']}: {doc.get('title')[:30]}..."
+                        progress=20 + int((done_count / results["collected"]) * 55), 
+                        processed_count=done_count,
+                        message=f"Processed {done_count}/{results['collected']}: {(doc.get('title') or '')[:30]}..."
                     )
+                return result
+            
+            parse_results = await asyncio.gather(
+                *[_prepare(doc) for doc in documents], return_exceptions=True
+            )
+            
+            prepared: List[Dict[str, Any]] = []
+            index_ok = True
+            for doc, parse_result in zip(documents, parse_results):
+                if isinstance(parse_result, BaseException):
+                    _log.warning("[%s] Pipeline failed: %s", doc.get("document_id"), parse_result)
+                    parse_result = {"status": "failed", "error": str(parse_result)}
                 
-                pipeline_result = await self.run_full_pipeline(doc_id)
-                
-                if pipeline_result.status == "success":
-                    results["processed"] += 1
+                if parse_result["status"] == "success":
+                    prepared.append({
+                        "doc": doc,
+                        "chunks_count": parse_result.get("chunks_count", 0),
+                        "chunk_ids": parse_result.get("chunk_ids") or [],
+                        "parsed_at": parse_result.get("parsed_at"),
+                    })
                 else:
                     results["failed"] += 1
+                    results["details"].append({
+                        "document_id": doc.get("document_id"),
+                        "title": doc.get("title", ""),
+                        "status": "failed"
+                    })
+            
+            # 3. 파싱된 전체 문서의 청크를 한 번에 임베딩
+            if prepared:
+                if job_id:
+                    job_tracker.update_job(
+                        job_id,
+                        stage="embedding",
+                        progress=80,
+                        message=f"Embedding chunks for {len(prepared)} documents..."
+                    )
+                # 모든 문서가 chunk_id를 넘겼을 때만 ID 기반 조회 (하나라도 없으면 문서 단위 조회)
+                all_chunk_ids = (
+                    [cid for p in prepared for cid in p["chunk_ids"]]
+                    if all(p["chunk_ids"] for p in prepared)
+                    else None
+                )
+                # 대량 백필이면 행마다 HNSW 갱신하는 대신 인덱스를 내렸다가 적재 후 한 번에 재생성
+                rebuild_index = (
+                    settings.BULK_REBUILD_THRESHOLD > 0
+                    and results["collected"] > settings.BULK_REBUILD_THRESHOLD
+                    and await asyncio.to_thread(self._drop_embedding_index)
+                )
+                try:
+                    embed_result = await self.embedder.embed_many(
+                        [p["doc"].get("document_id") for p in prepared],
+                        chunk_ids=all_chunk_ids,
+                        defer_status=True,
+                    )
+                finally:
+                    if rebuild_index:
+                        if job_id:
+                            job_tracker.update_job(
+                                job_id, stage="indexing", progress=90, message="Rebuilding vector index..."
+                            )
+                        index_ok = await self._rebuild_embedding_index()
+                        results["index_rebuilt"] = index_ok
+                embed_ok = embed_result.get("status") == "success"
+                if not embed_ok:
+                    _log.warning("Bulk embedding failed: %s", embed_result.get("error"))
                 
-                results["details"].append({
-                    "document_id": doc_id,
-                    "title": pipeline_result.title,
-                    "status": pipeline_result.status
-                })
+                # 문서별 최종 상태를 한 번의 UPDATE로 기록 (파싱·임베딩 단계 UPDATE 생략분 포함)
+                indexed_at = embed_result.get("indexed_at") if embed_ok else None
+                for p in prepared:
+                    doc = p["doc"]
+                    doc_id = doc.get("document_id")
+                    self._finalize_document(doc_id, p["chunks_count"], p["parsed_at"], indexed_at)
+                    if embed_ok:
+                        results["processed"] += 1
+                    else:
+                        results["failed"] += 1
+                    results["details"].append({
+                        "document_id": doc_id,
+                        "title": doc.get("title", ""),
+                        "status": "success" if embed_ok else "failed"
+                    })
             
             if job_id:
                 final_status = "success"
                 msg = f"Completed: {results['collected']} collected, {results['processed']} processed"
+                if not index_ok:
+                    # 인덱스가 빠진 채로 남았으므로 성공 처리하지 않고 재생성 필요를 알림
+                    final_status = "error"
+                    msg += "; vector index rebuild failed (run rebuild_embedding_index)"
                 job_tracker.update_job(job_id, status=final_status, stage="done", progress=100, count=results["collected"], message=msg)
         except Exception as e:
             _log.exception("Pipeline error: %s", e)
@@ -70,6 +70,38 @@ async def _run_collection():
             job_tracker.update_job(job_id, status="error", message=str(e))
 
 
+async def _submit_alert_batch():
+    """수집 직후 최근 24시간 신규 문서의 긴급도 분석을 OpenAI Batch로 제출 (결과는 run_alert_batch_poll_loop)."""
+    from app.services.alert_service import get_alert_service
+
+    try:
+        await get_alert_service().process_new_documents(use_batch=True)
+    except Exception as e:
+        logger.warning("긴급도 Batch 제출 실패: %s", e)
+
+
+async def run_alert_batch_poll_loop():
+    """ALERT_BATCH_POLL_MINUTES마다 완료된 긴급도 Batch를 수거해 알림 생성·고우선순위 알림 발송."""
+    from app.models.schemas import AlertPriority
+    from app.services.alert_service import get_alert_service
+
+    interval = max(1, getattr(settings, "ALERT_BATCH_POLL_MINUTES", 60)) * 60
+    while True:
+        try:
+            await asyncio.sleep(interval)
+            service = get_alert_service()
+            alerts = await service.poll_urgency_batches()
+            for alert in alerts:
+                if alert.priority in (AlertPriority.CRITICAL, AlertPriority.HIGH):
+                    await service.notify_subscribers(alert)
+            if alerts:
+                logger.info("긴급도 Batch 결과로 알림 %s건 생성", len(alerts))
+        except asyncio.CancelledError:
+            break
+        except Exception as e:
+            logger.exception("Batch poll 루프 오류: %s", e)
+
+
 async def run_daily_collection_loop():
     """매일 지정 시각(기본 03:00 KST)에 수집 1회 실행."""
     if not getattr(settings, "ENABLE_DAILY_COLLECTION", True):
@@ -85,6 +117,8 @@ async def run_daily_collection_loop():
             logger.info("다음 자동 수집: %s (%.0f초 후)", next_utc.isoformat(), delay)
             await asyncio.sleep(delay)
             await _run_collection()
+            if getattr(settings, "ENABLE_NIGHTLY_ALERT_BATCH", False):
+                await _submit_alert_batch()
         except asyncio.CancelledError:
             break
         except Exception as e:
@@ -6,17 +6,30 @@
 # ======================================================================
 
 """Smart Alert Service for policy change notifications."""
+import asyncio
 import logging
 import openai
-import json
+import orjson
 import hashlib
-from typing import List, Dict, Any, Optional
+import httpx
+import threading
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta, timezone
 from dataclasses import dataclass
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import (
+    get_db,
+    is_missing_conflict_target_error,
+    is_missing_rpc_error,
+    is_missing_table_error,
+)
 from app.core.redis import get_redis
+from app.core.cache_helper import (
+    cache_get, cache_set, cache_delete,
+    CACHE_TTL_URGENCY_ANALYSIS, CACHE_TTL_ALERT_SUBSCRIPTIONS
+)
 from app.models.schemas import (
     IndustryType, AlertPriority, AlertChannel,
     SmartAlertResponse, AlertSubscription, AlertStatsResponse
@@ -24,6 +37,34 @@ from app.models.schemas import (
 
 _log = logging.getLogger(__name__)
 
+# 전체 구독 목록 캐시 키 / 다른 워커에 구독 변경을 알리는 채널
+_SUBS_CACHE_KEY = "alert:subs:all"
+_SUBS_INVALIDATE_CHANNEL = "alert:subs:invalidate"
+
+# 워커 내 L1: 파싱된 AlertSubscription 목록 (Redis 역직렬화·Pydantic 생성 반복 방지). 무효화 채널 수신 시 비움
+_SUBS_L1_TTL = 30.0
+_subs_l1: Optional[Tuple[float, List[AlertSubscription]]] = None
+_subs_listener_started = False
+_subs_listener_lock = threading.Lock()
+
+# 문자열 → Enum 변환 (Enum __call__ 대신 dict 조회)
+_INDUSTRY_ENUM = {m.value: m for m in IndustryType}
+_CHANNEL_ENUM = {m.value: m for m in AlertChannel}
+_PRIORITY_ENUM = {m.value: m for m in AlertPriority}
+
+# 긴급도 분석 프롬프트에 넣는 본문 길이 (문자)
+_URGENCY_TEXT_CHARS = 4000
+# 본문 조회 시 청크 페이지 크기 (행) — 보통 첫 페이지에서 프롬프트 분량이 채워짐
+_CHUNK_PAGE_SIZE = 20
+
+# 우선순위 비교용 순위 (작을수록 긴급). AlertPriority는 문자열로 직렬화되므로 Enum은 유지
+_PRIORITY_RANK = {
+    AlertPriority.CRITICAL: 0,
+    AlertPriority.HIGH: 1,
+    AlertPriority.MEDIUM: 2,
+    AlertPriority.LOW: 3
+}
+
 
 @dataclass
 class UrgencyFactors:
@@ -35,28 +76,14 @@ class UrgencyFactors:
     industry_impact: float     # 0-10 points
 
 
-class SmartAlertService:
-    """Service for intelligent policy alert generation and notification."""
-    
-    def __init__(self):
-        self.db = get_db()
-        self.redis = get_redis()
-        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
-    
-    async def analyze_document_urgency(
-        self,
-        document_id: str,
-        document_text: str,
-        title: str
-    ) -> Dict[str, Any]:
-        """Analyze document for urgency factors using GPT-4."""
-        
-        analysis_prompt = f"""당신은 금융 규제 전문가입니다. 다음 금융위원회 문서를 분석하여 긴급도를 평가하세요.
+def _build_urgency_prompt(title: str, document_text: str) -> str:
+    """긴급도 분석 프롬프트 (실시간 호출·Batch API 요청에서 공용)."""
+    return f"""당신은 금융 규제 전문가입니다. 다음 금융위원회 문서를 분석하여 긴급도를 평가하세요.
 
 문서 제목: {title}
 
 문서 내용:
-{document_text[:4000]}
+{document_text[:_URGENCY_TEXT_CHARS]}
 
 다음 항목을 JSON 형식으로 평가하세요:
 
@@ -87,35 +114,177 @@ class SmartAlertService:
     }}
 }}"""
 
+
+def _urgency_request_body(title: str, document_text: str) -> Dict[str, Any]:
+    """Chat Completions 요청 본문 — Batch API JSONL의 body와 동일."""
+    return {
+        "model": settings.OPENAI_MODEL,
+        "messages": [{"role": "user", "content": _build_urgency_prompt(title, document_text)}],
+        "temperature": 0.1,
+        "max_tokens": 1500,
+        "response_format": {"type": "json_object"},
+    }
+
+
+def _urgency_cache_key(title: str, document_text: str) -> str:
+    """프롬프트에 실제 들어가는 범위(제목 + 본문 앞 _URGENCY_TEXT_CHARS자)와 모델로 키 생성."""
+    digest = hashlib.sha256(
+        f"{settings.OPENAI_MODEL}\n{title}\n{document_text[:_URGENCY_TEXT_CHARS]}".encode("utf-8")
+    ).hexdigest()
+    return f"urgency:{digest}"
+
+
+def _json_text(value: Any) -> str:
+    """text 컬럼 저장용 JSON 문자열 (orjson: UTF-8 그대로, stdlib json 대비 빠름)."""
+    return orjson.dumps(value).decode()
+
+
+def _clear_subscriptions_l1() -> None:
+    global _subs_l1
+    _subs_l1 = None
+
+
+def _listen_subscription_invalidations(redis_client) -> None:
+    """다른 워커의 create_subscription 알림을 받아 L1 비움 (데몬 스레드, 연결 오류 시 재구독)."""
+    while True:
+        try:
+            pubsub = redis_client.pubsub(ignore_subscribe_messages=True)
+            pubsub.subscribe(_SUBS_INVALIDATE_CHANNEL)
+            while True:
+                # 소켓 타임아웃(5s)보다 짧게 대기하며 폴링
+                if pubsub.get_message(timeout=1.0):
+                    _clear_subscriptions_l1()
+        except Exception as e:
+            _log.debug("Subscription invalidation listener error: %s", e)
+            _clear_subscriptions_l1()
+            time.sleep(5)
+
+
+def _ensure_subscription_listener(redis_client) -> None:
+    global _subs_listener_started
+    if _subs_listener_started or not hasattr(redis_client, "pubsub"):
+        return
+    with _subs_listener_lock:
+        if _subs_listener_started:
+            return
+        threading.Thread(
+            target=_listen_subscription_invalidations,
+            args=(redis_client,),
+            name="alert-subs-invalidation",
+            daemon=True,
+        ).start()
+        _subs_listener_started = True
+
+
+def _failed_urgency_analysis() -> Dict[str, Any]:
+    return {
+        "deadline_info": [],
+        "affected_industries": [],
+        "scope": "unknown",
+        "penalties": None,
+        "key_changes": [],
+        "action_items": [],
+        "affected_regulations": [],
+        "urgency_assessment": {
+            "deadline_proximity_score": 0,
+            "scope_breadth_score": 0,
+            "penalty_severity_score": 0,
+            "regulatory_weight_score": 0,
+            "industry_impact_score": 0,
+            "reasoning": "분석 실패"
+        }
+    }
+
+
+class SmartAlertService:
+    """Service for intelligent policy alert generation and notification."""
+    
+    # get_alert_stats_24h RPC 미배포 환경이면 Python 집계 경로로 고정 (그 외 일시 오류는 해당 호출만 폴백)
+    _stats_rpc_available = True
+    # alert_subscriptions_unique_email.sql 미적용(user_email UNIQUE 없음)이면 조회 후 갱신/삽입 경로로 고정
+    _subs_upsert_available = True
+    # alert_batches.sql 미적용이면 Batch 이력 조회 생략 (실시간 경로는 Batch 테이블 없이 동작)
+    _batch_table_available = True
+    # 이 프로세스에서 Batch를 제출한 적이 있으면 야간 Batch 비활성이어도 진행 중 Batch를 확인
+    _batch_submitted = False
+    # Batch 결과 누락 문서를 실시간 경로로 재처리하는 최대 횟수 (초과 시 failed로 남기고 문서 ID 보존)
+    _BATCH_RETRY_LIMIT = 3
+    
+    def __init__(self):
+        self.db = get_db()
+        self.redis = get_redis()
+        self.openai_client = openai.AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+        # 웹훅 발송용 공유 클라이언트 (keep-alive로 구독자별 TCP/TLS 핸드셰이크 재사용)
+        self._http = httpx.AsyncClient(
+            timeout=10.0,
+            limits=httpx.Limits(max_connections=100, max_keepalive_connections=50),
+        )
+        # 진행 중인 긴급도 분석 (캐시 키 → Future): 동시 중복 호출 합치기
+        self._inflight: Dict[str, asyncio.Future] = {}
+    
+    async def close(self) -> None:
+        """공유 HTTP 클라이언트 종료 (앱 shutdown 시 호출)."""
+        await self._http.aclose()
+    
+    async def analyze_document_urgency(
+        self,
+        document_id: str,
+        document_text: str,
+        title: str
+    ) -> Dict[str, Any]:
+        """Analyze document for urgency factors using GPT-4.
+        
+        동일 제목·본문(개정안 재게시, 스케줄 재실행)은 Redis 캐시 결과 재사용. 실패 결과는 캐시하지 않음.
+        같은 본문에 대한 호출이 동시에 들어오면(스케줄 + 수동 실행 겹침) OpenAI 호출 1회 결과를 공유.
+        """
+        cache_key = _urgency_cache_key(title, document_text)
+        cached = cache_get(cache_key)
+        if cached is not None:
+            self._count_cache("hit")
+            return cached
+        
+        inflight = self._inflight.get(cache_key)
+        if inflight is not None:
+            # 대기자 취소가 공유 Future를 취소해 다른 대기자·소유자까지 끊지 않도록 shield
+            return await asyncio.shield(inflight)
+        self._count_cache("miss")
+        
+        fut: asyncio.Future = asyncio.get_running_loop().create_future()
+        self._inflight[cache_key] = fut
+        try:
+            analysis = await self._request_urgency_analysis(cache_key, title, document_text)
+            if not fut.done():
+                fut.set_result(analysis)
+            return analysis
+        finally:
+            self._inflight.pop(cache_key, None)
+            if not fut.done():
+                fut.cancel()
+    
+    async def _request_urgency_analysis(
+        self,
+        cache_key: str,
+        title: str,
+        document_text: str
+    ) -> Dict[str, Any]:
         try:
             response = await self.openai_client.chat.completions.create(
-                model=settings.OPENAI_MODEL,
-                messages=[{"role": "user", "content": analysis_prompt}],
-                temperature=0.1,
-                max_tokens=1500,
-                response_format={"type": "json_object"}
+                **_urgency_request_body(title, document_text)
             )
             
-            return json.loads(response.choices[0].message.content)
+            analysis = orjson.loads(response.choices[0].message.content)
+            cache_set(cache_key, analysis, CACHE_TTL_URGENCY_ANALYSIS)
+            return analysis
         except Exception as e:
             _log.warning("Error analyzing document urgency: %s", e)
-            return {
-                "deadline_info": [],
-                "affected_industries": [],
-                "scope": "unknown",
-                "penalties": None,
-                "key_changes": [],
-                "action_items": [],
-                "affected_regulations": [],
-                "urgency_assessment": {
-                    "deadline_proximity_score": 0,
-                    "scope_breadth_score": 0,
-                    "penalty_severity_score": 0,
-                    "regulatory_weight_score": 0,
-                    "industry_impact_score": 0,
-                    "reasoning": "분석 실패"
-                }
-            }
+            return _failed_urgency_analysis()
+    
+    def _count_cache(self, outcome: str) -> None:
+        """긴급도 캐시 hit/miss 카운터 (alert:urgency_cache:hit|miss)."""
+        try:
+            self.redis.incr(f"alert:urgency_cache:{outcome}")
+        except Exception:
+            pass
     
     def _calculate_urgency_score(self, analysis: Dict[str, Any]) -> float:
         """Calculate total urgency score from analysis."""
@@ -142,13 +311,13 @@ class SmartAlertService:
         else:
             return AlertPriority.LOW
     
-    async def create_smart_alert(
-        self,
-        document_id: str
-    ) -> Optional[SmartAlertResponse]:
-        """Create a smart alert for a document."""
+    def _load_document(self, document_id: str) -> Optional[tuple]:
+        """알림 분석 대상 문서와 본문 텍스트 (청크 순서대로 결합, 없으면 raw_html 앞부분).
         
-        doc_result = self.db.table("documents").select("*").eq(
+        프롬프트에 들어갈 길이만큼만 이어 붙임 — 긴 문서 전체를 결합했다 버리지 않음.
+        """
+        # raw_html(대용량)은 청크가 없을 때만 별도 조회
+        doc_result = self.db.table("documents").select("document_id, title, published_at").eq(
             "document_id", document_id
         ).execute()
         
@@ -157,27 +326,64 @@ class SmartAlertService:
         
         doc = doc_result.data[0]
         
-        chunks_result = self.db.table("chunks").select("chunk_text").eq(
-            "document_id", document_id
-        ).order("chunk_index").execute()
-        
-        full_text = "\n".join([c["chunk_text"] for c in chunks_result.data]) if chunks_result.data else ""
+        # 청크는 페이지 단위로 조회하고 프롬프트 분량이 차면 이후 페이지는 요청하지 않음
+        parts: List[str] = []
+        size = 0
+        offset = 0
+        while size < _URGENCY_TEXT_CHARS:
+            page = self.db.table("chunks").select("chunk_text").eq(
+                "document_id", document_id
+            ).order("chunk_index").range(offset, offset + _CHUNK_PAGE_SIZE - 1).execute().data or []
+            for c in page:
+                text = c["chunk_text"]
+                parts.append(text)
+                size += len(text) + 1
+                if size >= _URGENCY_TEXT_CHARS:
+                    break
+            if len(page) < _CHUNK_PAGE_SIZE:
+                break
+            offset += _CHUNK_PAGE_SIZE
+        full_text = "\n".join(parts)[:_URGENCY_TEXT_CHARS]
         
         if not full_text:
-            full_text = doc.get("raw_html", "")[:5000]
+            raw = self.db.table("documents").select("raw_html").eq(
+                "document_id", document_id
+            ).execute().data
+            full_text = ((raw[0].get("raw_html") if raw else None) or "")[:_URGENCY_TEXT_CHARS]
         
-        analysis = await self.analyze_document_urgency(
-            document_id=document_id,
-            document_text=full_text,
-            title=doc["title"]
-        )
+        return doc, full_text
+    
+    async def create_smart_alert(
+        self,
+        document_id: str,
+        analysis: Optional[Dict[str, Any]] = None
+    ) -> Optional[SmartAlertResponse]:
+        """Create a smart alert for a document.
+        
+        analysis가 주어지면(Batch API 결과) 긴급도 분석 호출을 생략하고 그대로 사용.
+        """
+        
+        loaded = self._load_document(document_id)
+        if loaded is None:
+            return None
+        doc, full_text = loaded
+        
+        if analysis is None:
+            analysis = await self.analyze_document_urgency(
+                document_id=document_id,
+                document_text=full_text,
+                title=doc["title"]
+            )
+        else:
+            # Batch 결과도 실시간 경로와 같은 캐시에 적재
+            cache_set(_urgency_cache_key(doc["title"], full_text), analysis, CACHE_TTL_URGENCY_ANALYSIS)
         
         urgency_score = self._calculate_urgency_score(analysis)
         priority = self._determine_priority(urgency_score)
         
         industries = [
-            IndustryType(ind) for ind in analysis.get("affected_industries", [])
-            if ind in [e.value for e in IndustryType]
+            _INDUSTRY_ENUM[ind] for ind in analysis.get("affected_industries", [])
+            if ind in _INDUSTRY_ENUM
         ]
         
         impact_summary = f"{analysis.get('scope', '해당 없음')}에 적용. "
@@ -192,10 +398,10 @@ class SmartAlertService:
             "urgency_score": urgency_score,
             "industries": [i.value for i in industries],
             "impact_summary": impact_summary,
-            "key_deadlines": json.dumps(key_deadlines),
-            "action_items": json.dumps(analysis.get("action_items", [])),
-            "affected_regulations": json.dumps(analysis.get("affected_regulations", [])),
-            "analysis_raw": json.dumps(analysis),
+            "key_deadlines": _json_text(key_deadlines),
+            "action_items": _json_text(analysis.get("action_items", [])),
+            "affected_regulations": _json_text(analysis.get("affected_regulations", [])),
+            "analysis_raw": _json_text(analysis),
             "generated_at": datetime.now(timezone.utc).isoformat()
         }
         
@@ -222,8 +428,12 @@ class SmartAlertService:
             notification_sent=False
         )
     
-    async def process_new_documents(self) -> List[SmartAlertResponse]:
-        """Process new documents and create alerts."""
+    async def process_new_documents(self, use_batch: bool = False) -> List[SmartAlertResponse]:
+        """Process new documents and create alerts.
+        
+        use_batch=True면 OpenAI Batch API로 분석을 제출만 하고 빈 목록 반환
+        (비용 50% 절감, 최대 24시간 후 poll_urgency_batches에서 알림 생성).
+        """
         
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
         
@@ -234,18 +444,234 @@ class SmartAlertService:
         if not docs_result.data:
             return []
         
-        existing_alerts = self.db.table("smart_alerts").select("document_id").execute()
-        existing_doc_ids = {a["document_id"] for a in existing_alerts.data} if existing_alerts.data else set()
+        # 이미 알림이 있거나 Batch 결과를 기다리는 문서는 제외 (같은 문서에 알림 중복 생성 방지)
+        new_doc_ids = list(dict.fromkeys(d["document_id"] for d in docs_result.data))
+        skip_ids = self._existing_alert_doc_ids(new_doc_ids)
+        if use_batch or settings.ENABLE_NIGHTLY_ALERT_BATCH or SmartAlertService._batch_submitted:
+            skip_ids |= self._in_flight_batch_doc_ids()
         
-        alerts = []
-        for doc in docs_result.data:
-            if doc["document_id"] not in existing_doc_ids:
-                alert = await self.create_smart_alert(doc["document_id"])
+        pending_ids = [doc_id for doc_id in new_doc_ids if doc_id not in skip_ids]
+        if use_batch:
+            await self.submit_urgency_batch(pending_ids)
+            return []
+        alerts, _ = await self._create_alerts(pending_ids)
+        return alerts
+    
+    async def _create_alerts(self, document_ids: List[str]) -> Tuple[List[SmartAlertResponse], List[str]]:
+        """실시간 분석으로 문서별 알림 생성. (생성된 알림, 알림을 만들지 못한 document_id) 반환."""
+        # 문서별 분석은 서로 독립인 OpenAI I/O → 동시 실행 (동시 호출 수는 OPENAI_CONCURRENCY로 제한)
+        sem = asyncio.Semaphore(max(1, settings.OPENAI_CONCURRENCY))
+        
+        async def _run(document_id: str) -> Optional[SmartAlertResponse]:
+            async with sem:
+                return await self.create_smart_alert(document_id)
+        
+        results = await asyncio.gather(*(_run(doc_id) for doc_id in document_ids), return_exceptions=True)
+        
+        alerts: List[SmartAlertResponse] = []
+        failed: List[str] = []
+        for doc_id, result in zip(document_ids, results):
+            if isinstance(result, BaseException):
+                _log.warning("Smart alert creation failed for %s: %s", doc_id, result)
+                failed.append(doc_id)
+            elif result:
+                alerts.append(result)
+            else:
+                failed.append(doc_id)
+        return alerts, failed
+    
+    def _existing_alert_doc_ids(self, document_ids: List[str]) -> set:
+        """주어진 문서 중 smart_alerts 행이 이미 있는 document_id (전체 스캔 방지, URL 길이 고려해 분할 조회)."""
+        existing: set = set()
+        for i in range(0, len(document_ids), 200):
+            rows = self.db.table("smart_alerts").select("document_id").in_(
+                "document_id", document_ids[i:i + 200]
+            ).execute()
+            existing.update(a["document_id"] for a in rows.data or [])
+        return existing
+    
+    def _in_flight_batch_doc_ids(self) -> set:
+        """제출·진행 중이거나 재처리 대기 중인 긴급도 Batch에 포함된 document_id (테이블 미생성이면 빈 집합)."""
+        in_flight: set = set()
+        if not SmartAlertService._batch_table_available:
+            return in_flight
+        try:
+            pending = self.db.table("alert_batches").select("document_ids").in_(
+                "status", ["submitted", "in_progress", "needs_retry"]
+            ).execute()
+        except Exception as e:
+            if not is_missing_table_error(e):
+                raise
+            _log.warning("alert_batches table not found, skipping in-flight batch check: %s", e)
+            SmartAlertService._batch_table_available = False
+            return in_flight
+        for row in pending.data or []:
+            in_flight.update(row.get("document_ids") or [])
+        return in_flight
+    
+    async def submit_urgency_batch(self, document_ids: List[str]) -> Optional[str]:
+        """문서 긴급도 분석을 OpenAI Batch API로 제출하고 batch_id를 alert_batches에 기록.
+        
+        이미 제출 대기 중인 문서는 제외. 제출할 문서가 없거나 실패하면 None.
+        """
+        if not document_ids:
+            return None
+        
+        in_flight = self._in_flight_batch_doc_ids()
+        
+        lines: List[str] = []
+        submitted_ids: List[str] = []
+        for document_id in document_ids:
+            if document_id in in_flight:
+                continue
+            loaded = self._load_document(document_id)
+            if loaded is None:
+                continue
+            doc, full_text = loaded
+            lines.append(_json_text({
+                "custom_id": document_id,
+                "method": "POST",
+                "url": "/v1/chat/completions",
+                "body": _urgency_request_body(doc["title"], full_text),
+            }))
+            submitted_ids.append(document_id)
+        
+        if not lines:
+            return None
+        
+        try:
+            batch_file = await self.openai_client.files.create(
+                file=("urgency_batch.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            # openai SDK 버전에 batches 리소스가 없으면 동일 엔드포인트를 직접 호출
+            batch_body = {
+                "input_file_id": batch_file.id,
+                "endpoint": "/v1/chat/completions",
+                "completion_window": "24h",
+            }
+            if hasattr(self.openai_client, "batches"):
+                batch = (await self.openai_client.batches.create(**batch_body)).model_dump()
+            else:
+                batch = await self.openai_client.post("/batches", body=batch_body, cast_to=object)
+        except Exception as e:
+            _log.warning("Urgency batch submission failed: %s", e)
+            return None
+        
+        batch_id = batch["id"]
+        self.db.table("alert_batches").insert({
+            "batch_id": batch_id,
+            "document_ids": submitted_ids,
+            "status": "submitted",
+            "submitted_at": datetime.now(timezone.utc).isoformat()
+        }).execute()
+        SmartAlertService._batch_submitted = True
+        _log.info("Submitted urgency batch %s for %s documents", batch_id, len(submitted_ids))
+        return batch_id
+    
+    async def poll_urgency_batches(self) -> List[SmartAlertResponse]:
+        """제출된 Batch 상태를 확인하고, 완료된 결과로 알림 생성 (기존 점수·저장 경로 재사용).
+        
+        실패·만료된 Batch나 결과 줄을 쓸 수 없는 문서는 unfinished_document_ids에 기록하고
+        실시간 분석으로 바로 재처리 (수집 24시간 조회 범위와 무관하게 알림 누락 방지).
+        """
+        pending = self.db.table("alert_batches").select(
+            "batch_id, document_ids, status, unfinished_document_ids, retry_count"
+        ).in_("status", ["submitted", "in_progress", "needs_retry"]).execute()
+        
+        alerts: List[SmartAlertResponse] = []
+        for row in pending.data or []:
+            batch_id = row["batch_id"]
+            if row.get("status") == "needs_retry":
+                # 이전 poll에서 재처리를 끝내지 못한 문서
+                alerts.extend(await self._retry_unfinished_batch_docs(
+                    batch_id, row.get("unfinished_document_ids") or [], row.get("retry_count") or 0
+                ))
+                continue
+            
+            try:
+                if hasattr(self.openai_client, "batches"):
+                    batch = (await self.openai_client.batches.retrieve(batch_id)).model_dump()
+                else:
+                    batch = await self.openai_client.get(f"/batches/{batch_id}", cast_to=object)
+            except Exception as e:
+                _log.warning("Urgency batch %s status check failed: %s", batch_id, e)
+                continue
+            
+            status = batch.get("status")
+            if status in ("validating", "in_progress", "finalizing"):
+                self.db.table("alert_batches").update({"status": "in_progress"}).eq(
+                    "batch_id", batch_id
+                ).execute()
+                continue
+            
+            results: List[tuple] = []
+            if status == "completed" and batch.get("output_file_id"):
+                output = await self.openai_client.files.content(batch["output_file_id"])
+                for line in output.text.splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        item = orjson.loads(line)
+                        body = item["response"]["body"]
+                        analysis = orjson.loads(body["choices"][0]["message"]["content"])
+                    except Exception as e:
+                        _log.warning("Urgency batch %s: unusable result line: %s", batch_id, e)
+                        continue
+                    results.append((item["custom_id"], analysis))
+            else:
+                _log.warning("Urgency batch %s ended with status %s", batch_id, status)
+            
+            # 이전 poll이 알림 생성 도중 중단돼 상태를 못 바꾼 Batch면 이미 만든 알림은 건너뜀
+            done_ids = self._existing_alert_doc_ids(row.get("document_ids") or [])
+            for document_id, analysis in results:
+                if document_id in done_ids:
+                    continue
+                alert = await self.create_smart_alert(document_id, analysis=analysis)
                 if alert:
                     alerts.append(alert)
+                    done_ids.add(document_id)
+            
+            # 결과가 없거나 알림을 만들지 못한 문서 (failed/expired/cancelled Batch면 전체)
+            unfinished = [d for d in row.get("document_ids") or [] if d not in done_ids]
+            if unfinished:
+                # 재처리 도중 중단돼도 다음 poll에서 이어가도록 먼저 기록
+                self.db.table("alert_batches").update({
+                    "status": "needs_retry",
+                    "unfinished_document_ids": unfinished,
+                }).eq("batch_id", batch_id).execute()
+                alerts.extend(await self._retry_unfinished_batch_docs(batch_id, unfinished, 0))
+            else:
+                self.db.table("alert_batches").update({
+                    "status": "completed",
+                    "completed_at": datetime.now(timezone.utc).isoformat()
+                }).eq("batch_id", batch_id).execute()
         
         return alerts
     
+    async def _retry_unfinished_batch_docs(
+        self,
+        batch_id: str,
+        document_ids: List[str],
+        retry_count: int
+    ) -> List[SmartAlertResponse]:
+        """Batch에서 알림을 만들지 못한 문서를 실시간 분석으로 재처리하고 남은 문서를 Batch 행에 갱신."""
+        existing = self._existing_alert_doc_ids(document_ids)
+        alerts, remaining = await self._create_alerts([d for d in document_ids if d not in existing])
+        
+        retry_count += 1
+        update: Dict[str, Any] = {"unfinished_document_ids": remaining, "retry_count": retry_count}
+        if not remaining:
+            update["status"] = "completed"
+        elif retry_count >= self._BATCH_RETRY_LIMIT:
+            # 재시도 한도 초과: 남은 문서 ID는 unfinished_document_ids에 보존 (수동 확인용)
+            _log.error("Urgency batch %s: %s documents still without alerts", batch_id, len(remaining))
+            update["status"] = "failed"
+        if "status" in update:
+            update["completed_at"] = datetime.now(timezone.utc).isoformat()
+        self.db.table("alert_batches").update(update).eq("batch_id", batch_id).execute()
+        return alerts
+    
     async def get_alerts(
         self,
         industries: Optional[List[IndustryType]] = None,
@@ -254,34 +680,30 @@ class SmartAlertService:
     ) -> List[SmartAlertResponse]:
         """Get alerts with optional filters."""
         
+        # 필터는 DB에서 적용 — 사후 필터링 시 limit보다 적게 반환되고 불필요한 행까지 전송됨
         query = self.db.table("smart_alerts").select(
             "*, documents(title, published_at)"
-        ).order("urgency_score", desc=True).limit(limit)
+        )
+        
+        if industries:
+            query = query.ov("industries", [i.value for i in industries])
+        
+        if min_priority:
+            allowed = [
+                p.value for p, rank in _PRIORITY_RANK.items()
+                if rank <= _PRIORITY_RANK[min_priority]
+            ]
+            query = query.in_("priority", allowed)
         
-        result = query.execute()
+        result = query.order("urgency_score", desc=True).limit(limit).execute()
         
         if not result.data:
             return []
         
         alerts = []
-        priority_order = {
-            AlertPriority.CRITICAL: 0,
-            AlertPriority.HIGH: 1,
-            AlertPriority.MEDIUM: 2,
-            AlertPriority.LOW: 3
-        }
-        
         for item in result.data:
-            item_industries = [IndustryType(i) for i in item.get("industries", [])]
-            item_priority = AlertPriority(item["priority"])
-            
-            if industries:
-                if not any(ind in item_industries for ind in industries):
-                    continue
-            
-            if min_priority:
-                if priority_order[item_priority] > priority_order[min_priority]:
-                    continue
+            item_industries = [_INDUSTRY_ENUM[i] for i in item.get("industries", [])]
+            item_priority = _PRIORITY_ENUM[item["priority"]]
             
             alerts.append(SmartAlertResponse(
                 alert_id=item["alert_id"],
@@ -292,9 +714,9 @@ class SmartAlertService:
                 urgency_score=item["urgency_score"],
                 industries=item_industries,
                 impact_summary=item.get("impact_summary", ""),
-                key_deadlines=json.loads(item.get("key_deadlines", "[]")),
-                action_items=json.loads(item.get("action_items", "[]")),
-                affected_regulations=json.loads(item.get("affected_regulations", "[]")),
+                key_deadlines=orjson.loads(item.get("key_deadlines") or "[]"),
+                action_items=orjson.loads(item.get("action_items") or "[]"),
+                affected_regulations=orjson.loads(item.get("affected_regulations") or "[]"),
                 generated_at=item["generated_at"],
                 notification_sent=item.get("notification_sent", False)
             ))
@@ -304,12 +726,23 @@ class SmartAlertService:
     async def send_webhook_notification(
         self,
         alert: SmartAlertResponse,
-        webhook_url: str
+        webhook_url: str,
+        payload: Optional[Dict[str, Any]] = None
     ) -> bool:
         """Send alert to webhook URL."""
-        import httpx
+        if payload is None:
+            payload = self._webhook_payload(alert)
         
-        payload = {
+        try:
+            response = await self._http.post(webhook_url, json=payload)
+            return response.status_code == 200
+        except Exception as e:
+            _log.warning("Webhook notification failed: %s", e)
+            return False
+    
+    @staticmethod
+    def _webhook_payload(alert: SmartAlertResponse) -> Dict[str, Any]:
+        return {
             "alert_id": alert.alert_id,
             "document_title": alert.document_title,
             "priority": alert.priority.value,
@@ -317,21 +750,9 @@ class SmartAlertService:
             "industries": [i.value for i in alert.industries],
             "impact_summary": alert.impact_summary,
             "action_items": alert.action_items,
-            "key_deadlines": alert.key_deadlines,
+            "key_deadlines": [d.model_dump() for d in alert.key_deadlines],
             "generated_at": alert.generated_at.isoformat()
         }
-        
-        try:
-            async with httpx.AsyncClient() as client:
-                response = await client.post(
-                    webhook_url,
-                    json=payload,
-                    timeout=10.0
-                )
-                return response.status_code == 200
-        except Exception as e:
-            _log.warning("Webhook notification failed: %s", e)
-            return False
     
     async def create_subscription(
         self,
@@ -348,48 +769,90 @@ class SmartAlertService:
             "is_active": subscription.is_active
         }
         
-        existing = self.db.table("alert_subscriptions").select("*").eq(
-            "user_email", subscription.user_email
-        ).execute()
-        
-        if existing.data:
-            result = self.db.table("alert_subscriptions").update(sub_data).eq(
+        result = None
+        if SmartAlertService._subs_upsert_available:
+            # user_email UNIQUE 기준 단일 upsert (조회 후 갱신/삽입 2회 왕복 및 동시 수정 경합 제거)
+            try:
+                result = self.db.table("alert_subscriptions").upsert(
+                    sub_data, on_conflict="user_email"
+                ).execute()
+            except Exception as e:
+                if not is_missing_conflict_target_error(e):
+                    raise
+                _log.warning("alert_subscriptions.user_email is not UNIQUE yet, using select-then-write: %s", e)
+                SmartAlertService._subs_upsert_available = False
+        
+        if result is None:
+            existing = self.db.table("alert_subscriptions").select("subscription_id").eq(
                 "user_email", subscription.user_email
             ).execute()
-        else:
-            result = self.db.table("alert_subscriptions").insert(sub_data).execute()
+            if existing.data:
+                result = self.db.table("alert_subscriptions").update(sub_data).eq(
+                    "user_email", subscription.user_email
+                ).execute()
+            else:
+                result = self.db.table("alert_subscriptions").insert(sub_data).execute()
         
         if result.data:
             subscription.subscription_id = result.data[0].get("subscription_id")
         
+        self._invalidate_subscriptions()
         return subscription
     
+    def _invalidate_subscriptions(self) -> None:
+        """구독 목록 캐시(L1·Redis) 삭제 + 다른 워커에 무효화 알림."""
+        _clear_subscriptions_l1()
+        cache_delete(_SUBS_CACHE_KEY)
+        try:
+            if hasattr(self.redis, "publish"):
+                self.redis.publish(_SUBS_INVALIDATE_CHANNEL, "1")
+        except Exception as e:
+            _log.debug("Subscription invalidation publish failed: %s", e)
+    
     async def get_subscriptions(
         self,
         user_email: Optional[str] = None
     ) -> List[AlertSubscription]:
-        """Get alert subscriptions."""
-        
-        query = self.db.table("alert_subscriptions").select("*")
-        
-        if user_email:
-            query = query.eq("user_email", user_email)
-        
-        result = query.execute()
+        """Get alert subscriptions.
+        
+        전체 목록(user_email 없음)은 알림마다 조회되므로 워커 내 L1(30초) → Redis → DB 순으로 조회
+        (create_subscription에서 무효화).
+        """
+        global _subs_l1
+        if not user_email:
+            _ensure_subscription_listener(self.redis)
+            l1 = _subs_l1
+            if l1 is not None and time.monotonic() - l1[0] < _SUBS_L1_TTL:
+                return list(l1[1])
+        
+        rows = cache_get(_SUBS_CACHE_KEY) if not user_email else None
+        
+        if rows is None:
+            query = self.db.table("alert_subscriptions").select("*")
+            
+            if user_email:
+                query = query.eq("user_email", user_email)
+            
+            rows = query.execute().data or []
+            if not user_email:
+                cache_set(_SUBS_CACHE_KEY, rows, CACHE_TTL_ALERT_SUBSCRIPTIONS)
         
         subscriptions = []
-        if result.data:
-            for item in result.data:
+        if rows:
+            for item in rows:
                 subscriptions.append(AlertSubscription(
                     subscription_id=item.get("subscription_id"),
                     user_email=item["user_email"],
-                    industries=[IndustryType(i) for i in item.get("industries", [])],
-                    channels=[AlertChannel(c) for c in item.get("channels", [])],
-                    min_priority=AlertPriority(item.get("min_priority", "medium")),
+                    industries=[_INDUSTRY_ENUM[i] for i in item.get("industries", [])],
+                    channels=[_CHANNEL_ENUM[c] for c in item.get("channels", [])],
+                    min_priority=_PRIORITY_ENUM[item.get("min_priority", "medium")],
                     webhook_url=item.get("webhook_url"),
                     is_active=item.get("is_active", True)
                 ))
         
+        if not user_email:
+            _subs_l1 = (time.monotonic(), subscriptions)
+            return list(subscriptions)
         return subscriptions
     
     async def notify_subscribers(
@@ -400,13 +863,7 @@ class SmartAlertService:
         
         subscriptions = await self.get_subscriptions()
         notified_count = 0
-        
-        priority_order = {
-            AlertPriority.CRITICAL: 0,
-            AlertPriority.HIGH: 1,
-            AlertPriority.MEDIUM: 2,
-            AlertPriority.LOW: 3
-        }
+        webhook_urls: List[str] = []
         
         for sub in subscriptions:
             if not sub.is_active:
@@ -415,20 +872,24 @@ class SmartAlertService:
             if not any(ind in sub.industries for ind in alert.industries):
                 continue
             
-            if priority_order[alert.priority] > priority_order[sub.min_priority]:
+            if _PRIORITY_RANK[alert.priority] > _PRIORITY_RANK[sub.min_priority]:
                 continue
             
             for channel in sub.channels:
-                success = False
-                
                 if channel == AlertChannel.WEBHOOK and sub.webhook_url:
-                    success = await self.send_webhook_notification(alert, sub.webhook_url)
+                    webhook_urls.append(sub.webhook_url)
                 elif channel == AlertChannel.IN_APP:
-                    success = True
-                
-                if success:
                     notified_count += 1
         
+        # 웹훅은 서로 독립 → 동시 발송 (payload는 알림당 1회 생성)
+        if webhook_urls:
+            payload = self._webhook_payload(alert)
+            results = await asyncio.gather(
+                *(self.send_webhook_notification(alert, url, payload) for url in webhook_urls),
+                return_exceptions=True
+            )
+            notified_count += sum(1 for ok in results if ok is True)
+        
         if notified_count > 0:
             self.db.table("smart_alerts").update(
                 {"notification_sent": True}
@@ -437,11 +898,28 @@ class SmartAlertService:
         return notified_count
     
     async def get_alert_stats(self) -> AlertStatsResponse:
-        """Get alert statistics."""
+        """Get alert statistics.
+        
+        get_alert_stats_24h RPC로 DB에서 한 번에 집계. 미배포 환경이면 행 조회 후 Python 집계.
+        """
+        if SmartAlertService._stats_rpc_available:
+            try:
+                stats = self.db.rpc("get_alert_stats_24h", {}).execute().data
+                if isinstance(stats, list):
+                    stats = stats[0] if stats else {}
+                return AlertStatsResponse(**stats)
+            except Exception as e:
+                if is_missing_rpc_error(e):
+                    _log.warning("get_alert_stats_24h RPC not deployed, aggregating in Python: %s", e)
+                    SmartAlertService._stats_rpc_available = False
+                else:
+                    _log.warning("get_alert_stats_24h RPC failed, aggregating in Python for this call: %s", e)
         
         cutoff = (datetime.now(timezone.utc) - timedelta(hours=24)).isoformat()
         
-        alerts_result = self.db.table("smart_alerts").select("*").gte(
+        alerts_result = self.db.table("smart_alerts").select(
+            "priority, industries, urgency_score, notification_sent"
+        ).gte(
             "generated_at", cutoff
         ).execute()
         
@@ -482,6 +960,14 @@ class SmartAlertService:
 _alert_service: Optional[SmartAlertService] = None
 
 
+async def close_alert_service() -> None:
+    """싱글톤이 생성된 경우에만 HTTP 클라이언트 종료."""
+    global _alert_service
+    if _alert_service is not None:
+        await _alert_service.close()
+        _alert_service = None
+
+
 def get_alert_service() -> SmartAlertService:
     """Get singleton alert service instance."""
     global _alert_service
@@ -6,8 +6,10 @@
 # ======================================================================
 
 """Compliance checklist extraction service."""
+import asyncio
 import logging
 import openai
+import orjson
 import json
 import re
 from typing import List, Dict, Any, Optional
@@ -19,6 +21,15 @@ from app.models.schemas import ChecklistRequest, ChecklistResponse, ChecklistIte
 
 _log = logging.getLogger(__name__)
 
+_KOREAN_WORD_RE = re.compile(r'[가-힣]{2,}')
+_DATE_RE = re.compile(r'(\d{4})[년.-]\s*(\d{1,2})[월.-]\s*(\d{1,2})')
+
+
+def _phrase_scanner(phrases) -> "re.Pattern":
+    """구절 집합을 한 번에 찾는 패턴. 긴 구절 우선 + lookahead로 위치마다 겹치는 매치까지 수집."""
+    alternation = "|".join(map(re.escape, sorted(phrases, key=len, reverse=True)))
+    return re.compile(f"(?=({alternation}))")
+
 
 class ChecklistService:
     """Extract compliance checklist items from documents."""
@@ -31,7 +42,7 @@ class ChecklistService:
         """Extract checklist from document."""
         
         # Get document
-        doc_result = self.db.table("documents").select("*").eq(
+        doc_result = self.db.table("documents").select("document_id, title").eq(
             "document_id", request.document_id
         ).execute()
         
@@ -78,19 +89,22 @@ class ChecklistService:
         if checklist_result.data and len(checklist_result.data) > 0:
             checklist_id = checklist_result.data[0]["checklist_id"]
         
-        # Save items
-        for item in items:
-            self.db.table("checklist_items").insert({
-                "checklist_id": checklist_id,
-                "action": item.action,
-                "target": item.target,
-                "due_date_text": item.due_date_text,
-                "effective_date": item.effective_date.isoformat() if item.effective_date else None,
-                "scope": item.scope,
-                "penalty": item.penalty,
-                "evidence_chunk_id": item.evidence_chunk_id,
-                "confidence": item.confidence
-            }).execute()
+        # Save items (한 번의 bulk insert로 왕복 1회)
+        if items:
+            self.db.table("checklist_items").insert([
+                {
+                    "checklist_id": checklist_id,
+                    "action": item.action,
+                    "target": item.target,
+                    "due_date_text": item.due_date_text,
+                    "effective_date": item.effective_date.isoformat() if item.effective_date else None,
+                    "scope": item.scope,
+                    "penalty": item.penalty,
+                    "evidence_chunk_id": item.evidence_chunk_id,
+                    "confidence": item.confidence
+                }
+                for item in items
+            ]).execute()
         
         return ChecklistResponse(
             checklist_id=checklist_id,
@@ -139,31 +153,31 @@ class ChecklistService:
                     {"role": "user", "content": prompt}
                 ],
                 temperature=0.2,
-                max_tokens=1500
+                max_tokens=1500,
+                response_format={"type": "json_object"}
             )
             
             content = response.choices[0].message.content
             _log.debug("Checklist LLM response length=%s", len(content or ""))
             
-            # Extract JSON
-            json_match = re.search(r'\{.*\}', content, re.DOTALL)
-            if json_match:
-                data = json.loads(json_match.group())
+            # json_object 모드라 응답 전체가 JSON — 정규식으로 본문을 다시 훑지 않음
+            data = json.loads(content or "{}")
+            if isinstance(data, dict):
                 checklist_data = data.get("checklist", [])
                 _log.debug("Extracted %s checklist items", len(checklist_data))
                 
+                # Find evidence chunks (모든 항목을 한 번에: 청크당 1회 스캔)
+                evidence_chunk_ids = self._find_evidence_chunks(
+                    [item_data.get("action", "") for item_data in checklist_data],
+                    chunks
+                )
+                
                 items = []
-                for item_data in checklist_data:
-                    # Find evidence chunk
-                    evidence_chunk_id = await self._find_evidence_chunk(
-                        item_data.get("action", ""),
-                        chunks
-                    )
-                    
+                for item_data, evidence_chunk_id in zip(checklist_data, evidence_chunk_ids):
                     # Parse effective date
                     effective_date = None
                     due_text = item_data.get("due_date_text", "")
-                    date_match = re.search(r'(\d{4})[년.-]\s*(\d{1,2})[월.-]\s*(\d{1,2})', due_text)
+                    date_match = _DATE_RE.search(due_text) if due_text else None
                     if date_match:
                         try:
                             effective_date = datetime(
@@ -192,28 +206,51 @@ class ChecklistService:
         
         return []
     
-    async def _find_evidence_chunk(
+    def _find_evidence_chunks(
         self,
-        action_text: str,
+        action_texts: List[str],
         chunks: List[Dict[str, Any]]
-    ) -> Optional[str]:
-        """Find chunk containing evidence for action."""
+    ) -> List[Optional[str]]:
+        """Find the evidence chunk for each action (근거 구절 2개 이상 겹치는 최고 점수 청크, 없으면 None).
+        
+        모든 항목의 구절을 하나의 패턴으로 묶어 청크를 한 번씩만 스캔 — 항목 수 × 청크 수 스캔 제거.
+        """
+        # Extract key phrases per action (중복 구절은 기존과 같이 횟수만큼 가중)
+        item_phrase_counts: List[Dict[str, int]] = []
+        all_phrases: set = set()
+        for action_text in action_texts:
+            counts: Dict[str, int] = {}
+            for phrase in _KOREAN_WORD_RE.findall(action_text):
+                counts[phrase] = counts.get(phrase, 0) + 1
+            item_phrase_counts.append(counts)
+            all_phrases.update(counts)
         
-        # Extract key phrases from action
-        key_phrases = re.findall(r'[가-힣]{2,}', action_text)
+        if not all_phrases:
+            return [None] * len(action_texts)
         
-        best_chunk = None
-        best_score = 0
+        best_chunks: List[Optional[Dict[str, Any]]] = [None] * len(action_texts)
+        best_scores = [0] * len(action_texts)
+        scanner = _phrase_scanner(all_phrases)
         
         for chunk in chunks:
-            chunk_text = chunk.get("chunk_text", "")
-            score = sum(1 for phrase in key_phrases if phrase in chunk_text)
-            
-            if score > best_score:
-                best_score = score
-                best_chunk = chunk
+            matched = set(scanner.findall(chunk.get("chunk_text", "")))
+            if not matched:
+                continue
+            # 위치마다 가장 긴 구절만 잡히므로, 매치된 구절에 포함된 짧은 구절도 등장한 것으로 계산
+            present = {
+                phrase for phrase in all_phrases
+                if phrase in matched or any(phrase in m for m in matched)
+            }
+            for idx, counts in enumerate(item_phrase_counts):
+                score = sum(n for phrase, n in counts.items() if phrase in present)
+                if score > best_scores[idx]:
+                    best_scores[idx] = score
+                    best_chunks[idx] = chunk
         
-        return best_chunk["chunk_id"] if best_chunk and best_score >= 2 else None
+        return [
+            chunk["chunk_id"] if chunk and score >= 2 else None
+            for chunk, score in zip(best_chunks, best_scores)
+        ]
     
     async def get_checklist_by_document(
         self,
@@ -282,13 +319,16 @@ class ChecklistService:
             generated_at=gen_at
         )
     
-    def export_checklist(
+    async def export_checklist(
         self,
         checklist: ChecklistResponse,
         format: str = "json"
     ) -> str:
-        """Export checklist to various formats."""
-        
+        """Export checklist to various formats (직렬화는 스레드에서 수행해 이벤트 루프 비차단)."""
+        return await asyncio.to_thread(self._render_export, checklist, format)
+    
+    @staticmethod
+    def _render_export(checklist: ChecklistResponse, format: str) -> str:
         if format == "markdown":
             lines = [
                 f"# 준수 체크리스트: {checklist.document_title}",
@@ -327,7 +367,7 @@ class ChecklistService:
             return output.getvalue()
         
         else:  # json
-            return json.dumps({
+            return orjson.dumps({
                 "document_id": checklist.document_id,
                 "document_title": checklist.document_title,
                 "generated_at": checklist.generated_at.isoformat(),
@@ -343,4 +383,4 @@ class ChecklistService:
                     }
                     for item in checklist.items
                 ]
-            }, ensure_ascii=False, indent=2)
+            }, option=orjson.OPT_INDENT_2).decode()
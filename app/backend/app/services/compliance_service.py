@@ -6,12 +6,17 @@
 # ======================================================================
 
 """Main compliance hub service."""
+from collections import defaultdict
 from typing import List, Dict, Any, Optional, Tuple
-from datetime import datetime, timezone
+from datetime import date, datetime, timezone
+from enum import Enum
 from uuid import UUID
 
+from pydantic import TypeAdapter
+
 from app.core.database import get_db
 from app.services.checklist_service import ChecklistService
+from app.services.compliance_tracker import get_document_title
 from app.services.risk_scoring_service import RiskScoringService
 from app.services.notification_service import NotificationService
 from app.models.compliance_schemas import (
@@ -25,6 +30,21 @@ from app.models.compliance_schemas import (
 )
 from app.models.schemas import ChecklistRequest
 
+# 목록 응답은 행마다 model_validate 호출 대신 리스트 단위로 한 번에 검증
+_CHECKLIST_LIST_ADAPTER = TypeAdapter(List[ComplianceChecklistResponse])
+_AUDIT_LIST_ADAPTER = TypeAdapter(List[ComplianceActionItemAuditResponse])
+
+
+def _norm(value: Any) -> Any:
+    """변경 비교·감사 로그용 정규화: Enum→값, 날짜→ISO 문자열, UUID→문자열, 나머지는 그대로."""
+    if isinstance(value, Enum):
+        return value.value
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, UUID):
+        return str(value)
+    return value
+
 
 class ComplianceService:
     """Manages compliance documents, checklists, and action items."""
@@ -51,23 +71,20 @@ class ComplianceService:
             return ComplianceDocumentResponse.model_validate(result.data[0])
             
         # Create new entry: Fetch original doc info first
-        doc_result = self.db.table("documents").select("*").eq(
-            "document_id", original_document_id
-        ).execute()
+        title = get_document_title(original_document_id)
         
-        if not doc_result.data:
+        if title is None:
             raise ValueError(f"Original document {original_document_id} not found")
-            
-        doc = doc_result.data[0]
         
+        now_iso = datetime.now(timezone.utc).isoformat()
         new_doc = {
             "original_document_id": original_document_id,
-            "title": doc["title"],
+            "title": title,
             "version": "1.0",
             "status": "active",
             "created_by_user_id": created_by_user_id,
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso
         }
         
         insert_result = self.db.table("compliance_documents").insert(new_doc).execute()
@@ -85,6 +102,9 @@ class ComplianceService:
     ) -> ComplianceChecklistResponse:
         """Create compliance checklist and its action items from extracted data."""
         
+        # 생성 시각은 호출당 1회 계산 — 체크리스트와 모든 항목이 같은 타임스탬프 공유
+        now_iso = datetime.now(timezone.utc).isoformat()
+        
         # 1. Create the checklist row
         new_checklist = {
             "compliance_doc_id": compliance_doc_id,
@@ -94,8 +114,8 @@ class ComplianceService:
             "created_by_user_id": created_by_user_id,
             "risk_score": 0.0,
             "risk_level": "low",
-            "created_at": datetime.now(timezone.utc).isoformat(),
-            "updated_at": datetime.now(timezone.utc).isoformat()
+            "created_at": now_iso,
+            "updated_at": now_iso
         }
         
         checklist_result = self.db.table("compliance_checklists").insert(new_checklist).execute()
@@ -121,21 +141,19 @@ class ComplianceService:
                 "notes": f"Extract from document (Evidence chunk: {item.evidence_chunk_id})",
                 "evidence_chunk_id": item.evidence_chunk_id,
                 "llm_confidence": item.confidence,
-                "created_at": datetime.now(timezone.utc).isoformat(),
-                "updated_at": datetime.now(timezone.utc).isoformat()
+                "created_at": now_iso,
+                "updated_at": now_iso
             })
             
+        # insert 응답(RETURNING)에 생성된 action_item_id 포함 — 재조회 불필요
+        inserted_items: List[Dict[str, Any]] = []
         if action_items_to_insert:
-            self.db.table("compliance_action_items").insert(action_items_to_insert).execute()
+            insert_result = self.db.table("compliance_action_items").insert(action_items_to_insert).execute()
+            inserted_items = insert_result.data or []
             
         # 3. Calculate initial risk for the checklist (which triggers item risks)
-        # We need to do this after items are inserted
-        items_in_db = self.db.table("compliance_action_items").select("*").eq(
-            "checklist_id", checklist_id
-        ).execute()
-        
-        for db_item in items_in_db.data:
-             await self.risk_service.recalculate_action_item_risk(db_item["action_item_id"])
+        # 항목별 조회·갱신·체크리스트 재계산을 직렬로 반복하지 않고 한 번에 반영
+        await self.risk_service.recalculate_action_items_risk(inserted_items)
              
         # Return full response
         return await self.get_compliance_checklist(checklist_id)
@@ -197,17 +215,23 @@ class ComplianceService:
             
         result = query.execute()
         
-        checklists = []
+        if not result.data:
+            return []
+        
+        # 체크리스트별 조회(N+1) 대신 action item을 IN 쿼리 1회로 가져와 묶음
+        checklist_ids = [row["checklist_id"] for row in result.data]
+        items_result = self.db.table("compliance_action_items").select("*").in_(
+            "checklist_id", checklist_ids
+        ).execute()
+        
+        items_by_checklist: Dict[str, List[Dict[str, Any]]] = defaultdict(list)
+        for item in items_result.data or []:
+            items_by_checklist[item["checklist_id"]].append(item)
+        
         for row in result.data:
-            # We can't afford too many individual queries, 
-            # but for a small list it's okay. In real production use joins or a nested view.
-            items_result = self.db.table("compliance_action_items").select("*").eq(
-                "checklist_id", row["checklist_id"]
-            ).execute()
-            row["action_items"] = items_result.data
-            checklists.append(ComplianceChecklistResponse.model_validate(row))
+            row["action_items"] = items_by_checklist.get(row["checklist_id"], [])
             
-        return checklists
+        return _CHECKLIST_LIST_ADAPTER.validate_python(result.data)
 
     async def update_action_item(
         self, 
@@ -229,26 +253,24 @@ class ComplianceService:
         
         # 2. Prepare update data
         update_data = item_update.model_dump(exclude_unset=True)
+        now_iso = datetime.now(timezone.utc).isoformat()
         
         # Auto-set completed_at if status changed to completed
         if update_data.get("status") == ActionItemStatus.COMPLETED and old_item.get("status") != ActionItemStatus.COMPLETED:
-            update_data["completed_at"] = datetime.now(timezone.utc).isoformat()
+            update_data["completed_at"] = now_iso
         elif update_data.get("status") and update_data.get("status") != ActionItemStatus.COMPLETED:
              update_data["completed_at"] = None
              
         # 3. Write Audit Trail
-        changed_fields = []
-        old_values = {}
-        new_values = {}
-        
-        for key, val in update_data.items():
-             # Basic value comparison (for simple types)
-             old_val = old_item.get(key)
-             # Stringify if it's a date/uuid for comparison
-             if str(old_val) != str(val):
-                  changed_fields.append(key)
-                  old_values[key] = old_val
-                  new_values[key] = val
+        # DB 값(JSON)과 요청 값(Enum/date/UUID)을 같은 표현으로 맞춰 한 번에 비교 — 필드마다 str() 생성 없음
+        diff = {
+            key: (old_item.get(key), new_val)
+            for key, new_val in ((k, _norm(v)) for k, v in update_data.items())
+            if old_item.get(key) != new_val
+        }
+        changed_fields = list(diff)
+        old_values = {key: old for key, (old, _) in diff.items()}
+        new_values = {key: new for key, (_, new) in diff.items()}
                   
         if changed_fields:
              audit_log = {
@@ -257,19 +279,17 @@ class ComplianceService:
                  "old_values": old_values,
                  "new_values": new_values,
                  "changed_fields": changed_fields,
-                 "created_at": datetime.now(timezone.utc).isoformat()
+                 "created_at": now_iso
              }
              self.db.table("compliance_action_item_audits").insert(audit_log).execute()
              
-             # Apply update
-             self.db.table("compliance_action_items").update(update_data).eq("action_item_id", action_item_id).execute()
-             
-             # 4. Trigger Recalculations and Notifications
-             # Re-fetch the item to get full state
-             updated_result = self.db.table("compliance_action_items").select("*").eq(
+             # Apply update (PostgREST update 응답에 갱신된 행 전체 포함 — 재조회 불필요)
+             updated_result = self.db.table("compliance_action_items").update(update_data).eq(
                  "action_item_id", action_item_id
              ).execute()
-             new_item = updated_result.data[0]
+             
+             # 4. Trigger Recalculations and Notifications
+             new_item = updated_result.data[0] if updated_result.data else {**old_item, **update_data}
              
              # Risk recalculation if status or due_date changed
              if "status" in changed_fields or "due_date" in changed_fields:
@@ -289,4 +309,18 @@ class ComplianceService:
             "action_item_id", action_item_id
         ).order("created_at", desc=True).execute()
         
-        return [ComplianceActionItemAuditResponse.model_validate(row) for row in result.data]
+        return _AUDIT_LIST_ADAPTER.validate_python(result.data or [])
+
+
+_compliance_hub_service: Optional[ComplianceService] = None
+
+
+def get_compliance_hub_service() -> ComplianceService:
+    """Get singleton compliance hub service instance.
+    
+    요청마다 생성하면 내부 ChecklistService의 OpenAI 클라이언트(httpx 커넥션 풀)가 매번 새로 만들어짐.
+    """
+    global _compliance_hub_service
+    if _compliance_hub_service is None:
+        _compliance_hub_service = ComplianceService()
+    return _compliance_hub_service
@@ -11,15 +11,44 @@ Tracks regulatory compliance tasks derived from alerts and policy documents.
 Provides workflow management for compliance teams.
 """
 import json
-from typing import List, Dict, Any, Optional
+import logging
+import time
+from typing import List, Dict, Any, Optional, Tuple
 from datetime import datetime, timedelta, timezone, date
 from enum import Enum
 
 from app.core.config import settings
-from app.core.database import get_db
+from app.core.database import get_db, is_missing_rpc_error
 from app.models.schemas import IndustryType
 
 
+# documents.title 조회 캐시 (document_id → (저장 시각, 제목)). 알림 1건에서 작업 N개 생성 시 반복 조회 방지
+_TITLE_CACHE_TTL = 300.0
+_TITLE_CACHE_MAX = 4096
+_title_cache: Dict[str, Tuple[float, str]] = {}
+
+
+def get_document_title(document_id: str) -> Optional[str]:
+    """문서 제목 (TTL 캐시). 문서가 없으면 None — 없는 결과는 캐시하지 않음."""
+    now = time.monotonic()
+    hit = _title_cache.get(document_id)
+    if hit is not None and now - hit[0] < _TITLE_CACHE_TTL:
+        return hit[1]
+    
+    result = get_db().table("documents").select("title").eq(
+        "document_id", document_id
+    ).execute()
+    if not result.data:
+        return None
+    
+    title = result.data[0]["title"]
+    if len(_title_cache) >= _TITLE_CACHE_MAX:
+        # 삽입 순서상 가장 오래된 항목부터 제거
+        _title_cache.pop(next(iter(_title_cache)))
+    _title_cache[document_id] = (now, title)
+    return title
+
+
 class TaskStatus(str, Enum):
     PENDING = "pending"
     IN_PROGRESS = "in_progress"
@@ -103,8 +132,24 @@ class ComplianceTask:
 class ComplianceTrackerService:
     """Service for managing compliance tasks."""
     
+    # compliance_task_stats RPC 미배포 환경이면 Python 집계 경로로 고정 (그 외 일시 오류는 해당 호출만 폴백)
+    _stats_rpc_available = True
+    # compliance_task_history RPC도 동일하게 처리
+    _history_rpc_available = True
+    
     def __init__(self):
         self.db = get_db()
+        # 기한 경과 pending → overdue DB 반영을 마지막으로 수행한 날짜 (워커당 하루 1회)
+        self._overdue_synced_on: Optional[date] = None
+    
+    def _sync_overdue_statuses(self, today: date) -> None:
+        """기한이 지난 pending 작업을 단일 UPDATE로 overdue 전환 (행별 UPDATE 제거)."""
+        if self._overdue_synced_on == today:
+            return
+        self.db.table("compliance_tasks").update(
+            {"status": TaskStatus.OVERDUE.value}
+        ).eq("status", TaskStatus.PENDING.value).lt("due_date", today.isoformat()).execute()
+        self._overdue_synced_on = today
     
     async def create_task(
         self,
@@ -119,13 +164,7 @@ class ComplianceTrackerService:
     ) -> ComplianceTask:
         """Create a new compliance task."""
         
-        document_title = None
-        if document_id:
-            doc_result = self.db.table("documents").select("title").eq(
-                "document_id", document_id
-            ).execute()
-            if doc_result.data:
-                document_title = doc_result.data[0]["title"]
+        document_title = get_document_title(document_id) if document_id else None
         
         task_data = {
             "title": title,
@@ -173,10 +212,7 @@ class ComplianceTrackerService:
         key_deadlines = json.loads(alert.get("key_deadlines", "[]"))
         industries = alert.get("industries", [])
         
-        doc_result = self.db.table("documents").select("title").eq(
-            "document_id", alert["document_id"]
-        ).execute()
-        document_title = doc_result.data[0]["title"] if doc_result.data else None
+        document_title = get_document_title(alert["document_id"])
         
         priority_map = {
             "critical": TaskPriority.CRITICAL,
@@ -218,10 +254,17 @@ class ComplianceTrackerService:
         industries: Optional[List[str]] = None,
         assigned_to: Optional[str] = None,
         include_overdue: bool = True,
-        limit: int = 100
+        limit: int = 100,
+        due_on_or_before: Optional[date] = None
     ) -> List[ComplianceTask]:
         """Get compliance tasks with filters."""
         
+        today = date.today()
+        try:
+            self._sync_overdue_statuses(today)
+        except Exception as e:
+            logging.warning("compliance_tasks overdue sync failed: %s", e)
+        
         try:
             query = self.db.table("compliance_tasks").select(
                 "*, documents(title)"
@@ -233,10 +276,16 @@ class ComplianceTrackerService:
             if assigned_to:
                 query = query.eq("assigned_to", assigned_to)
             
+            # 업권 필터는 DB에서 배열 overlap(ov)으로 — limit 이후 사후 필터링 시 결과 누락
+            if industries:
+                query = query.ov("industries", industries)
+            
+            if due_on_or_before:
+                query = query.lte("due_date", due_on_or_before.isoformat())
+            
             result = query.execute()
         except Exception as e:
             # Table might not exist yet
-            import logging
             logging.warning(f"compliance_tasks table not found: {e}")
             return []
         
@@ -244,54 +293,60 @@ class ComplianceTrackerService:
             return []
         
         tasks = []
-        today = date.today()
         
         for item in result.data:
-            # Filter by industries if specified
-            item_industries = item.get("industries", [])
-            if industries:
-                if not any(ind in item_industries for ind in industries):
-                    continue
-            
-            due_date = None
-            if item.get("due_date"):
-                try:
-                    due_date = date.fromisoformat(item["due_date"])
-                except:
-                    pass
-            
-            # Check if overdue
-            task_status = TaskStatus(item["status"])
-            if due_date and due_date < today and task_status == TaskStatus.PENDING:
-                task_status = TaskStatus.OVERDUE
-                # Update status in DB
-                self.db.table("compliance_tasks").update(
-                    {"status": TaskStatus.OVERDUE.value}
-                ).eq("task_id", item["task_id"]).execute()
+            document_title = item["documents"]["title"] if item.get("documents") else None
+            task = self._task_from_row(item, document_title, today)
             
-            if not include_overdue and task_status == TaskStatus.OVERDUE:
+            if not include_overdue and task.status == TaskStatus.OVERDUE:
                 continue
             
-            document_title = item["documents"]["title"] if item.get("documents") else None
-            
-            tasks.append(ComplianceTask(
-                task_id=item["task_id"],
-                title=item["title"],
-                description=item.get("description"),
-                document_id=item.get("document_id"),
-                document_title=document_title,
-                alert_id=item.get("alert_id"),
-                industries=item_industries,
-                due_date=due_date,
-                assigned_to=item.get("assigned_to"),
-                status=task_status,
-                priority=TaskPriority(item.get("priority", "medium")),
-                created_at=datetime.fromisoformat(item["created_at"]) if item.get("created_at") else None,
-                completed_at=datetime.fromisoformat(item["completed_at"]) if item.get("completed_at") else None
-            ))
+            tasks.append(task)
         
         return tasks
     
+    @staticmethod
+    def _task_from_row(
+        item: Dict[str, Any],
+        document_title: Optional[str],
+        today: date
+    ) -> ComplianceTask:
+        due_date = None
+        if item.get("due_date"):
+            try:
+                due_date = date.fromisoformat(item["due_date"])
+            except:
+                pass
+        
+        # Check if overdue (DB 반영은 _sync_overdue_statuses에서 일괄 처리, 이후 생성·변경분은 응답에서만 보정)
+        task_status = TaskStatus(item["status"])
+        if due_date and due_date < today and task_status == TaskStatus.PENDING:
+            task_status = TaskStatus.OVERDUE
+        
+        return ComplianceTask(
+            task_id=item["task_id"],
+            title=item["title"],
+            description=item.get("description"),
+            document_id=item.get("document_id"),
+            document_title=document_title,
+            alert_id=item.get("alert_id"),
+            industries=item.get("industries", []),
+            due_date=due_date,
+            assigned_to=item.get("assigned_to"),
+            status=task_status,
+            priority=TaskPriority(item.get("priority", "medium")),
+            created_at=datetime.fromisoformat(item["created_at"]) if item.get("created_at") else None,
+            completed_at=datetime.fromisoformat(item["completed_at"]) if item.get("completed_at") else None
+        )
+    
+    def _updated_task(self, result_data: List[Dict[str, Any]]) -> Optional[ComplianceTask]:
+        """update 응답 행으로 작업 구성 (제목은 캐시 조회) — 전체 목록 재조회 없음."""
+        if not result_data:
+            return None
+        item = result_data[0]
+        document_title = get_document_title(item["document_id"]) if item.get("document_id") else None
+        return self._task_from_row(item, document_title, date.today())
+    
     async def update_task_status(
         self,
         task_id: str,
@@ -308,13 +363,7 @@ class ComplianceTrackerService:
             "task_id", task_id
         ).execute()
         
-        if result.data:
-            tasks = await self.get_tasks(limit=1000)
-            for task in tasks:
-                if task.task_id == task_id:
-                    return task
-        
-        return None
+        return self._updated_task(result.data)
     
     async def assign_task(
         self,
@@ -327,13 +376,7 @@ class ComplianceTrackerService:
             {"assigned_to": assigned_to}
         ).eq("task_id", task_id).execute()
         
-        if result.data:
-            tasks = await self.get_tasks(limit=1000)
-            for task in tasks:
-                if task.task_id == task_id:
-                    return task
-        
-        return None
+        return self._updated_task(result.data)
     
     async def get_dashboard_stats(
         self,
@@ -341,28 +384,19 @@ class ComplianceTrackerService:
     ) -> Dict[str, Any]:
         """Get compliance dashboard statistics."""
         
-        all_tasks = await self.get_tasks(industries=industries, limit=1000)
+        if ComplianceTrackerService._stats_rpc_available:
+            try:
+                return await self._dashboard_stats_via_rpc(industries)
+            except Exception as e:
+                if is_missing_rpc_error(e):
+                    logging.warning("compliance_task_stats RPC not deployed, aggregating in Python: %s", e)
+                    ComplianceTrackerService._stats_rpc_available = False
+                else:
+                    logging.warning("compliance_task_stats RPC failed, aggregating in Python for this call: %s", e)
         
-        stats = {
-            "total_tasks": len(all_tasks),
-            "by_status": {
-                "pending": 0,
-                "in_progress": 0,
-                "completed": 0,
-                "overdue": 0,
-                "cancelled": 0
-            },
-            "by_priority": {
-                "critical": 0,
-                "high": 0,
-                "medium": 0,
-                "low": 0
-            },
-            "by_industry": {},
-            "upcoming_due": [],
-            "overdue_tasks": [],
-            "completion_rate": 0.0
-        }
+        all_tasks = await self.get_tasks(industries=industries, limit=1000)
+        stats = self._empty_dashboard_stats()
+        stats["total_tasks"] = len(all_tasks)
         
         completed_count = 0
         non_cancelled_count = 0
@@ -394,16 +428,87 @@ class ComplianceTrackerService:
         
         return stats
     
+    @staticmethod
+    def _empty_dashboard_stats() -> Dict[str, Any]:
+        return {
+            "total_tasks": 0,
+            "by_status": {
+                "pending": 0,
+                "in_progress": 0,
+                "completed": 0,
+                "overdue": 0,
+                "cancelled": 0
+            },
+            "by_priority": {
+                "critical": 0,
+                "high": 0,
+                "medium": 0,
+                "low": 0
+            },
+            "by_industry": {},
+            "upcoming_due": [],
+            "overdue_tasks": [],
+            "completion_rate": 0.0
+        }
+    
+    async def _dashboard_stats_via_rpc(
+        self,
+        industries: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """집계는 compliance_task_stats RPC, 목록(기한 경과·7일 이내)은 기한 조건으로 좁힌 조회 1회."""
+        agg = self.db.rpc("compliance_task_stats", {"p_industries": industries or None}).execute().data
+        if isinstance(agg, list):
+            agg = agg[0] if agg else {}
+        agg = agg or {}
+        
+        stats = self._empty_dashboard_stats()
+        stats["total_tasks"] = int(agg.get("total_tasks") or 0)
+        stats["by_status"].update(agg.get("by_status") or {})
+        stats["by_priority"].update(agg.get("by_priority") or {})
+        stats["by_industry"] = agg.get("by_industry") or {}
+        stats["completion_rate"] = float(agg.get("completion_rate") or 0.0)
+        
+        due_tasks = await self.get_tasks(
+            industries=industries,
+            limit=1000,
+            due_on_or_before=date.today() + timedelta(days=7)
+        )
+        for task in due_tasks:
+            if task.is_overdue:
+                stats["overdue_tasks"].append(task.to_dict())
+            elif task.days_until_due is not None and 0 <= task.days_until_due <= 7:
+                stats["upcoming_due"].append(task.to_dict())
+        
+        stats["upcoming_due"].sort(key=lambda x: x.get("due_date") or "9999-12-31")
+        stats["overdue_tasks"].sort(key=lambda x: x.get("due_date") or "9999-12-31")
+        return stats
+    
     async def get_task_history(
         self,
         document_id: Optional[str] = None,
         days: int = 30
     ) -> List[Dict[str, Any]]:
-        """Get task completion history."""
+        """Get task completion history.
+        
+        compliance_task_history RPC로 일자별 집계. 미배포 환경이면 행 조회 후 Python 집계.
+        """
+        if ComplianceTrackerService._history_rpc_available:
+            try:
+                rows = self.db.rpc(
+                    "compliance_task_history",
+                    {"p_days": days, "p_document_id": document_id}
+                ).execute().data
+                return list(rows or [])
+            except Exception as e:
+                if is_missing_rpc_error(e):
+                    logging.warning("compliance_task_history RPC not deployed, aggregating in Python: %s", e)
+                    ComplianceTrackerService._history_rpc_available = False
+                else:
+                    logging.warning("compliance_task_history RPC failed, aggregating in Python for this call: %s", e)
         
         cutoff = (datetime.now(timezone.utc) - timedelta(days=days)).isoformat()
         
-        query = self.db.table("compliance_tasks").select("*").gte(
+        query = self.db.table("compliance_tasks").select("created_at, status").gte(
             "created_at", cutoff
         )
         
@@ -6,13 +6,13 @@
 # ======================================================================
 
 """Financial Supervisory Service (FSS) web scraper."""
-import hashlib
 import logging
 import httpx
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Optional
 from bs4 import BeautifulSoup
 from app.core.config import settings
+from app.core.hashing import document_hash
 from app.core.database import get_db
 from app.models.schemas import DocumentCreate
 
@@ -33,8 +33,7 @@ class FSSScraper:
     
     def _generate_hash(self, url: str, title: str, date_str: str) -> str:
         """Generate unique hash for document."""
-        content = f"{url}:{title}:{date_str}"
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        return document_hash(url, title, date_str)
     
     def _parse_date(self, date_str: str) -> datetime:
         """Parse Korean date format (YYYY.MM.DD)."""
@@ -166,18 +165,23 @@ class FSSScraper:
                     "existing": 0
                 }
                 
-                for doc in documents:
-                    # Check if document already exists
-                    existing = self.db.table("documents").select("document_id").eq(
-                        "hash", doc["hash"]
+                # Check existing documents with one IN query per 100 hashes (항목별 조회 제거)
+                existing_hashes = set()
+                hashes = [doc["hash"] for doc in documents]
+                for i in range(0, len(hashes), 100):
+                    existing_res = self.db.table("documents").select("hash").in_(
+                        "hash", hashes[i:i+100]
                     ).execute()
-                    
-                    if existing.data:
+                    existing_hashes.update(r["hash"] for r in (existing_res.data or []))
+                
+                new_docs_batch = []
+                for doc in documents:
+                    if doc["hash"] in existing_hashes:
                         board_result["existing"] += 1
                         results["total_existing"] += 1
                         continue
+                    existing_hashes.add(doc["hash"])
                     
-                    # Insert new document
                     doc_create = DocumentCreate(
                         source_id=source_uuid,
                         title=doc["title"],
@@ -186,17 +190,28 @@ class FSSScraper:
                         category=doc["category"],
                         hash=doc["hash"]
                     )
-                    
+                    new_docs_batch.append(doc_create.model_dump(mode='json'))
+                
+                # Batch upsert new documents (한 요청 안의 url 중복은 충돌 오류를 내므로 제거)
+                new_docs_batch = list({d["url"]: d for d in new_docs_batch}.values())
+                if new_docs_batch:
                     try:
-                        payload = doc_create.model_dump(mode='json')
                         self.db.table("documents").upsert(
-                            payload,
+                            new_docs_batch,
                             on_conflict="url"
                         ).execute()
-                        board_result["new"] += 1
-                        results["total_new"] += 1
+                        board_result["new"] = len(new_docs_batch)
+                        results["total_new"] += len(new_docs_batch)
                     except Exception as ins_err:
-                        _log.warning("Error inserting FSS document: %s", ins_err)
+                        _log.warning("Error batch inserting FSS documents: %s", ins_err)
+                        # Fallback to individual inserts
+                        for payload in new_docs_batch:
+                            try:
+                                self.db.table("documents").upsert(payload, on_conflict="url").execute()
+                                board_result["new"] += 1
+                                results["total_new"] += 1
+                            except Exception as row_err:
+                                _log.warning("Error inserting FSS document: %s", row_err)
                 
                 results["boards"][board_id] = board_result
                 
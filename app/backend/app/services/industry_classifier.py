@@ -41,6 +41,10 @@ class IndustryClassifier:
             "코스피", "코스닥", "주식시장", "증시", "자산운용", "자산관리"
         ]
     }
+    # (업권 값, 키워드 튜플) — 분류마다 Enum .value 조회·dict 순회 반복 제거
+    _KW_TABLE = tuple(
+        (industry.value, tuple(keywords)) for industry, keywords in INDUSTRY_KEYWORDS.items()
+    )
     
     def __init__(self):
         self.db = get_db()
@@ -48,12 +52,12 @@ class IndustryClassifier:
     
     def _keyword_based_classification(self, text: str) -> Dict[str, float]:
         """Weak labeling using keywords."""
-        text_lower = text.lower()
+        # 키워드가 모두 한글(대소문자 없음)이므로 문서 전체 .lower() 사본 없이 원문에서 검사
         scores = {}
         
-        for industry, keywords in self.INDUSTRY_KEYWORDS.items():
-            count = sum(1 for kw in keywords if kw in text_lower)
-            scores[industry.value] = min(1.0, count / 3)  # Normalize
+        for industry, keywords in self._KW_TABLE:
+            count = sum(1 for kw in keywords if kw in text)
+            scores[industry] = min(1.0, count / 3)  # Normalize
         
         return scores
     
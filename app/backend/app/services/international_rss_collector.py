@@ -12,32 +12,39 @@ Gap Map GI 국제 데이터 출처로 활용 가능.
 """
 import asyncio
 import logging
-import hashlib
 from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
 from typing import List, Dict, Any, Optional
 
 import feedparser
 
 from app.core.config import settings
+from app.core.hashing import document_hash
 from app.core.database import get_db
 from app.models.schemas import DocumentCreate
 
+_log = logging.getLogger(__name__)
+
 
 class InternationalRSSCollector:
     """FSB·BIS 등 국제기구 RSS 피드 수집. URL 직접 지정 (금융위 fid 방식과 별도)."""
 
     def _generate_hash(self, url: str, title: str, published: str) -> str:
-        content = f"{url}:{title}:{published}"
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        return document_hash(url, title, published)
 
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         try:
-            for fmt in ["%a, %d %b %Y %H:%M:%S %z", "%Y-%m-%d %H:%M:%S"]:
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
+            # RFC 822 (RSS 표준) 우선, 그 외 형식은 strptime → feedparser 순으로 폴백
+            try:
+                dt = parsedate_to_datetime(date_str)
+                return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+            except (TypeError, ValueError, IndexError):
+                pass
+            try:
+                dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+                return dt.replace(tzinfo=timezone.utc)
+            except ValueError:
+                pass
             struct_time = feedparser._parse_date(date_str)
             if struct_time:
                 dt = datetime(*struct_time[:6])
@@ -160,7 +167,8 @@ class InternationalRSSCollector:
             if res.data:
                 existing_hashes.update(x["hash"] for x in res.data)
 
-        # 4) 신규만 INSERT (source_id 매핑)
+        # 4) 신규만 fid별 배치 upsert (source_id 매핑) — 행 단위 요청 대신 요청당 최대 500행
+        new_by_fid: Dict[str, List[Dict[str, Any]]] = {}
         for fid, doc in all_docs:
             if doc["hash"] in existing_hashes:
                 results["total_existing"] += 1
@@ -181,13 +189,33 @@ class InternationalRSSCollector:
                     category=doc["category"],
                     hash=doc["hash"],
                 ).model_dump(mode="json")
-                db.table("documents").upsert(payload, on_conflict="url").execute()
-                results["total_new"] += 1
-                existing_hashes.add(doc["hash"])
-                results["feeds"][fid] = results["feeds"].get(fid, {"fetched": 0, "new": 0, "existing": 0})
-                results["feeds"][fid]["new"] = results["feeds"][fid].get("new", 0) + 1
             except Exception as e:
                 results["errors"].append({"fid": fid, "url": doc["url"], "error": str(e)})
+                continue
+            existing_hashes.add(doc["hash"])
+            new_by_fid.setdefault(fid, []).append(payload)
+
+        for fid, payloads in new_by_fid.items():
+            # 한 요청 안에 같은 url이 두 번 있으면 ON CONFLICT 오류 → url 기준으로 마지막 항목만 유지
+            payloads = list({p["url"]: p for p in payloads}.values())
+            inserted = 0
+            for i in range(0, len(payloads), 500):
+                batch = payloads[i : i + 500]
+                try:
+                    db.table("documents").upsert(batch, on_conflict="url").execute()
+                    inserted += len(batch)
+                except Exception as batch_err:
+                    _log.warning("[InternationalRSS] batch upsert %s: %s", fid, batch_err)
+                    # 배치 실패 시 행 단위로 재시도해 문제 행만 오류로 기록
+                    for payload in batch:
+                        try:
+                            db.table("documents").upsert(payload, on_conflict="url").execute()
+                            inserted += 1
+                        except Exception as e:
+                            results["errors"].append({"fid": fid, "url": payload["url"], "error": str(e)})
+            results["total_new"] += inserted
+            results["feeds"][fid] = results["feeds"].get(fid, {"fetched": 0, "new": 0, "existing": 0})
+            results["feeds"][fid]["new"] = results["feeds"][fid].get("new", 0) + inserted
 
         from collections import Counter
         fetched_per_fid = Counter(fid for fid, _ in all_docs)
@@ -16,7 +16,7 @@ import operator
 import json
 import logging
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage, SystemMessage
 from langchain_core.prompts import ChatPromptTemplate
 from langgraph.graph import StateGraph, END
@@ -24,6 +24,7 @@ from langgraph.prebuilt import ToolExecutor
 
 from app.core.config import settings
 from app.core.database import get_db
+from app.core.embeddings import get_embeddings
 
 
 class AgentState(TypedDict):
@@ -60,10 +61,7 @@ class RegulationAgent:
             api_key=settings.OPENAI_API_KEY,
             temperature=0.1
         )
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.OPENAI_EMBEDDING_MODEL,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.embeddings = get_embeddings()
         self.graph = self._build_graph()
     
     def _build_graph(self) -> StateGraph:
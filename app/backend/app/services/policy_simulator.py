@@ -113,6 +113,10 @@ class PolicySimulator:
                 r = (v or "medium").strip().lower()
                 return r if r in ("high", "medium", "low") else "medium"
 
+            def _norm_change(v: str) -> str:
+                c = (v or "modified").strip().lower()
+                return c if c in ("added", "modified", "removed") else "modified"
+
             raw_changes = data.get("changes") or []
             changes: List[PolicyDiffItem] = []
             for i, item in enumerate(raw_changes):
@@ -121,7 +125,7 @@ class PolicySimulator:
                 try:
                     changes.append(PolicyDiffItem(
                         clause=str(item.get("clause", "") or ""),
-                        change_type=str(item.get("change_type", "modified") or "modified"),
+                        change_type=_norm_change(str(item.get("change_type", "modified") or "modified")),
                         description=str(item.get("description", "") or ""),
                         risk_level=_norm_risk(str(item.get("risk_level", "medium") or "medium")),
                         impacted_process=str(item.get("impacted_process", "") or ""),
@@ -692,7 +692,7 @@ NO [해당 문서에는 가계대출 금리에 대한 직접적인 언급이 없
             answer=structured_data["answer"],
             summary=structured_data["summary"],
             industry_impact=structured_data["industry_impact"],
-            checklist=structured_data.get("checklist", []),
+            checklist=[c for c in (structured_data.get("checklist") or []) if isinstance(c, dict)],
             citations=citations,
             confidence=confidence_score / 100.0,
             groundedness_score=grounding_score / 100.0,
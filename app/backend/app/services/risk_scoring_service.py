@@ -46,6 +46,25 @@ class RiskScoringService:
             
         return score, level
 
+    async def recalculate_action_items_risk(self, items: List[Dict[str, Any]]) -> None:
+        """Recalculates risk for many action items (이미 조회한 행 기준).
+        
+        점수는 프로세스 내에서 계산하고 DB 반영은 upsert 1회, 체크리스트 재계산은 체크리스트당 1회.
+        """
+        if not items:
+            return
+        
+        now_iso = datetime.now(timezone.utc).isoformat()
+        rows = []
+        for item in items:
+            score, level = self._calculate_risk_for_item(item)
+            rows.append({**item, "risk_score": score, "risk_level": level.value, "updated_at": now_iso})
+        
+        self.db.table("compliance_action_items").upsert(rows, on_conflict="action_item_id").execute()
+        
+        for checklist_id in dict.fromkeys(i["checklist_id"] for i in items if i.get("checklist_id")):
+            await self.recalculate_checklist_risk(checklist_id)
+
     async def recalculate_checklist_risk(self, checklist_id: str) -> Tuple[float, RiskLevelEnum]:
         """Recalculates aggregate risk for a checklist based on its items."""
         items_result = self.db.table("compliance_action_items").select("risk_score").eq(
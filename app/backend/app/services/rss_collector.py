@@ -8,17 +8,45 @@
 """RSS feed collector service."""
 import asyncio
 import logging
+import aiohttp
 import feedparser
-import hashlib
 from datetime import datetime, timedelta, timezone
+from email.utils import parsedate_to_datetime
+from functools import lru_cache
 from typing import List, Dict, Any, Optional
 from app.core.config import settings
+from app.core.hashing import document_hash
 from app.core.database import get_db
 from app.models.schemas import DocumentCreate, DocumentStatus
 
 _log = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=4096)
+def _parse_rss_date(date_str: str) -> Optional[datetime]:
+    """RSS 날짜 문자열 파싱 (피드 간 반복되는 문자열은 캐시). 실패 시 None — 현재 시각 대체는 호출부에서."""
+    try:
+        # RFC 822 (RSS 표준, GMT·숫자 오프셋 모두) — strptime 형식 순회 없이 한 번에 파싱
+        try:
+            dt = parsedate_to_datetime(date_str)
+            return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
+        except (TypeError, ValueError, IndexError):
+            pass
+        try:
+            dt = datetime.strptime(date_str, "%Y-%m-%d %H:%M:%S")
+            return dt.replace(tzinfo=timezone.utc)
+        except ValueError:
+            pass
+        # Fallback to feedparser's parsed date
+        struct_time = feedparser._parse_date(date_str)
+        if struct_time:
+            dt = datetime(*struct_time[:6])
+            return dt.replace(tzinfo=timezone.utc)
+    except Exception:
+        pass
+    return None
+
+
 class RSSCollector:
     """Financial Services Commission RSS collector."""
     
@@ -32,48 +60,52 @@ class RSSCollector:
         "0411": "카드뉴스",
     }
     
+    # 피드 1건 다운로드 제한 시간 (느린 피드 하나가 전체 수집을 붙잡지 않도록)
+    FETCH_TIMEOUT = aiohttp.ClientTimeout(total=30)
+    
     def __init__(self):
         self.db = get_db()
     
+    @staticmethod
+    async def _download(session: aiohttp.ClientSession, url: str) -> bytes:
+        async with session.get(url) as resp:
+            resp.raise_for_status()
+            return await resp.read()
+    
     def _get_rss_url(self, fid: str) -> str:
         """Generate RSS URL for given fid."""
         return f"{settings.FSC_RSS_BASE}?fid={fid}"
     
     def _generate_hash(self, url: str, title: str, published: str) -> str:
-        """Generate unique hash for document."""
-        content = f"{url}:{title}:{published}"
-        return hashlib.sha256(content.encode()).hexdigest()[:32]
+        """Generate unique hash for document (settings.HASH_ALGO, 기본 sha256 — 기존 DB 해시와 동일)."""
+        return document_hash(url, title, published)
     
     def _parse_date(self, date_str: str) -> Optional[datetime]:
         """Parse RSS date string."""
-        from datetime import timezone
-        try:
-            # Try common RSS date formats
-            for fmt in ["%a, %d %b %Y %H:%M:%S %z", "%Y-%m-%d %H:%M:%S"]:
-                try:
-                    dt = datetime.strptime(date_str, fmt)
-                    return dt.astimezone(timezone.utc) if dt.tzinfo else dt.replace(tzinfo=timezone.utc)
-                except ValueError:
-                    continue
-            # Fallback to feedparser's parsed date
-            struct_time = feedparser._parse_date(date_str)
-            if struct_time:
-                dt = datetime(*struct_time[:6])
-                return dt.replace(tzinfo=timezone.utc)
-        except Exception:
-            pass
-        return datetime.now(timezone.utc)
+        parsed = _parse_rss_date(date_str) if date_str else None
+        return parsed if parsed is not None else datetime.now(timezone.utc)
     
-    async def fetch_feed(self, fid: str, base_url: str = None) -> List[Dict[str, Any]]:
+    async def fetch_feed(
+        self,
+        fid: str,
+        base_url: str = None,
+        session: Optional[aiohttp.ClientSession] = None,
+    ) -> List[Dict[str, Any]]:
         """Fetch and parse RSS feed.
         동일 URL을 호출해도 금융위원회 서버가 최신 N건을 반환하므로, 매 수집 시 새 글이 있으면 포함됩니다.
         똑같은 것만 호출하는 것이 아니라, 서버 쪽 목록이 일별로 갱신됩니다.
+        다운로드는 aiohttp, XML 파싱은 스레드에서 수행해 이벤트 루프를 막지 않음 (gather 시 실제 병렬).
         """
         url = (base_url + f"?fid={fid}") if base_url else self._get_rss_url(fid)
         _log.debug("Fetching RSS feed from: %s", url)
 
         try:
-            feed = feedparser.parse(url)
+            if session is None:
+                async with aiohttp.ClientSession(timeout=self.FETCH_TIMEOUT) as own_session:
+                    body = await self._download(own_session, url)
+            else:
+                body = await self._download(session, url)
+            feed = await asyncio.to_thread(feedparser.parse, body)
             documents = []
             
             if not feed.entries:
@@ -172,17 +204,18 @@ class RSSCollector:
         if job_id:
             job_tracker.update_job(job_id, stage="RSS 수집", progress=10, message="피드 데이터 수집 중...")
         
-        async def fetch_with_source(fid: str):
+        async def fetch_with_source(fid: str, session: aiohttp.ClientSession):
             source_rec = fid_map.get(fid)
             if not source_rec or not source_rec.get("active", True):
                 return fid, [], source_rec
             base_url = source_rec.get("base_url")
-            docs = await self.fetch_feed(fid, base_url)
+            docs = await self.fetch_feed(fid, base_url, session=session)
             return fid, docs, source_rec
         
-        # Parallel fetch all feeds
-        fetch_tasks = [fetch_with_source(fid) for fid in fids]
-        fetch_results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
+        # Parallel fetch all feeds (세션 하나로 커넥션 재사용)
+        async with aiohttp.ClientSession(timeout=self.FETCH_TIMEOUT) as session:
+            fetch_tasks = [fetch_with_source(fid, session) for fid in fids]
+            fetch_results = await asyncio.gather(*fetch_tasks, return_exceptions=True)
         
         if job_id:
             job_tracker.update_job(job_id, stage="중복 체크", progress=40, message="기존 문서와 비교 중...")
@@ -243,20 +276,24 @@ class RSSCollector:
                     hash=doc["hash"]
                 )
                 new_docs_batch.append(doc_create.model_dump(mode='json'))
+                # 같은 피드 안에서 반복된 항목도 한 번만 저장
+                existing_hashes.add(doc["hash"])
             
-            # Batch upsert new documents
-            if new_docs_batch:
+            # Batch upsert new documents (요청당 최대 500행; 한 요청 안의 url 중복은 충돌 오류를 내므로 제거)
+            new_docs_batch = list({d["url"]: d for d in new_docs_batch}.values())
+            for i in range(0, len(new_docs_batch), 500):
+                batch = new_docs_batch[i : i + 500]
                 try:
                     self.db.table("documents").upsert(
-                        new_docs_batch,
+                        batch,
                         on_conflict="url"
                     ).execute()
-                    feed_result["new"] = len(new_docs_batch)
-                    results["total_new"] += len(new_docs_batch)
+                    feed_result["new"] += len(batch)
+                    results["total_new"] += len(batch)
                 except Exception as ins_err:
                     _log.warning("Error batch inserting for fid %s: %s", fid, ins_err)
                     # Fallback to individual inserts
-                    for payload in new_docs_batch:
+                    for payload in batch:
                         try:
                             self.db.table("documents").upsert(payload, on_conflict="url").execute()
                             feed_result["new"] += 1
@@ -272,19 +272,18 @@ class TopicDetector:
                 "topic_summary": f"{len(cluster['document_ids'])}개 문서 클러스터",
                 "time_window_start": start_date.isoformat(),
                 "time_window_end": end_date.isoformat(),
-                "topic_embedding": json.dumps(cluster["centroid"])
+                "topic_embedding": cluster["centroid"]
             }
             
             topic_result = self.db.table("topics").insert(topic_data).execute()
             topic_id = topic_result.data[0]["topic_id"] if topic_result.data else f"topic_{i}"
             
-            # Save memberships
-            for doc_id in cluster["document_ids"]:
-                self.db.table("topic_memberships").insert({
-                    "topic_id": topic_id,
-                    "document_id": doc_id,
-                    "score": 1.0
-                }).execute()
+            # Save memberships (bulk insert)
+            if cluster["document_ids"]:
+                self.db.table("topic_memberships").insert([
+                    {"topic_id": topic_id, "document_id": doc_id, "score": 1.0}
+                    for doc_id in cluster["document_ids"]
+                ]).execute()
             
             # Create alert if surge score is high
             if surge_score > 50:
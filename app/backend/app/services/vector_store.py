@@ -14,7 +14,6 @@ Features:
 - Batch operations
 """
 import asyncio
-import json
 import logging
 import re
 from typing import List, Dict, Any, Optional, Tuple
@@ -91,7 +90,8 @@ class VectorStore:
                 {
                     "chunk_id": chunk_id,
                     "embedding_model": embedding_model,
-                    "embedding": json.dumps(embedding)
+                    # 리스트 그대로 전달 — 요청 본문 직렬화 1회로 끝남 (행별 json.dumps 이중 인코딩 제거)
+                    "embedding": embedding.tolist() if hasattr(embedding, "tolist") else list(embedding)
                 }
                 for chunk_id, embedding in zip(chunk_ids, embeddings)
             ]
@@ -17,10 +17,11 @@ from datetime import datetime
 from typing import List, Dict, Any, Optional, Literal
 from dataclasses import dataclass
 
-from langchain_openai import ChatOpenAI, OpenAIEmbeddings
+from langchain_openai import ChatOpenAI
 from langchain_core.prompts import ChatPromptTemplate
 
 from app.core.config import settings
+from app.core.embeddings import get_embeddings
 from app.core.redis import get_redis
 from app.services.vector_store import get_vector_store, SearchResult, _get_cached_cross_encoder
 from app.services.rag_service import hybrid_weights_for_query
@@ -165,10 +166,7 @@ class HybridRetriever:
     
     def __init__(self):
         self.vector_store = get_vector_store()
-        self.embeddings = OpenAIEmbeddings(
-            model=settings.OPENAI_EMBEDDING_MODEL,
-            api_key=settings.OPENAI_API_KEY
-        )
+        self.embeddings = get_embeddings()
     
     async def retrieve(
         self,
@@ -0,0 +1,21 @@
+-- Smart Alert 긴급도 분석 OpenAI Batch 제출 이력 (SmartAlertService.submit_urgency_batch / poll_urgency_batches)
+-- status: submitted → in_progress → completed
+--         결과 누락(Batch failed/expired/cancelled, 결과 줄 오류) 시 needs_retry → 실시간 분석 재처리 후 completed
+--         재처리 한도 초과 시 failed (남은 문서는 unfinished_document_ids에 보존)
+
+CREATE TABLE IF NOT EXISTS public.alert_batches (
+    batch_id text PRIMARY KEY,
+    document_ids jsonb NOT NULL DEFAULT '[]'::jsonb,
+    status text NOT NULL DEFAULT 'submitted',
+    submitted_at timestamptz NOT NULL DEFAULT now(),
+    completed_at timestamptz,
+    unfinished_document_ids jsonb NOT NULL DEFAULT '[]'::jsonb,
+    retry_count int NOT NULL DEFAULT 0
+);
+
+-- 이전 버전으로 테이블을 이미 만든 환경용
+ALTER TABLE public.alert_batches
+    ADD COLUMN IF NOT EXISTS unfinished_document_ids jsonb NOT NULL DEFAULT '[]'::jsonb,
+    ADD COLUMN IF NOT EXISTS retry_count int NOT NULL DEFAULT 0;
+
+CREATE INDEX IF NOT EXISTS idx_alert_batches_status ON public.alert_batches (status);
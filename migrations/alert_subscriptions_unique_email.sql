@@ -0,0 +1,54 @@
+-- 알림 구독: user_email 당 1행 (SmartAlertService.create_subscription의 upsert on_conflict 대상)
+-- 기존 중복 행이 있으면 가장 최근에 수정(없으면 생성)된 행만 남기고 삭제 후 제약 추가.
+-- 적용 전에는 create_subscription이 조회 후 갱신/삽입 경로로 폴백 (PostgREST 42P10).
+
+DO $$
+DECLARE
+    order_expr text;
+BEGIN
+    -- updated_at 우선, 없으면 created_at 기준 최신 행 유지 (ctid는 물리 위치라 최신 여부와 무관)
+    SELECT string_agg(
+               format('%I DESC NULLS LAST', column_name),
+               ', ' ORDER BY CASE column_name WHEN 'updated_at' THEN 1 ELSE 2 END
+           )
+    INTO order_expr
+    FROM information_schema.columns
+    WHERE table_schema = 'public'
+      AND table_name = 'alert_subscriptions'
+      AND column_name IN ('updated_at', 'created_at');
+
+    IF order_expr IS NULL THEN
+        IF NOT EXISTS (
+            SELECT 1 FROM public.alert_subscriptions
+            GROUP BY user_email HAVING count(*) > 1
+        ) THEN
+            RETURN;
+        END IF;
+        RAISE EXCEPTION 'alert_subscriptions has neither updated_at nor created_at; resolve duplicate user_email rows manually';
+    END IF;
+
+    EXECUTE format(
+        'DELETE FROM public.alert_subscriptions s
+         USING (
+             SELECT ctid AS row_ctid,
+                    row_number() OVER (PARTITION BY user_email ORDER BY %s) AS rn
+             FROM public.alert_subscriptions
+         ) d
+         WHERE s.ctid = d.row_ctid AND d.rn > 1',
+        order_expr
+    );
+END;
+$$;
+
+DO $$
+BEGIN
+    IF NOT EXISTS (
+        SELECT 1 FROM pg_constraint
+        WHERE conname = 'alert_subscriptions_user_email_key'
+          AND conrelid = 'public.alert_subscriptions'::regclass
+    ) THEN
+        ALTER TABLE public.alert_subscriptions
+            ADD CONSTRAINT alert_subscriptions_user_email_key UNIQUE (user_email);
+    END IF;
+END;
+$$;
@@ -0,0 +1,6 @@
+-- Compliance Task 조회 인덱스 (ComplianceTrackerService.get_tasks)
+-- 업권 필터: industries && ARRAY[...] (PostgREST ov) → GIN 인덱스 사용
+-- 운영 중 적용 시 테이블 잠금을 피하도록 CONCURRENTLY 사용 (트랜잭션 블록 밖에서 실행)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_compliance_tasks_industries_gin
+    ON public.compliance_tasks USING GIN (industries);
@@ -0,0 +1,29 @@
+-- Smart Alert 조회 경로 인덱스 (SmartAlertService.process_new_documents · get_alerts · get_alert_stats)
+-- 1) 최근 24시간 수집 문서 조회: documents.ingested_at 범위 스캔
+-- 2) 해당 문서들의 기존 알림 여부: smart_alerts.document_id IN (...)
+-- 운영 중 적용 시 테이블 잠금을 피하도록 CONCURRENTLY 사용 (트랜잭션 블록 밖에서 실행)
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_smart_alerts_document_id
+    ON public.smart_alerts (document_id);
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_documents_ingested_at
+    ON public.documents (ingested_at DESC);
+
+-- 3) get_alerts: ORDER BY urgency_score DESC LIMIT n → 정렬 없이 인덱스 순서로 상위 n건
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_smart_alerts_urgency
+    ON public.smart_alerts (urgency_score DESC);
+
+-- 4) get_alert_stats_24h: generated_at 범위 + priority 필터
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_smart_alerts_generated_at_priority
+    ON public.smart_alerts (generated_at, priority);
+
+-- 5) 미발송 알림(pending_notifications): 발송 완료 행은 인덱스에서 제외하는 부분 인덱스
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_smart_alerts_pending
+    ON public.smart_alerts (generated_at)
+    WHERE notification_sent IS NOT TRUE;
+
+-- 확인: 적용 전후 EXPLAIN ANALYZE에서 Seq Scan + Sort 대신 Index Scan 사용 여부
+--   EXPLAIN ANALYZE SELECT * FROM public.smart_alerts ORDER BY urgency_score DESC LIMIT 50;
+--   EXPLAIN ANALYZE SELECT get_alert_stats_24h();
+--   EXPLAIN ANALYZE SELECT count(*) FROM public.smart_alerts
+--       WHERE generated_at >= now() - interval '24 hours' AND notification_sent IS NOT TRUE;
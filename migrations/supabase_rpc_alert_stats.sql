@@ -0,0 +1,41 @@
+-- Supabase RPC: 최근 24시간 Smart Alert 통계 (SmartAlertService.get_alert_stats에서 호출)
+-- 반환: AlertStatsResponse와 동일한 키의 jsonb
+-- 행을 클라이언트로 가져와 집계하던 방식 대신 한 번의 집계 쿼리로 처리 (알림 수와 무관하게 응답 크기 고정).
+-- industries는 text[]/jsonb 어느 쪽이든 to_jsonb로 펼쳐 집계.
+
+CREATE OR REPLACE FUNCTION get_alert_stats_24h()
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    cutoff timestamptz := now() - interval '24 hours';
+    result jsonb;
+BEGIN
+    SELECT jsonb_build_object(
+        'total_alerts_24h', COUNT(*),
+        'critical_alerts', COUNT(*) FILTER (WHERE priority = 'critical'),
+        'high_alerts', COUNT(*) FILTER (WHERE priority = 'high'),
+        'avg_urgency_score', COALESCE(ROUND(AVG(urgency_score)::numeric, 2), 0),
+        'pending_notifications', COUNT(*) FILTER (WHERE notification_sent IS NOT TRUE),
+        'by_industry', COALESCE((
+            SELECT jsonb_object_agg(s.ind, s.c)
+            FROM (
+                SELECT ind, COUNT(*) AS c
+                FROM public.smart_alerts a,
+                     jsonb_array_elements_text(COALESCE(to_jsonb(a.industries), '[]'::jsonb)) AS ind
+                WHERE a.generated_at >= cutoff
+                GROUP BY ind
+            ) s
+        ), '{}'::jsonb)
+    )
+    INTO result
+    FROM public.smart_alerts
+    WHERE generated_at >= cutoff;
+    RETURN result;
+END;
+$$;
+
+COMMENT ON FUNCTION get_alert_stats_24h IS 'Smart alert counts, average urgency and per-industry histogram for the last 24 hours';
@@ -0,0 +1,34 @@
+-- Supabase RPC: 일자별 컴플라이언스 작업 생성·완료 수 (ComplianceTrackerService.get_task_history에서 호출)
+-- 입력: p_days — 최근 N일, p_document_id — NULL이면 전체 문서
+-- 반환: [{"date": "YYYY-MM-DD", "created": n, "completed": n}, ...] (날짜 오름차순, UTC 기준)
+
+CREATE OR REPLACE FUNCTION compliance_task_history(p_days int DEFAULT 30, p_document_id uuid DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    result jsonb;
+BEGIN
+    SELECT COALESCE(jsonb_agg(jsonb_build_object(
+               'date', to_char(h.d, 'YYYY-MM-DD'),
+               'created', h.created,
+               'completed', h.completed
+           ) ORDER BY h.d), '[]'::jsonb)
+    INTO result
+    FROM (
+        SELECT (created_at AT TIME ZONE 'UTC')::date AS d,
+               COUNT(*) AS created,
+               COUNT(*) FILTER (WHERE status = 'completed') AS completed
+        FROM public.compliance_tasks
+        WHERE created_at >= now() - make_interval(days => p_days)
+          AND (p_document_id IS NULL OR document_id = p_document_id)
+        GROUP BY 1
+    ) h;
+    RETURN result;
+END;
+$$;
+
+COMMENT ON FUNCTION compliance_task_history IS 'Per-day created/completed compliance task counts for the last p_days days';
@@ -0,0 +1,55 @@
+-- Supabase RPC: 컴플라이언스 대시보드 집계 (ComplianceTrackerService.get_dashboard_stats에서 호출)
+-- 입력: p_industries — NULL이면 전체, 지정 시 industries && p_industries (업권 overlap)
+-- 반환: {"total_tasks", "by_status", "by_priority", "by_industry", "completion_rate"}
+-- 상태는 get_tasks와 동일하게 기한 경과 pending을 overdue로 간주해 집계.
+
+CREATE OR REPLACE FUNCTION compliance_task_stats(p_industries text[] DEFAULT NULL)
+RETURNS jsonb
+LANGUAGE plpgsql
+STABLE
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    result jsonb;
+BEGIN
+    WITH t AS (
+        SELECT
+            CASE
+                WHEN status = 'pending' AND due_date < CURRENT_DATE THEN 'overdue'
+                ELSE status
+            END AS eff_status,
+            priority,
+            industries
+        FROM public.compliance_tasks
+        WHERE p_industries IS NULL
+           OR cardinality(p_industries) = 0
+           OR industries && p_industries
+    )
+    SELECT jsonb_build_object(
+        'total_tasks', (SELECT COUNT(*) FROM t),
+        'by_status', COALESCE(
+            (SELECT jsonb_object_agg(eff_status, c)
+             FROM (SELECT eff_status, COUNT(*) AS c FROM t GROUP BY eff_status) s),
+            '{}'::jsonb),
+        'by_priority', COALESCE(
+            (SELECT jsonb_object_agg(priority, c)
+             FROM (SELECT priority, COUNT(*) AS c FROM t GROUP BY priority) s),
+            '{}'::jsonb),
+        'by_industry', COALESCE(
+            (SELECT jsonb_object_agg(ind, c)
+             FROM (SELECT unnest(industries) AS ind, COUNT(*) AS c FROM t GROUP BY 1) s),
+            '{}'::jsonb),
+        'completion_rate', COALESCE(
+            (SELECT ROUND(
+                 (COUNT(*) FILTER (WHERE eff_status = 'completed'))::numeric * 100
+                 / NULLIF(COUNT(*) FILTER (WHERE eff_status <> 'cancelled'), 0), 1)
+             FROM t),
+            0)
+    )
+    INTO result;
+    RETURN result;
+END;
+$$;
+
+COMMENT ON FUNCTION compliance_task_stats IS 'Compliance task counts by effective status, priority and industry plus completion rate';
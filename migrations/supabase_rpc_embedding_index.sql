@@ -0,0 +1,36 @@
+-- Supabase RPC: 대량 적재 시 embeddings HNSW 인덱스 제거·재생성
+-- (IngestionPipeline.run_scheduled_collection에서 신규 문서 수가 BULK_REBUILD_THRESHOLD 초과 시 호출)
+-- database_schema.sql 적용 후 실행. 인덱스 이름·옵션은 database_schema.sql의 idx_embeddings_hnsw와 동일하게 유지.
+-- 주의: 함수 본문은 트랜잭션 안에서 실행되므로 CREATE INDEX CONCURRENTLY를 쓸 수 없음 → 재생성 중 embeddings 쓰기 잠금.
+--       인덱스가 없는 동안 match_chunks_v3는 순차 스캔으로 동작(결과는 동일, 지연만 증가).
+
+CREATE OR REPLACE FUNCTION drop_embedding_index()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+BEGIN
+    DROP INDEX IF EXISTS public.idx_embeddings_hnsw;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION rebuild_embedding_index()
+RETURNS void
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+SET maintenance_work_mem = '256MB'
+AS $$
+BEGIN
+    CREATE INDEX IF NOT EXISTS idx_embeddings_hnsw ON public.embeddings
+    USING hnsw (embedding vector_cosine_ops) WITH (m = 16, ef_construction = 64);
+END;
+$$;
+
+COMMENT ON FUNCTION drop_embedding_index IS 'Drop embeddings HNSW index before a bulk embedding load';
+COMMENT ON FUNCTION rebuild_embedding_index IS 'Recreate embeddings HNSW index after a bulk embedding load';
+
+-- SECURITY DEFINER로 인덱스를 내리므로 anon/authenticated 호출 차단, 백엔드(service_role)만 허용
+REVOKE EXECUTE ON FUNCTION drop_embedding_index(), rebuild_embedding_index() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION drop_embedding_index(), rebuild_embedding_index() TO service_role;
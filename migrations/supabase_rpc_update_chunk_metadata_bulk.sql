@@ -0,0 +1,28 @@
+-- Supabase RPC: 청크 메타데이터 일괄 갱신 (ContextualChunker.enrich_chunks에서 호출)
+-- database_schema.sql, migration_v2.sql(chunks.metadata 컬럼) 적용 후 실행.
+-- 입력: [{"chunk_id": "<uuid>", "metadata": {...}}, ...]
+-- upsert와 달리 chunk_text 등 NOT NULL 컬럼을 다시 보내지 않아 페이로드가 metadata 크기로 줄어듦.
+
+CREATE OR REPLACE FUNCTION update_chunk_metadata_bulk(chunks jsonb)
+RETURNS int
+LANGUAGE plpgsql
+SECURITY DEFINER
+SET search_path = public
+AS $$
+DECLARE
+    updated int;
+BEGIN
+    UPDATE public.chunks AS c
+    SET metadata = v.metadata
+    FROM jsonb_to_recordset(chunks) AS v(chunk_id uuid, metadata jsonb)
+    WHERE c.chunk_id = v.chunk_id;
+    GET DIAGNOSTICS updated = ROW_COUNT;
+    RETURN updated;
+END;
+$$;
+
+COMMENT ON FUNCTION update_chunk_metadata_bulk IS 'Bulk UPDATE chunks.metadata from a jsonb array of {chunk_id, metadata}';
+
+-- SECURITY DEFINER로 임의 청크 metadata를 덮어쓰므로 anon/authenticated 호출 차단, 백엔드(service_role)만 허용
+REVOKE EXECUTE ON FUNCTION update_chunk_metadata_bulk(jsonb) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION update_chunk_metadata_bulk(jsonb) TO service_role;